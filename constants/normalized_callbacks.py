@@ -7,13 +7,18 @@ Padrão obrigatório conforme PRD:
 - Identificador: sempre ID real do Firestore (nunca post_<timestamp>)
 
 Exemplos:
-- match:post:<postId>
+- match:post:<postId>[:<authorId base36>]
 - comments:post:<postId>
 - media:next:<postId>:<index>
 - posting:create:<userId>
 - menu:main:<userId>
 """
 
+import re
+from typing import Optional
+
+from utils.ui_builder import encode_base36
+
 
 class NormalizedCallbacks:
     """
@@ -27,9 +32,9 @@ class NormalizedCallbacks:
     # ========================================
     
     @staticmethod
-    def match_post(post_id: str) -> str:
-        """Match em um post."""
-        return f"match:post:{post_id}"
+    def match_post(post_id: str, author_id: Optional[int] = None) -> str:
+        """Match em um post (autor opcional para bloquear auto-match sem consultar o banco)."""
+        return f"match:post:{post_id}:{encode_base36(author_id)}" if author_id else f"match:post:{post_id}"
     
     @staticmethod
     def gallery_post(post_id: str) -> str:
@@ -37,9 +42,9 @@ class NormalizedCallbacks:
         return f"gallery:post:{post_id}"
     
     @staticmethod
-    def favorite_post(post_id: str) -> str:
-        """Favoritar um post."""
-        return f"favorite:post:{post_id}"
+    def favorite_post(post_id: str, author_id: Optional[int] = None) -> str:
+        """Favoritar um post (autor opcional para bloquear auto-favorito sem consultar o banco)."""
+        return f"favorite:post:{post_id}:{encode_base36(author_id)}" if author_id else f"favorite:post:{post_id}"
     
     @staticmethod
     def favorite_remove(post_id: str) -> str:
@@ -184,7 +189,7 @@ class CallbackPatterns:
     """
     
     # Interações com posts
-    POST_INTERACTION = r"^(match|gallery|favorite|info|comments):post:([A-Za-z0-9_-]+)$"
+    POST_INTERACTION = r"^(match|gallery|favorite|info|comments):post:([A-Za-z0-9_-]+)(?::([0-9a-z]+))?$"
     
     # Navegação de mídia
     MEDIA_NAVIGATION = r"^media:(prev|next):([A-Za-z0-9_-]+):([0-9]+)$"
@@ -214,6 +219,10 @@ class CallbackPatterns:
     MONETIZE = r"^monetize:(draft):([A-Za-z0-9_-]+)$"
 
 
+# Interações com posts pré-compiladas: um único match devolve (ação, post_id, author_id?)
+PARSE = re.compile(CallbackPatterns.POST_INTERACTION).match
+
+
 class CallbackExtractor:
     """
     Utilitários para extrair partes de callbacks normalizados.
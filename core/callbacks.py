@@ -214,8 +214,8 @@ def decode_callback_data(callback_data: str) -> tuple[str, Dict[str, Any]]:
     Returns:
         Tupla com (prefix, data)
     """
-    if ':' in callback_data:
-        prefix, encoded_data = callback_data.split(':', 1)
+    prefix, sep, encoded_data = callback_data.partition(':')
+    if sep:
         try:
             data = json.loads(encoded_data)
             return prefix, data
@@ -252,10 +252,9 @@ def get_callback_action(callback_data: str) -> str:
         return data['action']
     
     # Fallback para callbacks simples
-    if '_' in callback_data:
-        parts = callback_data.split('_')
-        if len(parts) > 1:
-            return '_'.join(parts[1:])
+    _, sep, action = callback_data.partition('_')
+    if sep:
+        return action
     
     return callback_data
 
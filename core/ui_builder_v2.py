@@ -86,7 +86,8 @@ class UIBuilderV2:
         self,
         post_id: str,
         counts: Dict[str, int],
-        viewer_user_id: int
+        viewer_user_id: int,
+        author_id: Optional[int] = None
     ) -> List[List[InlineKeyboardButton]]:
         """
         Cria teclado de ações do post.
@@ -95,6 +96,7 @@ class UIBuilderV2:
             post_id: ID do post
             counts: Contadores {comments, favorites, matches}
             viewer_user_id: ID do usuário visualizando
+            author_id: ID do autor (embutido em match/favoritar)
             
         Returns:
             Lista de linhas de botões
@@ -107,7 +109,7 @@ class UIBuilderV2:
         row1 = [
             InlineKeyboardButton(
                 text="❤️ Match",
-                callback_data=NormalizedCallbacks.match_post(post_id)
+                callback_data=NormalizedCallbacks.match_post(post_id, author_id)
             ),
             InlineKeyboardButton(
                 text="🖼️ Ver Galeria",
@@ -115,7 +117,7 @@ class UIBuilderV2:
             ),
             InlineKeyboardButton(
                 text="⭐ Favoritar",
-                callback_data=NormalizedCallbacks.favorite_post(post_id)
+                callback_data=NormalizedCallbacks.favorite_post(post_id, author_id)
             )
         ]
         
@@ -151,7 +153,8 @@ class UIBuilderV2:
         counts: Dict[str, int],
         viewer_user_id: int,
         current_index: int = 0,
-        total_media: int = 1
+        total_media: int = 1,
+        author_id: Optional[int] = None
     ) -> InlineKeyboardMarkup:
         """
         Cria teclado combinado: navegação + ações.
@@ -162,6 +165,7 @@ class UIBuilderV2:
             viewer_user_id: ID do usuário visualizando
             current_index: Índice atual da mídia
             total_media: Total de mídias
+            author_id: ID do autor do post
             
         Returns:
             InlineKeyboardMarkup completo
@@ -170,7 +174,7 @@ class UIBuilderV2:
         nav_rows = self.create_media_nav_keyboard(post_id, current_index, total_media)
         
         # Linhas de ações
-        action_rows = self.create_post_actions_keyboard(post_id, counts, viewer_user_id)
+        action_rows = self.create_post_actions_keyboard(post_id, counts, viewer_user_id, author_id)
         
         # Combinar: navegação primeiro, depois ações
         all_rows = nav_rows + action_rows
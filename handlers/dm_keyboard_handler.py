@@ -12,6 +12,15 @@ from utils.error_handler import ErrorHandler
 from constants import emojis, callbacks, user_states
 import logging
 
+# Callbacks do onboarding: literais (busca O(1)) e prefixos (um único startswith)
+ONBOARDING_EXACT = frozenset({
+    "confirm_age", "reject_age", "accept_rules", "reject_rules",
+    "accept_terms", "reject_terms", "accept_lgpd", "reject_lgpd",
+    "creator_yes", "creator_no", "accept_monetization", "reject_monetization",
+    "group_lite", "group_premium", "finish_relationship_selection",
+})
+ONBOARDING_PREFIXES = ("start_onboarding", "onboarding_", "state_", "category_", "gender_", "profile_", "rel_")
+
 class DMKeyboardHandler:
     def __init__(self, bot, onboarding_handler: OnboardingHandler, user_service: OptimizedUserService, security_service: SecurityService, error_handler: ErrorHandler, posting_handler: PostingHandler):  # Compatível com aiogram Bot
         self.bot = bot
@@ -125,14 +134,7 @@ class DMKeyboardHandler:
             return
 
         # Rotear callbacks de onboarding para o OnboardingHandler
-        if (data.startswith("start_onboarding") or 
-            data.startswith("onboarding_") or 
-            data in ["confirm_age", "reject_age", "accept_rules", "reject_rules", 
-                     "accept_terms", "reject_terms", "accept_lgpd", "reject_lgpd",
-                     "creator_yes", "creator_no", "accept_monetization", "reject_monetization",
-                     "group_lite", "group_premium"] or
-            data.startswith(("state_", "category_", "gender_", "profile_", "rel_")) or
-            data == "finish_relationship_selection"):
+        if data in ONBOARDING_EXACT or data.startswith(ONBOARDING_PREFIXES):
             await self.onboarding_handler.handle_onboarding_callback(call)
             return
 
@@ -174,7 +174,8 @@ class MediaNavigationHandlerV2:
                 counts=counts,
                 viewer_user_id=callback.from_user.id,
                 current_index=new_index,
-                total_media=total_media
+                total_media=total_media,
+                author_id=post['author_id']
             )
             
             # Editar mídia
@@ -14,6 +14,9 @@ from utils.invite_link_helper import get_group_invite_url
 import logging
 import time
 
+# Callbacks registrados em nível INFO (os demais em DEBUG)
+_IMPORTANT_CALLBACKS = frozenset({"start_onboarding", "confirm_age", "accept_rules", "group_lite", "group_premium"})
+
 class OnboardingHandler:
     def __init__(self, bot, user_service: OptimizedUserService, security_service: SecurityService, error_handler: ErrorHandler):  # Compatível com aiogram Bot
         self.bot = bot
@@ -71,8 +74,7 @@ class OnboardingHandler:
     async def clear_user_state(self, user_id: int):
         """Limpa o estado específico de um usuário."""
         try:
-            if user_id in self.user_states:
-                del self.user_states[user_id]
+            if self.user_states.pop(user_id, None) is not None:
                 self.logger.info(f"Estado limpo manualmente para usuário: {user_id}")
         except Exception as e:
             self.logger.error(f"Erro ao limpar estado do usuário {user_id}: {e}")
@@ -336,7 +338,7 @@ class OnboardingHandler:
                 # Continuar processamento mesmo se falhar ao responder callback
             
             # Log otimizado - apenas para callbacks importantes
-            if call.data in ["start_onboarding", "confirm_age", "accept_rules", "group_lite", "group_premium"]:
+            if call.data in _IMPORTANT_CALLBACKS:
                 self.logger.info(f"Callback importante: {call.data} do usuário {user_id}")
             else:
                 self.logger.debug(f"Callback: {call.data} do usuário {user_id}")
@@ -385,13 +387,17 @@ class OnboardingHandler:
         except Exception as e:
             logging.error(f"Falha ao enviar mensagem de boas-vindas ao grupo para o utilizador {user_id}: {e}", exc_info=True)
 
-    async def handle_onboarding_message(self, message: Message):
+    async def handle_onboarding_message(self, message: Message, user_data: dict = None):
+        """Processa texto do onboarding; ``user_data`` já lido pelo chamador evita nova busca."""
         user_id = message.from_user.id
-        user = await self.user_service.get_user(user_id)
-        if not user:
-            return
+        if user_data is not None:
+            current_state = user_data.get('state', 'IDLE')
+        else:
+            user = await self.user_service.get_user(user_id)
+            if not user:
+                return
+            current_state = user.state
 
-        current_state = user.state
         if current_state == user_states.AWAITING_AGE_INPUT:
             await self.steps.handle_age_input(user_id, message.chat.id, message.text)
         elif current_state == user_states.AWAITING_AGE_CONFIRMATION:
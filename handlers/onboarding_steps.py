@@ -1228,20 +1228,3 @@ class OnboardingSteps:
         except Exception as e:
             self.logger.error(f"Erro ao processar codinome: {e}")
             await self.error_handler.handle_error(self.bot, user_id, "Erro ao processar codinome.")
-    
-    async def handle_pix_key(self, message: Message, user) -> None:
-        """Manipula entrada da chave PIX."""
-        try:
-            pix_key = message.text.strip()
-            # Salvar chave PIX
-            user.pix_key = pix_key
-            await self.user_service.update_user(user.telegram_id, user.to_dict())
-            
-            await self.bot.send_message(
-                chat_id=message.chat.id,
-                text="✅ Chave PIX salva com sucesso!"
-            )
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao processar chave PIX: {e}")
-            await self.error_handler.handle_error(self.bot, user.telegram_id, "Erro ao processar chave PIX.")
\ No newline at end of file
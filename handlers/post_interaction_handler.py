@@ -3,18 +3,38 @@ Handler para processar interações com posts (match, info, galeria, favoritos,
 Implementa toda a lógica de interação do usuário com posts no grupo.
 """
 
+import asyncio
+import html
 import logging
+import re
+from collections import ChainMap
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from services.user_service import UserService
 from services.post_service import PostService
 from services.match_service import MatchService
-from utils.ui_builder import UIBuilder
+from utils.ui_builder import UIBuilder, encode_base36
 from utils.error_handler import ErrorHandler
 from constants.callbacks import PostingCallbacks, MatchCallbacks, FavoritesCallbacks
+from constants.user_states import UserStates
 
 logger = logging.getLogger(__name__)
 
+# Formato novo (ação:post:id[:autor_base36]) e legado (ação_post_id) num único padrão
+_INTERACTION_RE = re.compile(
+    r'^(match|info|gallery|favorite|comments?)(?::post:([^:]+)(?::([0-9a-z]+))?|_post_(.+))$'
+)
+
+# Card de informações do autor
+_AUTHOR_INFO_TEMPLATE = (
+    "ℹ️ <b>Informações do Perfil</b>\n\n"
+    "👤 <b>Codinome:</b> {codename}\n"
+    "📍 <b>Estado:</b> {state}\n"
+    "🏷️ <b>Categoria:</b> {category}\n"
+)
+_AUTHOR_INFO_DEFAULTS = {'codename': 'N/A', 'state': 'N/A', 'category': 'N/A'}
+_PHYSICAL_LABELS = (('height', 'Altura'), ('hair_color', 'Cabelos'), ('eye_color', 'Olhos'))
+
 class PostInteractionHandler:
     """Handler para processar interações com posts."""
     
@@ -29,6 +49,27 @@ class PostInteractionHandler:
         self.match_service = match_service
         self.ui_builder = UIBuilder()
         self.error_handler = error_handler or ErrorHandler()
+        
+        # Referências às tarefas de alerta em segundo plano (evita coleta prematura)
+        self._background_tasks = set()
+        
+        # Tabela de roteamento (ação, alvo) -> handler, montada uma única vez
+        self._ROUTES = {
+            ('match', 'post'): self._handle_match_action,
+            ('info', 'post'): self._handle_info_action,
+            ('gallery', 'post'): self._handle_gallery_action,
+            ('favorite', 'post'): self._handle_favorite_action,
+            ('comments', 'post'): self._handle_comment_action,
+            ('comment', 'post'): self._handle_comment_action,
+        }
+        
+        # Templates estáticos de teclados; só o callback_data varia por chamada
+        self._comment_kb_template = [
+            ["✍️ Escrever Comentário", "write_comment"],
+            ["👀 Ver Comentários", "view_comments"],
+            ["❌ Fechar", "close_comments"],
+        ]
+        self._close_info_button = InlineKeyboardButton(text="❌ Fechar", callback_data="close_info")
     
     async def handle_info_request(self, call):
         """Busca e envia informações sobre o autor do post ou do novo membro."""
@@ -53,12 +94,12 @@ class PostInteractionHandler:
                 user_data = await self.user_service.get_user_data(author_id)
                 if user_data:
                     info_text = (
-                        f"ℹ️ **Informações do Utilizador**\n\n"
-                        f"**Codinome:** {user_data.get('codename', 'N/A')}\n"
-                        f"**Categoria:** {user_data.get('category', 'N/A')}\n"
-                        f"**Estado:** {user_data.get('state', 'N/A')}"
+                        f"ℹ️ <b>Informações do Utilizador</b>\n\n"
+                        f"<b>Codinome:</b> {html.escape(str(user_data.get('codename', 'N/A')))}\n"
+                        f"<b>Categoria:</b> {html.escape(str(user_data.get('category', 'N/A')))}\n"
+                        f"<b>Estado:</b> {html.escape(str(user_data.get('state', 'N/A')))}"
                     )
-                    await self.bot.send_message(call.from_user.id, info_text, parse_mode='Markdown')
+                    await self.bot.send_message(call.from_user.id, info_text, parse_mode='HTML')
                 else:
                     await self.bot.send_message(call.from_user.id, "Não foi possível encontrar informações sobre este utilizador.")
                     
@@ -138,18 +179,18 @@ class PostInteractionHandler:
             target_type = parts[1]
             target_id = parts[2]
             
-            # Criar teclado para comentários
+            # Criar teclado para comentários a partir do template
+            template = self._comment_kb_template
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="✍️ Escrever Comentário", callback_data=f"write_comment:{target_type}:{target_id}")],
-                [InlineKeyboardButton(text="👀 Ver Comentários", callback_data=f"view_comments:{target_type}:{target_id}")],
-                [InlineKeyboardButton(text="❌ Fechar", callback_data="close_comments")]
+                [InlineKeyboardButton(text=text, callback_data=f"{action}:{target_type}:{target_id}" if i < 2 else action)]
+                for i, (text, action) in enumerate(template)
             ])
             
             await self.bot.send_message(
                 call.from_user.id,
-                "💭 **Sistema de Comentários**\n\nEscolha uma opção:",
+                "💭 <b>Sistema de Comentários</b>\n\nEscolha uma opção:",
                 reply_markup=keyboard,
-                parse_mode='Markdown'
+                parse_mode='HTML'
             )
                 
         except Exception as e:
@@ -171,133 +212,47 @@ class PostInteractionHandler:
             
             logger.info(f"Processando interação com post: {callback_data} para usuário {user_id}")
             
-            # Extrair post_id do callback_data
-            post_id = self._extract_post_id(callback_data)
-            if not post_id:
-                logger.error(f"Post ID não encontrado no callback: {callback_data}")
-                await query.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            # Roteamento baseado no tipo de interação (formato novo: ação:post:id)
-            if callback_data.startswith('match:post:'):
-                await self._handle_match_action(query, user_id, post_id, callback_data)
-                
-            elif callback_data.startswith('info:post:'):
-                await self._handle_info_action(query, user_id, post_id)
-                
-            elif callback_data.startswith('gallery:post:'):
-                await self._handle_gallery_action(query, user_id, post_id)
-                
-            elif callback_data.startswith('favorite:post:'):
-                await self._handle_favorite_action(query, user_id, post_id, callback_data)
-                
-            elif callback_data.startswith('comments:post:'):
-                await self._handle_comment_action(query, user_id, post_id)
-                
-            # Roteamento baseado no tipo de interação (formato legado)
-            elif callback_data.startswith('match_post_'):
-                await self._handle_match_action(query, user_id, post_id, callback_data)
-                
-            elif callback_data.startswith('info_post_'):
-                await self._handle_info_action(query, user_id, post_id)
-                
-            elif callback_data.startswith('gallery_post_'):
-                await self._handle_gallery_action(query, user_id, post_id)
-                
-            elif callback_data.startswith('favorite_post_'):
-                await self._handle_favorite_action(query, user_id, post_id, callback_data)
-                
-            elif callback_data.startswith('comment_post_'):
-                await self._handle_comment_action(query, user_id, post_id)
-                
             # Adicionar suporte para callbacks de fechamento
-            elif callback_data == "close_info":
+            if callback_data == "close_info":
                 await self.handle_close_info(query)
-                
+                return
+            
+            # Extrair ação e post_id numa única passagem (formatos novo e legado)
+            match = _INTERACTION_RE.match(callback_data)
+            handler = self._ROUTES.get((match.group(1), 'post')) if match else None
+            if handler:
+                post_id = match.group(2) or match.group(4)
+                if len(post_id) <= 5:
+                    logger.error(f"Post ID não encontrado no callback: {callback_data}")
+                    self._alert(query, "❌ Post não encontrado.")
+                    return
+                # author_id do callback é só uma dica; _resolve_post_author confere com o post
+                author_token = match.group(3)
+                author_id = int(author_token, 36) if author_token else None
+                await handler(query, user_id, post_id, author_id)
             else:
                 logger.warning(f"Callback de interação não reconhecido: {callback_data}")
-                await query.answer("❌ Ação não reconhecida.", show_alert=True)
+                self._alert(query, "❌ Ação não reconhecida.")
                 
         except Exception as e:
             logger.error(f"Erro ao processar interação com post {callback_data}: {e}", exc_info=True)
             await self.error_handler.handle_callback_error(query, "Erro ao processar interação")
     
-    def _extract_post_id(self, callback_data: str) -> str:
-        """Extrai o post_id do callback_data."""
-        try:
-            # Suporte para formato novo: ação:post:id
-            if ':' in callback_data:
-                parts = callback_data.split(':')
-                if len(parts) >= 3 and parts[1] == 'post':
-                    post_id = parts[2]
-                    # Validar se é um UUID válido (formato do Firestore)
-                    if post_id and len(post_id) > 5 and post_id != 'post':
-                        logger.debug(f"Post ID extraído (formato novo): {post_id} de {callback_data}")
-                        return post_id
-            
-            # Formato legado: action_post_POST_ID
-            # Ex: match_post_post_1760569943, gallery_post_post_1760569943
-            
-            # Procurar pelo padrão "post_" seguido do ID
-            if "post_" in callback_data:
-                # Encontrar a última ocorrência de "post_"
-                last_post_index = callback_data.rfind("post_")
-                if last_post_index != -1:
-                    # Extrair tudo após "post_"
-                    post_id = callback_data[last_post_index + 5:]  # +5 para pular "post_"
-                    # Validar se não é apenas "post" ou vazio
-                    if post_id and post_id != 'post' and len(post_id) > 5:
-                        logger.debug(f"Post ID extraído: {post_id} de {callback_data}")
-                        return post_id
-            
-            # Fallback: tentar extrair usando split
-            parts = callback_data.split('_')
-            if len(parts) >= 3 and 'post' in parts:
-                # Encontrar a posição da palavra "post" e pegar as partes seguintes
-                post_indices = [i for i, part in enumerate(parts) if part == 'post']
-                if post_indices:
-                    last_post_index = post_indices[-1]
-                    if last_post_index + 1 < len(parts):
-                        # Pegar apenas a parte após "post"
-                        post_id = parts[last_post_index + 1]
-                        # Validar se é um ID válido
-                        if post_id and post_id != 'post' and len(post_id) > 5:
-                            logger.debug(f"Post ID extraído (fallback): {post_id} de {callback_data}")
-                            return post_id
-            
-            # Fallback adicional: se callback_data contém apenas "post", retornar None
-            if callback_data.strip() == "post":
-                logger.warning(f"Callback data inválido (apenas 'post'): {callback_data}")
-                return None
-            
-            logger.warning(f"Não foi possível extrair post_id válido de: {callback_data}")
-            return None
-        except Exception as e:
-            logger.error(f"Erro ao extrair post_id de {callback_data}: {e}")
-            return None
-    
-    async def _handle_match_action(self, query, user_id: int, post_id: str, callback_data: str):
+    async def _handle_match_action(self, query, user_id: int, post_id: str, author_id: int = None):
         """Processa ação de match com post."""
         try:
-            # Obter dados do post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await query.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            author_id = post.get('author_id')
+            author_id = await self._resolve_post_author(query, post_id, author_id)
             if not author_id:
-                await query.answer("❌ Autor do post não encontrado.", show_alert=True)
                 return
             
             if author_id == user_id:
-                await query.answer("❌ Você não pode dar match no seu próprio post.", show_alert=True)
+                self._alert(query, "❌ Você não pode dar match no seu próprio post.")
                 return
             
             # Verificar se já existe match
             existing_match = await self.match_service.check_match_exists(user_id, author_id)
             if existing_match:
-                await query.answer("💕 Você já deu match neste perfil!", show_alert=True)
+                self._alert(query, "💕 Você já deu match neste perfil!")
                 return
             
             # Criar match
@@ -308,63 +263,87 @@ class PostInteractionHandler:
                 author_data = await self.user_service.get_user_data(author_id)
                 author_name = author_data.get('codename', 'Usuário') if author_data else 'Usuário'
                 
-                await query.answer(f"💕 Match enviado para {author_name}!", show_alert=True)
-                
-                # Notificar o autor do post (se estiver online)
-                try:
-                    user_data = await self.user_service.get_user_data(user_id)
-                    user_name = user_data.get('codename', 'Alguém') if user_data else 'Alguém'
-                    
-                    await self.bot.send_message(
-                        author_id,
-                        f"💕 <b>Novo Match!</b>\n\n"
-                        f"{user_name} deu match no seu post!\n"
-                        f"Acesse seus matches para conversar.",
-                        parse_mode='HTML'
-                    )
-                except Exception as e:
-                    logger.warning(f"Não foi possível notificar autor do match: {e}")
+                # Confirmar ao usuário e notificar o autor em paralelo
+                await asyncio.gather(
+                    self.bot.send_message(user_id, f"💕 Match enviado para {author_name}!"),
+                    self._notify_author_of_match(author_id, user_id),
+                    return_exceptions=True
+                )
             else:
-                await query.answer("❌ Erro ao processar match. Tente novamente.", show_alert=True)
+                self._alert(query, "❌ Erro ao processar match. Tente novamente.")
                 
         except Exception as e:
             logger.error(f"Erro ao processar match: {e}", exc_info=True)
-            await query.answer("❌ Erro interno. Tente novamente.", show_alert=True)
+            self._alert(query, "❌ Erro interno. Tente novamente.")
     
-    async def _handle_info_action(self, query, user_id: int, post_id: str):
-        """Processa ação de visualizar informações do autor do post."""
+    def _alert(self, query, text: str):
+        """Envia o aviso por mensagem privada sem bloquear o restante do handler.
+
+        O callback já foi respondido no início de handle_post_interaction
+        (e pelo handler unificado), então um segundo query.answer seria rejeitado.
+        """
+        task = asyncio.create_task(self._safe_send(query.from_user.id, text))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _safe_send(self, user_id: int, text: str):
+        """Envia mensagem privada, ignorando falhas (usuário bloqueou o bot etc.)."""
         try:
-            # Obter dados do post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await query.answer("❌ Post não encontrado.", show_alert=True)
-                return
+            await self.bot.send_message(user_id, text)
+        except Exception as e:
+            logger.debug(f"Não foi possível enviar aviso ao usuário {user_id}: {e}")
+    
+    async def _resolve_post_author(self, query, post_id: str, author_id: int = None):
+        """Retorna o autor do post (cache em memória do PostService).
+
+        O autor vindo no callback é só uma dica: o cliente pode enviar
+        callback_data arbitrário, então ele precisa conferir com o post.
+        """
+        post_author_id = await self.post_service.get_post_author(post_id)
+        if not post_author_id:
+            self._alert(query, "❌ Post não encontrado.")
+            return None
+        post_author_id = int(post_author_id)
+        if author_id and author_id != post_author_id:
+            logger.warning(f"Autor do callback não confere com o post {post_id}: {author_id} != {post_author_id}")
+            self._alert(query, "❌ Post não encontrado.")
+            return None
+        return post_author_id
+    
+    async def _notify_author_of_match(self, author_id: int, user_id: int):
+        """Notifica o autor do post sobre um novo match (melhor esforço)."""
+        try:
+            user_data = await self.user_service.get_user_data(user_id)
+            user_name = user_data.get('codename', 'Alguém') if user_data else 'Alguém'
             
-            author_id = post.get('author_id')
+            await self.bot.send_message(
+                author_id,
+                f"💕 <b>Novo Match!</b>\n\n"
+                f"{user_name} deu match no seu post!\n"
+                f"Acesse seus matches para conversar.",
+                parse_mode='HTML'
+            )
+        except Exception as e:
+            logger.warning(f"Não foi possível notificar autor do match: {e}")
+    
+    async def _handle_info_action(self, query, user_id: int, post_id: str, author_id: int = None):
+        """Processa ação de visualizar informações do autor do post."""
+        try:
+            author_id = await self._resolve_post_author(query, post_id, author_id)
             if not author_id:
-                await query.answer("❌ Autor do post não encontrado.", show_alert=True)
                 return
             
             # Obter dados do autor
             author_data = await self.user_service.get_user_data(author_id)
             if not author_data:
-                await query.answer("❌ Informações do autor não encontradas.", show_alert=True)
+                self._alert(query, "❌ Informações do autor não encontradas.")
                 return
             
             # Criar mensagem com informações
             info_text = self._build_author_info_text(author_data)
             
             # Criar teclado com opções
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [
-                    InlineKeyboardButton(text="💕 Match", callback_data=f"match:post:{post_id}"),
-                    InlineKeyboardButton(text="⭐ Favoritar", callback_data=f"favorite:post:{post_id}")
-                ],
-                [
-                    InlineKeyboardButton(text="🖼️ Ver Galeria", callback_data=f"gallery:post:{post_id}"),
-                    InlineKeyboardButton(text="❌ Fechar", callback_data="close_info")
-                ]
-            ])
+            keyboard = self._build_post_actions_keyboard(post_id, with_gallery=True, author_id=author_id)
             
             # Enviar informações em mensagem privada
             await self.bot.send_message(
@@ -374,31 +353,22 @@ class PostInteractionHandler:
                 reply_markup=keyboard
             )
             
-            await query.answer("ℹ️ Informações enviadas no privado!")
-            
         except Exception as e:
             logger.error(f"Erro ao processar info: {e}", exc_info=True)
-            await query.answer("❌ Erro ao obter informações.", show_alert=True)
+            self._alert(query, "❌ Erro ao obter informações.")
     
-    async def _handle_gallery_action(self, query, user_id: int, post_id: str):
+    async def _handle_gallery_action(self, query, user_id: int, post_id: str, author_id: int = None):
         """Processa ação de visualizar galeria do autor do post."""
         try:
-            # Obter dados do post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await query.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            author_id = post.get('author_id')
+            author_id = await self._resolve_post_author(query, post_id, author_id)
             if not author_id:
-                await query.answer("❌ Autor do post não encontrado.", show_alert=True)
                 return
             
             # Obter posts do autor
             author_posts = await self.post_service.get_user_posts(author_id, limit=10)
             
             if not author_posts:
-                await query.answer("📷 Este usuário ainda não possui posts na galeria.", show_alert=True)
+                self._alert(query, "📷 Este usuário ainda não possui posts na galeria.")
                 return
             
             # Obter dados do autor
@@ -406,32 +376,30 @@ class PostInteractionHandler:
             author_name = author_data.get('codename', 'Usuário') if author_data else 'Usuário'
             
             # Criar mensagem da galeria
-            gallery_text = f"🖼️ <b>Galeria de {author_name}</b>\n\n"
-            gallery_text += f"📊 Total de posts: {len(author_posts)}\n\n"
+            total = len(author_posts)
+            extra = total - 5
+            parts = [
+                f"🖼️ <b>Galeria de {author_name}</b>\n\n",
+                f"📊 Total de posts: {total}\n\n",
+            ]
             
             # Mostrar preview dos posts
             for i, post_item in enumerate(author_posts[:5], 1):
-                media_count = len(post_item.get('media_files', []))
-                post_text = post_item.get('text', '')[:50] + '...' if len(post_item.get('text', '')) > 50 else post_item.get('text', '')
+                media_count = len(post_item.get('media_files', ()))
+                text = post_item.get('text', '')
+                post_text = text[:50] + '...' if len(text) > 50 else text
                 
-                gallery_text += f"{i}. "
-                if media_count > 0:
-                    gallery_text += f"📷 {media_count} mídia(s)"
-                if post_text:
-                    gallery_text += f" - {post_text}"
-                gallery_text += "\n"
+                media_part = f"📷 {media_count} mídia(s)" if media_count > 0 else ""
+                text_part = f" - {post_text}" if post_text else ""
+                parts.append(f"{i}. {media_part}{text_part}\n")
             
-            if len(author_posts) > 5:
-                gallery_text += f"\n... e mais {len(author_posts) - 5} posts"
+            if extra > 0:
+                parts.append(f"\n... e mais {extra} posts")
+            
+            gallery_text = "".join(parts)
             
             # Criar teclado
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [
-                    InlineKeyboardButton(text="💕 Match", callback_data=f"match:post:{post_id}"),
-                    InlineKeyboardButton(text="⭐ Favoritar", callback_data=f"favorite:post:{post_id}")
-                ],
-                [InlineKeyboardButton(text="❌ Fechar", callback_data="close_info")]
-            ])
+            keyboard = self._build_post_actions_keyboard(post_id, with_gallery=False, author_id=author_id)
             
             # Enviar galeria em mensagem privada
             await self.bot.send_message(
@@ -441,88 +409,78 @@ class PostInteractionHandler:
                 reply_markup=keyboard
             )
             
-            await query.answer("🖼️ Galeria enviada no privado!")
-            
         except Exception as e:
             logger.error(f"Erro ao processar galeria: {e}", exc_info=True)
-            await query.answer("❌ Erro ao carregar galeria.", show_alert=True)
+            self._alert(query, "❌ Erro ao carregar galeria.")
     
-    async def _handle_favorite_action(self, query, user_id: int, post_id: str, callback_data: str):
+    async def _handle_favorite_action(self, query, user_id: int, post_id: str, author_id: int = None):
         """Processa ação de favoritar/desfavoritar post."""
         try:
-            # Obter dados do post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await query.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            author_id = post.get('author_id')
+            author_id = await self._resolve_post_author(query, post_id, author_id)
             if not author_id:
-                await query.answer("❌ Autor do post não encontrado.", show_alert=True)
                 return
             
             if author_id == user_id:
-                await query.answer("❌ Você não pode favoritar seu próprio post.", show_alert=True)
+                self._alert(query, "❌ Você não pode favoritar seu próprio post.")
                 return
             
-            # Verificar se já está favoritado
-            is_favorited = await self.post_service.is_favorited(user_id, post_id)
+            # Alternar favorito numa única transação (leitura + escrita)
+            new_state = await self.post_service.toggle_favorite(user_id, post_id)
             
-            if is_favorited:
-                # Remover dos favoritos
-                success = await self.post_service.remove_favorite(user_id, post_id)
-                if success:
-                    await query.answer("💔 Post removido dos favoritos.", show_alert=True)
-                else:
-                    await query.answer("❌ Erro ao remover dos favoritos.", show_alert=True)
+            if new_state is None:
+                self._alert(query, "❌ Erro ao atualizar favoritos.")
+            elif new_state:
+                self._alert(query, "⭐ Post adicionado aos favoritos!")
             else:
-                # Adicionar aos favoritos
-                success = await self.post_service.add_favorite(user_id, post_id)
-                if success:
-                    await query.answer("⭐ Post adicionado aos favoritos!", show_alert=True)
-                else:
-                    await query.answer("❌ Erro ao adicionar aos favoritos.", show_alert=True)
+                self._alert(query, "💔 Post removido dos favoritos.")
                     
         except Exception as e:
             logger.error(f"Erro ao processar favorito: {e}", exc_info=True)
-            await query.answer("❌ Erro interno. Tente novamente.", show_alert=True)
+            self._alert(query, "❌ Erro interno. Tente novamente.")
     
-    async def _handle_comment_action(self, query, user_id: int, post_id: str):
+    async def _handle_comment_action(self, query, user_id: int, post_id: str, author_id: int = None):
         """Processa ação de comentar no post."""
         try:
-            # Obter dados do post
-            post = await self.post_service.get_post(post_id)
+            # Obter post e últimos comentários (com total) em paralelo
+            post, (comments, comment_count) = await asyncio.gather(
+                self.post_service.get_post(post_id),
+                self.post_service.get_recent_comments_with_count(post_id, 5)
+            )
             if not post:
-                await query.answer("❌ Post não encontrado.", show_alert=True)
+                self._alert(query, "❌ Post não encontrado.")
                 return
             
-            # Obter comentários existentes
-            comments = await self.post_service.get_post_comments(post_id)
-            comment_count = len(comments) if comments else 0
-            
             # Criar mensagem com comentários
-            comments_text = f"💭 <b>Comentários ({comment_count})</b>\n\n"
+            parts = [f"💭 <b>Comentários ({comment_count})</b>\n\n"]
             
             if comments:
-                for comment in comments[-5:]:  # Mostrar últimos 5 comentários
-                    author_data = await self.user_service.get_user_data(comment.get('author_id'))
+                # Buscar autores dos comentários de uma vez
+                authors = await asyncio.gather(
+                    *(self.user_service.get_user_data(comment.get('author_id')) for comment in comments)
+                )
+                for comment, author_data in zip(comments, authors):
                     author_name = author_data.get('codename', 'Anônimo') if author_data else 'Anônimo'
                     
-                    comments_text += f"👤 <b>{author_name}</b>\n"
-                    comments_text += f"{comment.get('text', '')}\n"
-                    comments_text += f"🕐 {comment.get('created_at', '')}\n\n"
+                    parts.append(
+                        f"👤 <b>{author_name}</b>\n"
+                        f"{comment.get('text', '')}\n"
+                        f"🕐 {comment.get('created_at', '')}\n\n"
+                    )
                 
                 if comment_count > 5:
-                    comments_text += f"... e mais {comment_count - 5} comentários\n\n"
+                    parts.append(f"... e mais {comment_count - 5} comentários\n\n")
             else:
-                comments_text += "Ainda não há comentários neste post.\n\n"
+                parts.append("Ainda não há comentários neste post.\n\n")
             
-            comments_text += "💬 <i>Digite seu comentário para adicionar:</i>"
+            parts.append("💬 <i>Digite seu comentário para adicionar:</i>")
+            comments_text = "".join(parts)
             
             # Definir estado do usuário para aguardar comentário
-            from constants.user_states import UserStates
-            await self.user_service.set_user_state(user_id, UserStates.AWAITING_COMMENT)
-            await self.user_service.update_user_context(user_id, {'commenting_post_id': post_id})
+            post_author_id = post.get('author_id') or post.get('creator_id')
+            await self.user_service.set_user_state_and_context(
+                user_id, UserStates.AWAITING_COMMENT,
+                {'commenting_post_id': post_id, 'commenting_post_author_id': post_author_id}
+            )
             
             # Criar teclado
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -537,15 +495,18 @@ class PostInteractionHandler:
                 reply_markup=keyboard
             )
             
-            await query.answer("💭 Comentários enviados no privado! Digite seu comentário.")
-            
         except Exception as e:
             logger.error(f"Erro ao processar comentários: {e}", exc_info=True)
-            await query.answer("❌ Erro ao carregar comentários.", show_alert=True)
+            self._alert(query, "❌ Erro ao carregar comentários.")
 
     async def handle_comment_text(self, message, user_id: int):
         """Processa texto de comentário enviado pelo usuário."""
         try:
+            # Saída rápida pelo estado em cache, sem leitura no Firestore
+            cached_state = self.user_service.get_cached_user_state(user_id)
+            if cached_state is not None and cached_state != 'awaiting_comment':
+                return False
+            
             # Verificar se o usuário está no estado de comentário
             user_data = await self.user_service.get_user_data(user_id)
             if not user_data or user_data.get('state') != 'awaiting_comment':
@@ -557,7 +518,7 @@ class PostInteractionHandler:
             
             if not post_id:
                 await message.reply("❌ Sessão de comentário expirada. Tente novamente.")
-                await self.user_service.set_user_state(user_id, 'idle')
+                await self.user_service.set_user_state_and_context(user_id, 'idle', {})
                 return True
             
             comment_text = message.text
@@ -575,15 +536,17 @@ class PostInteractionHandler:
             if success:
                 await message.reply("✅ Comentário adicionado com sucesso!")
                 
-                # Notificar autor do post (se não for o próprio usuário)
-                post = await self.post_service.get_post(post_id)
-                if post and post.get('author_id') != user_id:
+                # Notificar autor do post (se não for o próprio usuário);
+                # contextos antigos sem o autor ainda consultam o post
+                post_author_id = context.get('commenting_post_author_id')
+                if not post_author_id:
+                    post_author_id = await self.post_service.get_post_author(post_id)
+                if post_author_id and post_author_id != user_id:
                     try:
-                        user_data = await self.user_service.get_user_data(user_id)
-                        commenter_name = user_data.get('codename', 'Alguém') if user_data else 'Alguém'
+                        commenter_name = user_data.get('codename', 'Alguém')
                         
                         await self.bot.send_message(
-                            post.get('author_id'),
+                            post_author_id,
                             f"💭 <b>Novo comentário!</b>\n\n"
                             f"{commenter_name} comentou no seu post:\n"
                             f"<i>\"{comment_text[:100]}{'...' if len(comment_text) > 100 else ''}\"</i>",
@@ -595,8 +558,7 @@ class PostInteractionHandler:
                 await message.reply("❌ Erro ao adicionar comentário. Tente novamente.")
             
             # Resetar estado do usuário
-            await self.user_service.set_user_state(user_id, 'idle')
-            await self.user_service.update_user_context(user_id, {})
+            await self.user_service.set_user_state_and_context(user_id, 'idle', {})
             
             return True
             
@@ -612,8 +574,7 @@ class PostInteractionHandler:
             user_id = query.from_user.id
             
             # Resetar estado do usuário
-            await self.user_service.set_user_state(user_id, 'idle')
-            await self.user_service.update_user_context(user_id, {})
+            await self.user_service.set_user_state_and_context(user_id, 'idle', {})
             
             await query.message.edit_text("❌ Comentário cancelado.")
             await query.answer("Comentário cancelado.")
@@ -622,35 +583,35 @@ class PostInteractionHandler:
             logger.error(f"Erro ao cancelar comentário: {e}", exc_info=True)
             await query.answer("❌ Erro ao cancelar.")
 
+    def _build_post_actions_keyboard(self, post_id: str, with_gallery: bool, author_id: int = None) -> InlineKeyboardMarkup:
+        """Monta o teclado Match/Favoritar(/Galeria)/Fechar reutilizando o botão estático de fechar."""
+        target = f"{post_id}:{encode_base36(author_id)}" if author_id else post_id
+        last_row = [self._close_info_button]
+        if with_gallery:
+            last_row.insert(0, InlineKeyboardButton(text="🖼️ Ver Galeria", callback_data=f"gallery:post:{target}"))
+        return InlineKeyboardMarkup(inline_keyboard=[
+            [
+                InlineKeyboardButton(text="💕 Match", callback_data=f"match:post:{target}"),
+                InlineKeyboardButton(text="⭐ Favoritar", callback_data=f"favorite:post:{target}")
+            ],
+            last_row
+        ])
+    
     def _build_author_info_text(self, author_data: dict) -> str:
         """Constrói texto com informações do autor."""
-        info_text = "ℹ️ <b>Informações do Perfil</b>\n\n"
-        
-        # Informações básicas
-        info_text += f"👤 <b>Codinome:</b> {author_data.get('codename', 'N/A')}\n"
-        info_text += f"📍 <b>Estado:</b> {author_data.get('state', 'N/A')}\n"
-        info_text += f"🏷️ <b>Categoria:</b> {author_data.get('category', 'N/A')}\n"
-        
-        # Informações adicionais se disponíveis
-        if author_data.get('age'):
-            info_text += f"🎂 <b>Idade:</b> {author_data['age']} anos\n"
-        
-        if author_data.get('description'):
-            info_text += f"\n📝 <b>Descrição:</b>\n{author_data['description']}\n"
+        # Informações básicas (template único com valores padrão)
+        info_text = _AUTHOR_INFO_TEMPLATE.format_map(ChainMap(author_data, _AUTHOR_INFO_DEFAULTS))
         
         # Informações físicas se disponíveis
-        physical_info = []
-        if author_data.get('height'):
-            physical_info.append(f"Altura: {author_data['height']}")
-        if author_data.get('hair_color'):
-            physical_info.append(f"Cabelos: {author_data['hair_color']}")
-        if author_data.get('eye_color'):
-            physical_info.append(f"Olhos: {author_data['eye_color']}")
+        physical_info = [f"{label}: {author_data[key]}" for key, label in _PHYSICAL_LABELS if author_data.get(key)]
         
-        if physical_info:
-            info_text += f"\n👁️ <b>Características:</b> {' • '.join(physical_info)}\n"
-        
-        return info_text
+        # Informações adicionais se disponíveis
+        extras = (
+            f"🎂 <b>Idade:</b> {author_data['age']} anos\n" if author_data.get('age') else None,
+            f"\n📝 <b>Descrição:</b>\n{author_data['description']}\n" if author_data.get('description') else None,
+            f"\n👁️ <b>Características:</b> {' • '.join(physical_info)}\n" if physical_info else None,
+        )
+        return info_text + "".join(extra for extra in extras if extra)
     
     async def handle_close_info(self, query):
         """Fecha mensagem de informações."""
@@ -2,16 +2,20 @@
 Post Interaction Handler V2 - Callbacks normalizados e idempotência.
 
 Implementa todas as interações com posts seguindo padrão:
-- match:post:<postId>
+- match:post:<postId>[:<authorId base36>]
 - gallery:post:<postId>
-- favorite:post:<postId>
+- favorite:post:<postId>[:<authorId base36>]
 - info:post:<postId>
 - comments:post:<postId>
 
 Com idempotência e antispam integrados.
 """
+import asyncio
+import html
 import logging
 import re
+from collections import ChainMap, defaultdict
+from functools import wraps
 from typing import Optional
 from aiogram import Bot
 from aiogram.types import CallbackQuery, Message
@@ -21,11 +25,69 @@ from services.post_service_v2 import PostServiceV2
 from services.match_service import MatchService
 from services.antispam_service import get_antispam_service, RateLimitExceeded
 from services.idempotency_service import get_idempotency_service
-from constants.normalized_callbacks import CallbackPatterns, CallbackExtractor
+from constants.normalized_callbacks import PARSE
 from core.ui_builder_v2 import UIBuilderV2
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Ritmo de envio de DMs pela fila (abaixo do limite global de ~30 msg/s do Telegram)
+DM_SEND_RATE = 25
+
+# Janela de agrupamento das atualizações de teclado por post (segundos)
+KEYBOARD_UPDATE_DEBOUNCE = 2
+
+# Mensagens de erro exibidas ao usuário por ação
+_ERROR_TEXTS = {
+    'match': "Erro ao processar match.",
+    'gallery': "Erro ao abrir galeria.",
+    'favorite': "Erro ao favoritar post.",
+    'info': "Erro ao obter informações.",
+    'comments': "Erro ao obter comentários.",
+}
+
+# Card de informações do autor
+_INFO_TEMPLATE = (
+    "👤 <b>{codename}</b>\n\n"
+    "📍 {category} | {state}\n"
+    "🎂 Idade: {age}\n\n"
+    "💬 <b>Bio:</b>\n{description}\n\n"
+    "📏 <b>Físico:</b>\n"
+    "• Altura: {height}\n"
+    "• Cabelo: {hair_color}\n"
+    "• Olhos: {eye_color}\n"
+)
+_INFO_DEFAULTS = {
+    'codename': 'Anônimo',
+    'category': 'Usuário',
+    'state': 'BR',
+    'age': '?',
+    'description': 'Sem descrição',
+}
+_PHYSICAL_DEFAULTS = {'height': '-', 'hair_color': '-', 'eye_color': '-', 'endowment': '-'}
+
+
+def callback_guard(action: str):
+    """
+    Centraliza o tratamento de erros dos handlers de callback: registra a
+    exceção e avisa o usuário com a mensagem de erro da ação.
+    
+    Args:
+        action: Ação do handler (match|gallery|favorite|info|comments)
+    """
+    error_text = _ERROR_TEXTS.get(action, "Erro ao processar ação.")
+    
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(self, callback: CallbackQuery, *args, **kwargs):
+            try:
+                return await fn(self, callback, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"Erro ao processar {action}: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
+                await self._reply(callback, error_text)
+        return wrapper
+    return decorator
+
 
 class PostInteractionHandlerV2:
     """
@@ -63,6 +125,39 @@ class PostInteractionHandlerV2:
         self.antispam = get_antispam_service()
         self.idempotency = get_idempotency_service()
         
+        # Cache curto de usuários (autores de comentários, cards de info)
+        self._user_cache = TTLCache(maxsize=10_000, ttl=60)
+        
+        # Cards de info já renderizados por (autor, versão do perfil)
+        self._info_card_cache = TTLCache(maxsize=4096, ttl=60)
+        
+        # Galerias por autor: (texto, post_ids, has_more); invalidadas a cada novo post do autor
+        self._gallery_cache = TTLCache(maxsize=2048, ttl=30)
+        post_service.add_post_created_listener(self._invalidate_gallery)
+        
+        # Cache curtíssimo de posts: toques em sequência compartilham a mesma leitura
+        self._post_cache = TTLCache(maxsize=512, ttl=3)
+        self._post_locks = defaultdict(asyncio.Lock)
+        
+        # Fila de DMs: callbacks respondem na hora e o envio segue em ritmo controlado
+        self._dm_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self._dm_worker: Optional[asyncio.Task] = None
+        
+        # Referências das tarefas em segundo plano (evita coleta prematura)
+        self._background_tasks = set()
+        
+        # Atualizações de teclado pendentes (uma por post dentro da janela de debounce)
+        self._pending_updates: dict = {}
+        
+        # Tabela de roteamento ação -> handler
+        self._routes = {
+            'match': self.handle_match,
+            'gallery': self.handle_gallery,
+            'favorite': self.handle_favorite,
+            'info': self.handle_info,
+            'comments': self.handle_comments,
+        }
+        
         logger.info("PostInteractionHandlerV2 inicializado")
     
     async def handle_callback(self, callback: CallbackQuery):
@@ -72,33 +167,39 @@ class PostInteractionHandlerV2:
         Args:
             callback: Callback query do Telegram
         """
+        # Responder de imediato: o Telegram para o "carregando" antes de qualquer I/O.
+        # Como só há uma resposta por callback, avisos posteriores seguem por DM (_reply)
+        try:
+            await callback.answer()
+        except TelegramBadRequest as e:
+            logger.debug(f"Callback já respondido/expirado: {e}")
+        
         try:
             callback_data = callback.data
-            user_id = callback.from_user.id
             
-            # Extrair ação
-            action = CallbackExtractor.extract_action(callback_data)
+            # Extrair ação e post_id numa única passada
+            m = PARSE(callback_data)
+            if not m:
+                await self._handle_unknown(callback, None)
+                return
+            action, post_id, author_id = m.groups()
             
             # Rotear para handler específico
-            if action == 'match':
-                await self.handle_match(callback)
-            elif action == 'gallery':
-                await self.handle_gallery(callback)
-            elif action == 'favorite':
-                await self.handle_favorite(callback)
-            elif action == 'info':
-                await self.handle_info(callback)
-            elif action == 'comments':
-                await self.handle_comments(callback)
-            else:
-                logger.warning(f"Ação desconhecida: {action}")
-                await callback.answer("Ação não reconhecida.", show_alert=True)
+            await self._routes.get(action, self._handle_unknown)(
+                callback, post_id, int(author_id, 36) if author_id else None
+            )
                 
         except Exception as e:
-            logger.error(f"Erro ao processar callback: {e}", exc_info=True)
-            await callback.answer("Erro ao processar ação. Tente novamente.", show_alert=True)
+            logger.error(f"Erro ao processar callback: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
+            await self._reply(callback, "Erro ao processar ação. Tente novamente.")
+    
+    async def _handle_unknown(self, callback: CallbackQuery, post_id: str, author_id: Optional[int] = None):
+        """Fallback para ações sem handler registrado."""
+        logger.warning(f"Ação desconhecida: {callback.data}")
+        await self._reply(callback, "Ação não reconhecida.")
     
-    async def handle_match(self, callback: CallbackQuery):
+    @callback_guard('match')
+    async def handle_match(self, callback: CallbackQuery, post_id: str, author_id: Optional[int] = None):
         """
         Processa match em um post.
         
@@ -107,149 +208,148 @@ class PostInteractionHandlerV2:
         - Idempotência (não permite match duplicado)
         - Antispam (1 match a cada 30s por alvo)
         """
-        try:
-            callback_data = callback.data
-            user_id = callback.from_user.id
-            
-            # Extrair post_id
-            post_id = CallbackExtractor.extract_post_id(callback_data)
-            
-            # Obter post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await callback.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            author_id = int(post['author_id'])
-            
-            # Validação: não pode dar match em si mesmo
-            if user_id == author_id:
-                await callback.answer(
-                    "❌ Você não pode dar match no seu próprio post.",
-                    show_alert=True
-                )
-                logger.warning(f"error.forbidden user={user_id} action=match_self post={post_id}")
-                return
-            
-            # Antispam: 1 match a cada 30s por alvo
-            allowed, retry_after = self.antispam.check_and_consume(
-                user_id=user_id,
-                action='match',
-                scope_key=f"target_{author_id}"
+        user_id = callback.from_user.id
+        
+        # Autor embutido no callback: bloqueia auto-match sem consultar o banco
+        if author_id is not None and user_id == author_id:
+            await self._reply(
+                callback,
+                "❌ Você não pode dar match no seu próprio post."
             )
-            
-            if not allowed:
-                await callback.answer(
-                    f"⏳ Aguarde {retry_after:.0f}s antes de dar match novamente.",
-                    show_alert=True
-                )
-                logger.warning(f"error.rate_limit user={user_id} action=match retry_after={retry_after}")
-                return
-            
-            # Idempotência: verificar se já existe match
-            idempotency_key = f"match:{user_id}:{author_id}:post_{post_id}"
-            
-            async def create_match_fn():
-                # Criar match
-                match_id = await self.match_service.create(
-                    initiator_id=user_id,
-                    target_id=author_id,
-                    post_id=post_id
-                )
-                
-                # Incrementar contador
-                await self.post_service.increment_stat(post_id, 'matches')
-                
-                # Notificar partes
-                await self.match_service.notify_parties(match_id)
-                
-                return match_id
-            
-            executed, match_id = await self.idempotency.run_once(
-                key=idempotency_key,
-                fn=create_match_fn,
-                ttl=120
+            logger.warning(f"error.forbidden user={user_id} action=match_self post={post_id}")
+            return
+        
+        # Obter post
+        post = await self._get_post_cached(post_id)
+        if not post:
+            await self._reply(callback, "❌ Post não encontrado.")
+            return
+        
+        author_id = post['author_id']
+        
+        # Validação: não pode dar match em si mesmo
+        if user_id == author_id:
+            await self._reply(
+                callback,
+                "❌ Você não pode dar match no seu próprio post."
             )
-            
-            if not executed:
-                await callback.answer(
-                    "✅ Você já deu match neste usuário!",
-                    show_alert=False
-                )
-                logger.info(f"error.already_exists user={user_id} action=match post={post_id}")
-                return
-            
-            # Sucesso
-            await callback.answer(
-                "❤️ Match enviado! Você será notificado se houver reciprocidade.",
-                show_alert=False
+            logger.warning(f"error.forbidden user={user_id} action=match_self post={post_id}")
+            return
+        
+        # Antispam: 1 match a cada 30s por alvo
+        allowed, retry_after = self.antispam.check_and_consume(
+            user_id=user_id,
+            action='match',
+            scope_key=f"target_{author_id}"
+        )
+        
+        if not allowed:
+            await self._reply(
+                callback,
+                f"⏳ Aguarde {retry_after:.0f}s antes de dar match novamente."
+            )
+            logger.warning(f"error.rate_limit user={user_id} action=match retry_after={retry_after}")
+            return
+        
+        # Idempotência: verificar se já existe match
+        idempotency_key = f"match:{user_id}:{author_id}:post_{post_id}"
+        
+        async def create_match_fn():
+            # Criar match
+            match_id = await self.match_service.create(
+                initiator_id=user_id,
+                target_id=author_id,
+                post_id=post_id
             )
             
-            logger.info(f"match.created match_id={match_id} initiator={user_id} target={author_id} post={post_id}")
+            # Contador e notificação em segundo plano: não atrasam a resposta
+            self._spawn(self.post_service.increment_stat(post_id, 'matches'), 'increment_stat')
+            self._spawn(self.match_service.notify_parties(match_id), 'notify_parties')
             
-        except Exception as e:
-            logger.error(f"Erro ao processar match: {e}", exc_info=True)
-            await callback.answer("Erro ao processar match.", show_alert=True)
+            return match_id
+        
+        executed, match_id = await self.idempotency.run_once(
+            key=idempotency_key,
+            fn=create_match_fn,
+            ttl=120
+        )
+        
+        if not executed:
+            await self._reply(
+                callback,
+                "✅ Você já deu match neste usuário!"
+            )
+            logger.info(f"error.already_exists user={user_id} action=match post={post_id}")
+            return
+        
+        # Sucesso
+        await self._reply(
+            callback,
+            "❤️ Match enviado! Você será notificado se houver reciprocidade."
+        )
+        
+        logger.info(f"match.created match_id={match_id} initiator={user_id} target={author_id} post={post_id}")
     
-    async def handle_gallery(self, callback: CallbackQuery):
+    @callback_guard('gallery')
+    async def handle_gallery(self, callback: CallbackQuery, post_id: str, author_id: Optional[int] = None):
         """
         Mostra galeria do autor do post.
         """
-        try:
-            callback_data = callback.data
-            user_id = callback.from_user.id
-            
-            # Extrair post_id
-            post_id = CallbackExtractor.extract_post_id(callback_data)
-            
-            # Obter post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await callback.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            author_id = int(post['author_id'])
-            
+        user_id = callback.from_user.id
+        
+        # Obter post
+        post = await self._get_post_cached(post_id)
+        if not post:
+            await self._reply(callback, "❌ Post não encontrado.")
+            return
+        
+        author_id = post['author_id']
+        
+        # Galeria do autor (cache curto, invalidado quando o autor publica)
+        gallery = self._gallery_cache.get(author_id)
+        if gallery is None:
             # Obter posts do autor
             author_posts = await self.post_service.get_user_posts(author_id, limit=10)
             
             if not author_posts:
-                await callback.answer(
-                    "Este usuário ainda não tem posts na galeria.",
-                    show_alert=True
+                await self._reply(
+                    callback,
+                    "Este usuário ainda não tem posts na galeria."
                 )
                 return
             
             # Obter dados do autor
-            author = await self.user_service.get_user(author_id)
-            codename = author.get('codename', 'Anônimo') if author else 'Anônimo'
+            codename = self._codename(await self._get_user_cached(author_id))
             
-            # Criar teclado de galeria
-            post_ids = [p['id'] for p in author_posts]
-            keyboard = self.ui_builder.create_gallery_keyboard(
-                user_id=user_id,
-                posts=post_ids,
-                page=0,
-                has_more=len(author_posts) >= 10
-            )
-            
-            # Enviar no DM
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=f"🖼️ <b>Galeria de {codename}</b>\n\nTotal de posts: {len(author_posts)}",
-                parse_mode='HTML',
-                reply_markup=keyboard
+            gallery = (
+                f"🖼️ <b>Galeria de {html.escape(codename)}</b>\n\nTotal de posts: {len(author_posts)}",
+                [p['id'] for p in author_posts],
+                len(author_posts) >= 10
             )
-            
-            await callback.answer("Galeria enviada no privado!", show_alert=False)
-            
-            logger.info(f"gallery.opened user={user_id} author={author_id} post={post_id}")
-            
-        except Exception as e:
-            logger.error(f"Erro ao abrir galeria: {e}", exc_info=True)
-            await callback.answer("Erro ao abrir galeria.", show_alert=True)
+            self._gallery_cache.set(author_id, gallery)
+        
+        text, post_ids, has_more = gallery
+        
+        # Criar teclado de galeria
+        keyboard = self.ui_builder.create_gallery_keyboard(
+            user_id=user_id,
+            posts=post_ids,
+            page=0,
+            has_more=has_more
+        )
+        
+        # Enviar no DM (via fila)
+        await self._enqueue_dm(
+            chat_id=user_id,
+            text=text,
+            parse_mode='HTML',
+            reply_markup=keyboard
+        )
+        
+        logger.info(f"gallery.opened user={user_id} author={author_id} post={post_id}")
     
-    async def handle_favorite(self, callback: CallbackQuery):
+    @callback_guard('favorite')
+    async def handle_favorite(self, callback: CallbackQuery, post_id: str, author_id: Optional[int] = None):
         """
         Adiciona post aos favoritos.
         
@@ -257,194 +357,153 @@ class PostInteractionHandlerV2:
         - Bloqueia favoritar próprio post
         - Idempotência (não permite favoritar duas vezes)
         """
-        try:
-            callback_data = callback.data
-            user_id = callback.from_user.id
-            
-            # Extrair post_id
-            post_id = CallbackExtractor.extract_post_id(callback_data)
-            
-            # Obter post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await callback.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            author_id = int(post['author_id'])
-            
-            # Validação: não pode favoritar próprio post
-            if user_id == author_id:
-                await callback.answer(
-                    "❌ Você não pode favoritar seu próprio post.",
-                    show_alert=True
-                )
-                logger.warning(f"error.forbidden user={user_id} action=favorite_self post={post_id}")
-                return
-            
-            # Idempotência: verificar se já favoritou
-            idempotency_key = f"favorite:{user_id}:post_{post_id}"
-            
-            async def add_favorite_fn():
-                # Adicionar aos favoritos do usuário
-                await self.user_service.favorite_post(user_id, post_id)
-                
-                # Incrementar contador (apenas na primeira vez)
-                await self.post_service.increment_stat(post_id, 'favorites')
-                
-                return True
-            
-            executed, _ = await self.idempotency.run_once(
-                key=idempotency_key,
-                fn=add_favorite_fn,
-                ttl=120
+        user_id = callback.from_user.id
+        
+        # Autor embutido no callback: bloqueia auto-favorito sem consultar o banco
+        if author_id is not None and user_id == author_id:
+            await self._reply(
+                callback,
+                "❌ Você não pode favoritar seu próprio post."
             )
-            
-            if not executed:
-                await callback.answer(
-                    "⭐ Este post já está nos seus favoritos!",
-                    show_alert=False
-                )
-                logger.info(f"error.already_exists user={user_id} action=favorite post={post_id}")
-                return
-            
-            # Sucesso
-            await callback.answer(
-                "⭐ Post adicionado aos favoritos!",
-                show_alert=False
+            logger.warning(f"error.forbidden user={user_id} action=favorite_self post={post_id}")
+            return
+        
+        # Obter post
+        post = await self._get_post_cached(post_id)
+        if not post:
+            await self._reply(callback, "❌ Post não encontrado.")
+            return
+        
+        author_id = post['author_id']
+        
+        # Validação: não pode favoritar próprio post
+        if user_id == author_id:
+            await self._reply(
+                callback,
+                "❌ Você não pode favoritar seu próprio post."
             )
+            logger.warning(f"error.forbidden user={user_id} action=favorite_self post={post_id}")
+            return
+        
+        # Idempotência: verificar se já favoritou
+        idempotency_key = f"favorite:{user_id}:post_{post_id}"
+        
+        async def add_favorite_fn():
+            # Adicionar aos favoritos do usuário
+            await self.user_service.favorite_post(user_id, post_id)
             
-            logger.info(f"favorite.added user={user_id} post={post_id}")
+            # Incrementar contador (apenas na primeira vez, em segundo plano)
+            self._spawn(self.post_service.increment_stat(post_id, 'favorites'), 'increment_stat')
             
-        except Exception as e:
-            logger.error(f"Erro ao favoritar: {e}", exc_info=True)
-            await callback.answer("Erro ao favoritar post.", show_alert=True)
+            return True
+        
+        executed, _ = await self.idempotency.run_once(
+            key=idempotency_key,
+            fn=add_favorite_fn,
+            ttl=120
+        )
+        
+        if not executed:
+            await self._reply(
+                callback,
+                "⭐ Este post já está nos seus favoritos!"
+            )
+            logger.info(f"error.already_exists user={user_id} action=favorite post={post_id}")
+            return
+        
+        # Sucesso
+        await self._reply(
+            callback,
+            "⭐ Post adicionado aos favoritos!"
+        )
+        
+        logger.info(f"favorite.added user={user_id} post={post_id}")
     
-    async def handle_info(self, callback: CallbackQuery):
+    @callback_guard('info')
+    async def handle_info(self, callback: CallbackQuery, post_id: str, author_id: Optional[int] = None):
         """
         Mostra informações do autor do post.
         """
-        try:
-            callback_data = callback.data
-            user_id = callback.from_user.id
-            
-            # Extrair post_id
-            post_id = CallbackExtractor.extract_post_id(callback_data)
-            
-            # Obter post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await callback.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            author_id = int(post['author_id'])
-            
-            # Obter dados do autor
-            author = await self.user_service.get_user(author_id)
-            if not author:
-                await callback.answer("❌ Autor não encontrado.", show_alert=True)
-                return
-            
-            # Montar card de informações
-            codename = author.get('codename', 'Anônimo')
-            category = author.get('category', 'Usuário')
-            state = author.get('state', 'BR')
-            age = author.get('age', '?')
-            description = author.get('description', 'Sem descrição')
-            
-            # Informações físicas (se disponíveis)
-            physical = author.get('physical', {})
-            height = physical.get('height', '-')
-            hair_color = physical.get('hair_color', '-')
-            eye_color = physical.get('eye_color', '-')
-            endowment = physical.get('endowment', '-')
-            
-            info_text = (
-                f"👤 <b>{codename}</b>\n\n"
-                f"📍 {category} | {state}\n"
-                f"🎂 Idade: {age}\n\n"
-                f"💬 <b>Bio:</b>\n{description}\n\n"
-                f"📏 <b>Físico:</b>\n"
-                f"• Altura: {height}\n"
-                f"• Cabelo: {hair_color}\n"
-                f"• Olhos: {eye_color}\n"
-            )
-            
-            # Adicionar "dote" se aplicável
-            if endowment and endowment != '-':
-                info_text += f"• Dote: {endowment}\n"
-            
-            # Enviar no DM
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=info_text,
-                parse_mode='HTML'
-            )
-            
-            await callback.answer("Informações enviadas no privado!", show_alert=False)
-            
-            logger.info(f"info.opened user={user_id} author={author_id} post={post_id}")
-            
-        except Exception as e:
-            logger.error(f"Erro ao mostrar info: {e}", exc_info=True)
-            await callback.answer("Erro ao obter informações.", show_alert=True)
+        user_id = callback.from_user.id
+        
+        # Obter post
+        post = await self._get_post_cached(post_id)
+        if not post:
+            await self._reply(callback, "❌ Post não encontrado.")
+            return
+        
+        author_id = post['author_id']
+        
+        # Obter dados do autor
+        author = await self._get_user_cached(author_id)
+        if not author:
+            await self._reply(callback, "❌ Autor não encontrado.")
+            return
+        
+        # Card já renderizado para esta versão do perfil? (edições geram nova chave)
+        card_key = (author_id, self._info_card_version(author))
+        info_text = self._info_card_cache.get(card_key)
+        if info_text is None:
+            info_text = self._render_info_card(author)
+            self._info_card_cache.set(card_key, info_text)
+        
+        # Enviar no DM (via fila)
+        await self._enqueue_dm(
+            chat_id=user_id,
+            text=info_text,
+            parse_mode='HTML'
+        )
+        
+        logger.info(f"info.opened user={user_id} author={author_id} post={post_id}")
     
-    async def handle_comments(self, callback: CallbackQuery):
+    @callback_guard('comments')
+    async def handle_comments(self, callback: CallbackQuery, post_id: str, author_id: Optional[int] = None):
         """
         Mostra comentários do post.
         """
-        try:
-            callback_data = callback.data
-            user_id = callback.from_user.id
-            
-            # Extrair post_id
-            post_id = CallbackExtractor.extract_post_id(callback_data)
-            
-            # Obter post
-            post = await self.post_service.get_post(post_id)
-            if not post:
-                await callback.answer("❌ Post não encontrado.", show_alert=True)
-                return
-            
-            # Obter comentários (últimos 5)
-            comments = await self._get_comments(post_id, limit=5)
-            
-            # Montar texto
-            comments_count = post.get('stats', {}).get('comments', 0)
-            
-            if not comments:
-                text = f"💭 <b>Comentários ({comments_count})</b>\n\nAinda não há comentários neste post."
-            else:
-                text = f"💭 <b>Comentários ({comments_count})</b>\n\n"
-                
-                for comment in comments:
-                    author_id = int(comment['author_id'])
-                    author = await self.user_service.get_user(author_id)
-                    codename = author.get('codename', 'Anônimo') if author else 'Anônimo'
-                    
-                    text += f"<b>{codename}:</b> {comment['text']}\n\n"
-            
-            # Criar teclado
-            keyboard = self.ui_builder.create_comments_keyboard(
-                post_id=post_id,
-                has_more=len(comments) >= 5,
-                page=0
-            )
-            
-            # Enviar no DM
-            await self.bot.send_message(
-                chat_id=user_id,
-                text=text,
-                parse_mode='HTML',
-                reply_markup=keyboard
+        user_id = callback.from_user.id
+        
+        # Obter post
+        post = await self._get_post_cached(post_id)
+        if not post:
+            await self._reply(callback, "❌ Post não encontrado.")
+            return
+        
+        # Obter comentários (últimos 5)
+        comments = await self._get_comments(post_id, limit=5)
+        
+        # Montar texto
+        comments_count = post.get('stats', {}).get('comments', 0)
+        
+        if not comments:
+            text = f"💭 <b>Comentários ({comments_count})</b>\n\nAinda não há comentários neste post."
+        else:
+            # Buscar autores únicos numa única consulta em lote (com cache)
+            author_ids = {int(comment['author_id']) for comment in comments}
+            authors = await self._get_users_cached(author_ids)
+            
+            text = f"💭 <b>Comentários ({comments_count})</b>\n\n" + "".join(
+                f"<b>{html.escape(self._codename(authors.get(int(comment['author_id']))))}:</b> "
+                f"{html.escape(comment['text'])}\n\n"
+                for comment in comments
             )
-            
-            await callback.answer("Comentários enviados no privado!", show_alert=False)
-            
-            logger.info(f"comments.opened user={user_id} post={post_id}")
-            
-        except Exception as e:
-            logger.error(f"Erro ao mostrar comentários: {e}", exc_info=True)
-            await callback.answer("Erro ao obter comentários.", show_alert=True)
+        
+        # Criar teclado
+        keyboard = self.ui_builder.create_comments_keyboard(
+            post_id=post_id,
+            has_more=len(comments) >= 5,
+            page=0
+        )
+        
+        # Enviar no DM (via fila)
+        await self._enqueue_dm(
+            chat_id=user_id,
+            text=text,
+            parse_mode='HTML',
+            reply_markup=keyboard
+        )
+        
+        logger.info(f"comments.opened user={user_id} post={post_id}")
     
     async def handle_comment_write(self, message: Message, post_id: str):
         """
@@ -482,8 +541,8 @@ class PostInteractionHandlerV2:
             # Adicionar comentário
             comment_id = await self.post_service.add_comment(post_id, user_id, text)
             
-            # Atualizar teclado do post no grupo (se necessário)
-            await self._update_post_keyboard(post_id)
+            # Atualizar teclado do post no grupo (agrupado por post)
+            self._schedule_update(post_id)
             
             await message.reply(
                 "✅ Comentário adicionado com sucesso!"
@@ -492,29 +551,206 @@ class PostInteractionHandlerV2:
             logger.info(f"comment.added user={user_id} post={post_id} comment={comment_id}")
             
         except Exception as e:
-            logger.error(f"Erro ao adicionar comentário: {e}", exc_info=True)
+            logger.error(f"Erro ao adicionar comentário: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
             await message.reply("Erro ao adicionar comentário.")
     
+    def _spawn(self, coro, what: str):
+        """Dispara uma corrotina em segundo plano, registrando falhas no log."""
+        task = asyncio.create_task(self._log_exc(coro, what))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    @staticmethod
+    async def _log_exc(coro, what: str):
+        """Aguarda a corrotina e registra a exceção, se houver."""
+        try:
+            await coro
+        except Exception as e:
+            logger.error(f"Erro em tarefa de segundo plano ({what}): {e}")
+    
+    async def _reply(self, callback: CallbackQuery, text: str):
+        """
+        Envia aviso ao usuário por DM (o callback já foi respondido no roteador).
+        
+        Args:
+            callback: Callback query de origem
+            text: Texto do aviso
+        """
+        await self._enqueue_dm(chat_id=callback.from_user.id, text=text)
+    
+    async def _enqueue_dm(self, **message):
+        """
+        Enfileira uma DM para o worker; com a fila cheia, envia diretamente.
+        
+        Args:
+            **message: Argumentos de bot.send_message
+        """
+        if self._dm_worker is None or self._dm_worker.done():
+            self._dm_worker = asyncio.create_task(self._dm_loop())
+        
+        try:
+            self._dm_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Fila de DMs cheia; enviando diretamente")
+            await self.bot.send_message(**message)
+    
+    async def _dm_loop(self):
+        """Worker que envia as DMs enfileiradas respeitando DM_SEND_RATE."""
+        while True:
+            message = await self._dm_queue.get()
+            try:
+                await self.bot.send_message(**message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao enviar DM para {message.get('chat_id')}: {e}")
+            finally:
+                self._dm_queue.task_done()
+            await asyncio.sleep(1 / DM_SEND_RATE)
+    
+    def _invalidate_gallery(self, author_id: int):
+        """Descarta a galeria em cache do autor (chamado pelo PostServiceV2 ao criar post)."""
+        self._gallery_cache.pop(int(author_id), None)
+    
+    async def _get_post_cached(self, post_id: str):
+        """Obtém post via cache TTL; leituras concorrentes do mesmo post aguardam uma única consulta."""
+        post = self._post_cache.get(post_id)
+        if post is not None:
+            return post
+        
+        async with self._post_locks[post_id]:
+            post = self._post_cache.get(post_id)
+            if post is None:
+                post = await self.post_service.get_post(post_id)
+                if post:
+                    self._post_cache.set(post_id, post)
+        
+        # Quem ainda aguarda mantém a referência ao lock; novas chamadas já encontram o cache
+        self._post_locks.pop(post_id, None)
+        return post
+    
+    async def _get_user_cached(self, user_id: int):
+        """Obtém usuário via cache TTL, consultando o user_service só em caso de miss."""
+        user = self._user_cache.get(user_id)
+        if user is None:
+            user = await self.user_service.get_user(user_id)
+            if user:
+                self._user_cache.set(user_id, user)
+        return user
+    
+    async def _get_users_cached(self, user_ids: set) -> dict:
+        """Obtém vários usuários: cache TTL primeiro, faltantes via uma busca em lote."""
+        users = {user_id: self._user_cache.get(user_id) for user_id in user_ids}
+        missing = {user_id for user_id, user in users.items() if user is None}
+        if missing:
+            fetched = await self.user_service.get_users_bulk(missing)
+            for user_id, user in fetched.items():
+                self._user_cache.set(user_id, user)
+            users.update(fetched)
+        return users
+    
+    @staticmethod
+    def _info_card_version(author) -> tuple:
+        """Versão do perfil para o cache do card: os campos exibidos (não há updated_at no usuário)."""
+        physical = author.get('physical') or {}
+        return (
+            tuple(author.get(key) for key in _INFO_DEFAULTS)
+            + tuple(physical.get(key) for key in _PHYSICAL_DEFAULTS)
+        )
+    
+    @staticmethod
+    def _render_info_card(author) -> str:
+        """Renderiza o card de info do autor, escapando os campos dinâmicos para HTML."""
+        # Físico tem precedência nos campos físicos
+        physical = author.get('physical', {})
+        row = ChainMap(
+            {key: physical.get(key, default) for key, default in _PHYSICAL_DEFAULTS.items()},
+            author,
+            _INFO_DEFAULTS
+        )
+        safe = {key: html.escape(str(row[key])) for key in (*_INFO_DEFAULTS, *_PHYSICAL_DEFAULTS)}
+        endowment = row['endowment']
+        
+        # Adicionar "dote" se aplicável
+        dote = f"• Dote: {safe['endowment']}\n" if endowment and endowment != '-' else ""
+        return _INFO_TEMPLATE.format_map(safe) + dote
+    
+    @staticmethod
+    def _codename(author) -> str:
+        """Codinome do autor ou 'Anônimo'."""
+        return author.get('codename', 'Anônimo') if author else 'Anônimo'
+    
     async def _get_comments(self, post_id: str, limit: int = 5) -> list:
         """Obtém comentários de um post."""
         try:
             comments_ref = self.post_service.db.collection('comments').document(post_id).collection('items')
-            query = comments_ref.order_by('created_at', direction='DESCENDING').limit(limit)
-            
-            docs = query.stream()
-            
-            comments = []
-            for doc in docs:
-                comment_data = doc.to_dict()
-                comment_data['id'] = doc.id
-                comments.append(comment_data)
+            # Projeção: só os campos usados na listagem trafegam
+            query = (
+                comments_ref
+                .order_by('created_at', direction='DESCENDING')
+                .select(['text', 'author_id', 'created_at'])
+                .limit(limit)
+            )
             
-            return comments
+            # O cliente do Admin SDK é síncrono: iterar o stream numa thread
+            # para não bloquear o event loop durante a leitura
+            return await asyncio.to_thread(self._read_comments, query)
             
         except Exception as e:
-            logger.error(f"Erro ao obter comentários: {e}", exc_info=True)
+            logger.error(f"Erro ao obter comentários: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
             return []
     
+    def _schedule_update(self, post_id: str):
+        """
+        Agenda no máximo uma atualização de teclado por post a cada
+        KEYBOARD_UPDATE_DEBOUNCE segundos; chamadas dentro da janela são ignoradas.
+        
+        Args:
+            post_id: ID do post
+        """
+        if post_id in self._pending_updates:
+            return
+        self._pending_updates[post_id] = asyncio.create_task(self._debounced_update(post_id))
+    
+    async def _debounced_update(self, post_id: str):
+        """Aguarda a janela de debounce e atualiza o teclado com os contadores finais."""
+        try:
+            await asyncio.sleep(KEYBOARD_UPDATE_DEBOUNCE)
+        finally:
+            # Liberar a janela antes de ler os contadores: interações durante a
+            # atualização agendam uma nova em vez de se perderem
+            self._pending_updates.pop(post_id, None)
+        await self._update_post_keyboard(post_id)
+    
+    @staticmethod
+    def _read_comments(query) -> list:
+        """Materializa os documentos da consulta de comentários (executa fora do event loop)."""
+        comments = []
+        for doc in query.stream():
+            comment_data = doc.to_dict()
+            comment_data['id'] = doc.id
+            comments.append(comment_data)
+        return comments
+    
+    async def _edit_channel(self, channel: dict, keyboard):
+        """
+        Atualiza o teclado do post em um espelho.
+        
+        Args:
+            channel: Entrada de telegram.channels
+            keyboard: Novo teclado
+        """
+        # Se for album+panel, atualizar o painel
+        message_id = channel.get('panel_message_id') or channel['message_id']
+        try:
+            await self.bot.edit_message_reply_markup(
+                chat_id=channel['chat_id'],
+                message_id=message_id,
+                reply_markup=keyboard
+            )
+        except TelegramBadRequest as e:
+            logger.warning(f"Não foi possível atualizar teclado no {channel['channel']}: {e}")
+    
     async def _update_post_keyboard(self, post_id: str):
         """
         Atualiza teclado do post no grupo após mudança de contador.
@@ -536,42 +772,20 @@ class PostInteractionHandlerV2:
                 post_id=post_id,
                 counts=counts,
                 viewer_user_id=0,
-                current_index=post.get('telegram', {}).get('last_media_index', 0),
-                total_media=len(post.get('media', []))
+                current_index=post['telegram'].get('last_media_index', 0),
+                total_media=len(post.get('media', [])),
+                author_id=post['author_id']
             )
             
-            # Atualizar nos grupos
-            telegram_data = post.get('telegram', {})
-            
-            # Freemium
-            freemium = telegram_data.get('freemium', {})
-            if freemium.get('chat_id') and freemium.get('message_id'):
-                try:
-                    # Se for album+panel, atualizar o painel
-                    message_id = freemium.get('panel_message_id') or freemium.get('message_id')
-                    
-                    await self.bot.edit_message_reply_markup(
-                        chat_id=freemium['chat_id'],
-                        message_id=message_id,
-                        reply_markup=keyboard
-                    )
-                except TelegramBadRequest as e:
-                    logger.warning(f"Não foi possível atualizar teclado no Freemium: {e}")
-            
-            # Premium
-            premium = telegram_data.get('premium', {})
-            if premium.get('chat_id') and premium.get('message_id'):
-                try:
-                    message_id = premium.get('panel_message_id') or premium.get('message_id')
-                    
-                    await self.bot.edit_message_reply_markup(
-                        chat_id=premium['chat_id'],
-                        message_id=message_id,
-                        reply_markup=keyboard
-                    )
-                except TelegramBadRequest as e:
-                    logger.warning(f"Não foi possível atualizar teclado no Premium: {e}")
-                    
+            # Atualizar em todos os espelhos em paralelo
+            tasks = [
+                self._edit_channel(channel, keyboard)
+                for channel in post['telegram'].get('channels', [])
+                if channel.get('chat_id') and channel.get('message_id')
+            ]
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+                
         except Exception as e:
-            logger.error(f"Erro ao atualizar teclado do post: {e}", exc_info=True)
+            logger.error(f"Erro ao atualizar teclado do post: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
 
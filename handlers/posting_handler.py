@@ -6,11 +6,18 @@ Implementa todo o processo de criação, edição e publicação de posts.
 import logging
 import config
 import asyncio
-import html
+import re
 import time
+import uuid
+from functools import lru_cache
+from operator import itemgetter
 from constants.user_states import UserStates
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Callable, Optional
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery, Message
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import InputMediaPhoto as AIOInputMediaPhoto, InputMediaVideo as AIOInputMediaVideo
 
 from services.user_service import UserService
@@ -20,6 +27,7 @@ from services.media_service import MediaService
 from services.draft_repo import DraftRepo
 from utils.ui_builder import UIBuilder, build_anonymous_label, create_post_interaction_keyboard, create_post_preview_keyboard
 from utils.error_handler import ErrorHandler
+from utils.ttl_cache import TTLCache
 from constants.callbacks import PostingCallbacks
 
 logger = logging.getLogger(__name__)
@@ -27,6 +35,196 @@ logger = logging.getLogger(__name__)
 # Estados da conversa de postagem
 WAITING_CONTENT, WAITING_TITLE, WAITING_DESCRIPTION, WAITING_MEDIA, PREVIEW_POST, MONETIZATION_SETUP = range(6)
 
+# Escape HTML em uma única passada (mesmo resultado de html.escape com quote=True)
+_HTML_ESCAPE_TBL = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+
+_FILE_ID = itemgetter('file_id')
+
+# Prefixos dos callbacks com sufixo (tipo, draft_id, preço), testados em uma só passada
+_PREFIX_RE = re.compile(
+    r'(?P<type>post_type_)|(?P<publish>post_publish:)|(?P<cancel>post_cancel:)'
+    r'|(?P<price>monetize_price_|monetize_custom)|(?P<monetize>post_monetize)|(?P<preview>post_preview)'
+)
+
+# Sessões de postagem abandonadas expiram após SESSION_TTL segundos sem uso
+SESSION_TTL = 30 * 60
+MAX_SESSIONS = 10_000
+
+# Janela de agrupamento das gravações de rascunho (segundos)
+DRAFT_FLUSH_DELAY = 0.2
+
+# Teclados estáticos do fluxo (imutáveis, criados uma única vez)
+_POST_TYPE_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📷 Post com Imagem", callback_data="post_type_image")],
+    [InlineKeyboardButton(text="📹 Post com Vídeo", callback_data="post_type_video")],
+    [InlineKeyboardButton(text="📝 Post Apenas Texto", callback_data="post_type_text")],
+    [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)],
+])
+_CANCEL_ONLY_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
+])
+_SKIP_DESC_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="⏭️ Pular Descrição", callback_data="skip_description")],
+    [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
+])
+_SKIP_MEDIA_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="⏭️ Pular Mídia", callback_data="skip_media")],
+    [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
+])
+_CANCEL_OR_SKIP_MEDIA_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)],
+    [InlineKeyboardButton(text="⏭️ Pular Mídia", callback_data="skip_media")]
+])
+_CONTINUE_OR_CANCEL_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="➡️ Continuar", callback_data="continue_to_preview")],
+    [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
+])
+_MAIN_MENU_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🏠 Menu Principal", callback_data="main_menu")]
+])
+_MONETIZE_TEXT = (
+    "💰 <b>Configurar Monetização</b>\n\n"
+    "Este conteúdo será exclusivo para assinantes Premium.\n\n"
+    "Escolha o valor que deseja cobrar pelo acesso avulso:"
+)
+# (texto, callback sem o sufixo :draft_id) de cada linha do teclado de monetização
+_MONETIZE_BUTTONS = (
+    ("R$ 2,99", "monetize_price_2.99"),
+    ("R$ 4,99", "monetize_price_4.99"),
+    ("R$ 9,99", "monetize_price_9.99"),
+    ("R$ 19,99", "monetize_price_19.99"),
+    ("💰 Valor Personalizado", "monetize_custom"),
+    ("🔙 Voltar", "post_preview"),
+    ("❌ Cancelar", "post_cancel"),
+)
+_MONETIZED_TEXT = (
+    "✅ <b>Monetização configurada!</b>\n\n"
+    "💰 <b>Preço:</b> R$ {price:.2f}\n\n"
+    "Seu conteúdo será exclusivo para assinantes Premium."
+)
+_CUSTOM_PRICE_TEXT = (
+    "💰 <b>Valor Personalizado</b>\n\n"
+    "Digite o valor que deseja cobrar (ex: 15.99):\n\n"
+    "⚠️ <i>Valores entre R$ 0,99 e R$ 99,99</i>"
+)
+_CANCEL_TEXT = (
+    "❌ <b>Criação de post cancelada.</b>\n\n"
+    "Você pode criar um novo post a qualquer momento!"
+)
+
+def _default_monetization() -> dict:
+    return {'enabled': False, 'price': 0, 'currency': 'BRL'}
+
+
+@dataclass(slots=True)
+class PostingSession:
+    """Estado em memória de um post em criação."""
+    type: str
+    title: str = ''
+    description: str = ''
+    title_html: str = ''  # title/description já escapados para HTML
+    description_html: str = ''
+    media_files: list = field(default_factory=list)
+    monetization: dict = field(default_factory=_default_monetization)
+    created_at: Optional[float] = None  # epoch; preenchido no primeiro rascunho
+    step: str = 'title'
+    draft_id: Optional[str] = None
+    pending_monetization_draft_id: Optional[str] = None
+    touched_at: float = field(default_factory=time.monotonic)
+    media_handler: Optional[Callable] = None
+    pending_uploads: list = field(default_factory=list)  # [(media_data, asyncio.Task)]
+    can_monetize: bool = False
+
+    def created_datetime(self) -> datetime:
+        """Data de criação para o rascunho, fixada na primeira persistência."""
+        if self.created_at is None:
+            self.created_at = time.time()
+        return datetime.fromtimestamp(self.created_at)
+
+
+@lru_cache(maxsize=4096)
+def _label_html(codename, category, state) -> str:
+    profile = {'codename': codename, 'category': category, 'state_location': state}
+    return build_anonymous_label({'profile': profile}).translate(_HTML_ESCAPE_TBL)
+
+
+def _anonymous_label_html(user_data) -> str:
+    """Etiqueta de anonimização já escapada para HTML, cacheada pelos campos do perfil.
+
+    A chave são os próprios valores do perfil, então mudanças de perfil geram
+    nova entrada sem precisar de invalidação.
+    """
+    profile = (user_data or {}).get('profile') or {}
+    return _label_html(
+        profile.get('codename', 'Anónimo'),
+        profile.get('category', 'Indefinido'),
+        profile.get('state_location', 'BR'),
+    )
+
+
+def _extract_draft_id(callback_data: str) -> Optional[str]:
+    """Sufixo após o último ':' do callback, ou None se não houver."""
+    _, sep, draft_id = callback_data.rpartition(":")
+    return draft_id if sep else None
+
+
+def _publish_shape(post_type: str, file_ids: list, media_files: list):
+    """(content_type, file_id principal, media_files do álbum ou None) para publish_post."""
+    if len(file_ids) > 1:
+        return 'media_group', file_ids[0], media_files
+    if file_ids:
+        return post_type, file_ids[0], None
+    return post_type, None, None
+
+
+def _session_to_draft_payload(session: PostingSession) -> dict:
+    """Documento completo do rascunho a partir da sessão."""
+    return {
+        'type': session.type,
+        'title': session.title,
+        'description': session.description,
+        'title_html': session.title_html,
+        'description_html': session.description_html,
+        'media_files': session.media_files,
+        'monetization': session.monetization,
+        'created_at': session.created_datetime(),
+    }
+
+
+def _consume_upload_result(task: asyncio.Task):
+    """Recupera a exceção de um upload descartado (evita 'Task exception was never retrieved')."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Upload descartado falhou: %s", task.exception())
+
+
+def _discard_uploads(session: Optional[PostingSession]):
+    """Cancela os uploads ainda pendentes de uma sessão que saiu da memória."""
+    if session is None or not session.pending_uploads:
+        return
+    pending = session.pending_uploads
+    session.pending_uploads = []
+    for _, task in pending:
+        task.cancel()
+        task.add_done_callback(_consume_upload_result)
+
+
+def _render_preview(session: PostingSession, footer: str) -> str:
+    """Monta o texto HTML do preview (fragmentos unidos uma única vez)."""
+    parts = [
+        "👀 <b>Preview do seu post:</b>\n\n",
+        f"<b>📝 Título:</b> {session.title_html}\n\n",
+    ]
+    if session.description:
+        parts.append(f"<b>📄 Descrição:</b>\n{session.description_html}\n\n")
+    if session.media_files:
+        parts.append(f"<b>📎 Mídia:</b> {len(session.media_files)} arquivo(s)\n\n")
+    # Mostrar configuração de monetização se ativada
+    if session.monetization['enabled']:
+        parts.append(f"<b>💰 Monetização:</b> R$ {session.monetization['price']:.2f}\n\n")
+    parts.append(footer)
+    return ''.join(parts)
+
+
 class PostingHandler:
     """Handler para o fluxo completo de postagem."""
     
@@ -38,11 +236,53 @@ class PostingHandler:
         self.media_service = media_service or MediaService()
         self.draft_repo = DraftRepo()
         
-        # Sessões de postagem em memória (para compatibilidade)
-        self.posting_sessions = {}
+        # Sessões de postagem em memória, da menos para a mais recentemente usada
+        self.posting_sessions: OrderedDict = OrderedDict()
+        
+        # Cache curto (5s) e limitado de dados do usuário
+        self._user_cache = TTLCache(maxsize=MAX_SESSIONS, ttl=5)
+        
+        # Rascunhos pendentes de gravação (user_id -> (draft_id, payload)), escritos em lote
+        self._pending_drafts: dict = {}
+        self._draft_event = asyncio.Event()
+        self._draft_lock = asyncio.Lock()
+        self._draft_worker = None
+        
+        # Rascunhos recentes ((user_id, draft_id) -> documento), para publicar sem reler o Firestore
+        self._draft_cache = TTLCache(maxsize=4096, ttl=60)
+        
+        # Último conteúdo editado por mensagem ((chat_id, message_id) -> hash), para pular edições repetidas
+        self._last_edits = TTLCache(maxsize=MAX_SESSIONS, ttl=SESSION_TTL)
+        
+        # ConversationHandler legado, criado sob demanda em get_conversation_handler
+        self._conversation_handler = None
         
         # UI Builder
         self.ui_builder = UIBuilder()
+        
+        # Tabelas de roteamento de callbacks, montadas uma única vez
+        self._exact_handlers = {
+            PostingCallbacks.PUBLISH: self._publish_post,
+            PostingCallbacks.CANCEL: self._cancel_post,
+            'continue_to_preview': self._continue_to_preview,
+            'skip_description': self._skip_description,
+            'skip_media': self._skip_media,
+        }
+        # Handler de mídia por tipo de post, fixado na sessão ao criá-la
+        self._media_handlers = {
+            'image': self._handle_photo,
+            'video': self._handle_video,
+        }
+        
+        # Grupos nomeados de _PREFIX_RE -> handler
+        self._prefix_handlers = {
+            'type': self._start_post_creation,
+            'publish': self._publish_post_with_id,
+            'cancel': self._cancel_post_with_id,
+            'price': self._handle_monetization_price,
+            'monetize': self._handle_monetization,
+            'preview': self._preview_from_callback,
+        }
 
     async def start_posting_flow(self, user_id: int):
         """Inicia o fluxo de criação de post via deep link ou menu.
@@ -51,36 +291,32 @@ class PostingHandler:
         e encaminha os próximos passos pelos callbacks de postagem.
         """
         try:
-            # Opcionalmente atualizar estado do usuário para indicar início do fluxo
-            try:
-                await self.user_service.update_user_state(user_id, UserStates.AWAITING_POST_CONTENT)
-            except Exception:
-                logger.debug("Não foi possível atualizar o estado do usuário para AWAITING_POST_CONTENT.")
-
             text = (
-                "📝 **Criar Novo Post**\n\n"
+                "📝 <b>Criar Novo Post</b>\n\n"
                 "Vamos criar seu post! Escolha o tipo de conteúdo:\n\n"
                 "• 📷 Imagem\n"
                 "• 📹 Vídeo\n"
                 "• 📝 Apenas Texto"
             )
 
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="📷 Post com Imagem", callback_data="post_type_image")],
-                [InlineKeyboardButton(text="📹 Post com Vídeo", callback_data="post_type_video")],
-                [InlineKeyboardButton(text="📝 Post Apenas Texto", callback_data="post_type_text")],
-                [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)],
-            ])
-
-            await self.bot.send_message(
-                user_id,
-                text,
-                parse_mode='Markdown',
-                reply_markup=keyboard,
+            # Atualização (opcional) do estado e envio do seletor são independentes
+            state_result, send_result = await asyncio.gather(
+                self.user_service.update_user_state(user_id, UserStates.AWAITING_POST_CONTENT),
+                self.bot.send_message(
+                    user_id,
+                    text,
+                    parse_mode='HTML',
+                    reply_markup=_POST_TYPE_KB,
+                ),
+                return_exceptions=True
             )
+            if isinstance(state_result, Exception):
+                logger.debug("Não foi possível atualizar o estado do usuário para AWAITING_POST_CONTENT.")
+            if isinstance(send_result, BaseException):
+                raise send_result
 
         except Exception as e:
-            logger.error(f"Erro ao iniciar fluxo de postagem para user_id={user_id}: {e}", exc_info=True)
+            logger.error("Erro ao iniciar fluxo de postagem para user_id=%s: %s", user_id, e, exc_info=True)
             try:
                 await self.bot.send_message(user_id, "❌ Erro ao iniciar criação de post. Tente novamente mais tarde.")
             except Exception:
@@ -93,73 +329,25 @@ class PostingHandler:
         
         try:
             # Log estruturado para depuração
-            logger.info(f"📝 POSTING CALLBACK: user_id={user_id}, callback={callback_data}")
+            logger.info("📝 POSTING CALLBACK: user_id=%s, callback=%s", user_id, callback_data)
             
-            if callback_data.startswith('post_type_'):
-                await self._start_post_creation(call, user_id, callback_data)
-                
-            elif callback_data == PostingCallbacks.PUBLISH:
-                logger.info(f"📤 PUBLISH REQUEST: user_id={user_id}")
-                await self._publish_post(call, user_id)
-                
-            elif callback_data.startswith("post_publish:"):
-                logger.info(f"📤 PUBLISH WITH ID REQUEST: user_id={user_id}")
-                await self._publish_post_with_id(call, user_id, callback_data)
-                
-            elif callback_data.startswith(PostingCallbacks.CANCEL):
-                logger.info(f"❌ CANCEL REQUEST: user_id={user_id}")
-                await self._cancel_post(call, user_id)
-                
-            elif callback_data.startswith("post_cancel:"):
-                logger.info(f"❌ CANCEL WITH ID REQUEST: user_id={user_id}")
-                await self._cancel_post_with_id(call, user_id, callback_data)
-                
-            elif callback_data.startswith('post_monetize'):
-                logger.info(f"💰 MONETIZATION REQUEST: user_id={user_id}")
-                await self._handle_monetization(call, user_id, callback_data)
-                
-            elif callback_data.startswith('monetize_price_') or callback_data.startswith('monetize_custom'):
-                logger.info(f"💰 MONETIZATION PRICE: user_id={user_id}, callback={callback_data}")
-                await self._handle_monetization_price(call, user_id, callback_data)
-                
-            elif callback_data == PostingCallbacks.EDIT:
-                logger.info(f"✏️ EDIT REQUEST: user_id={user_id}")
-                await self._edit_post(call, user_id)
-                
-            elif callback_data == PostingCallbacks.DELETE:
-                logger.info(f"🗑️ DELETE REQUEST: user_id={user_id}")
-                await self._delete_post(call, user_id)
-                
-            elif callback_data.startswith('post_preview'):
-                logger.info(f"👀 PREVIEW REQUEST: user_id={user_id}")
-                await self._show_post_preview(call, user_id)
-                
-            elif callback_data == 'post_add_media':
-                logger.info(f"📎 ADD MEDIA REQUEST: user_id={user_id}")
-                await self._add_media_prompt(call, user_id)
-                
-            elif callback_data == 'post_remove_media':
-                logger.info(f"🗑️ REMOVE MEDIA REQUEST: user_id={user_id}")
-                await self._remove_media(call, user_id)
-                
-            elif callback_data == 'continue_to_preview':
-                logger.info(f"➡️ CONTINUE TO PREVIEW REQUEST: user_id={user_id}")
-                await self._continue_to_preview(call, user_id)
-                
-            elif callback_data == 'skip_description':
-                logger.info(f"⏭️ SKIP DESCRIPTION REQUEST: user_id={user_id}")
-                await self._skip_description(call, user_id)
-                
-            elif callback_data == 'skip_media':
-                logger.info(f"⏭️ SKIP MEDIA REQUEST: user_id={user_id}")
-                await self._skip_media(call, user_id)
-                
-            else:
-                logger.warning(f"❓ UNKNOWN POSTING CALLBACK: user_id={user_id}, callback={callback_data}")
-                await call.answer("❌ Ação não reconhecida.", show_alert=True)
+            # Callbacks fixos: uma consulta no dicionário
+            handler = self._exact_handlers.get(callback_data)
+            if handler:
+                await handler(call, user_id)
+                return
+            
+            # Callbacks com sufixo (tipo, draft_id, preço): um único match da regex de prefixos
+            m = _PREFIX_RE.match(callback_data)
+            if m:
+                await self._prefix_handlers[m.lastgroup](call, user_id, callback_data)
+                return
+            
+            logger.warning("❓ UNKNOWN POSTING CALLBACK: user_id=%s, callback=%s", user_id, callback_data)
+            await call.answer("❌ Ação não reconhecida.", show_alert=True)
                 
         except Exception as e:
-            logger.error(f"💥 POSTING CALLBACK ERROR: user_id={user_id}, callback={callback_data}, error={e}", exc_info=True)
+            logger.error("💥 POSTING CALLBACK ERROR: user_id=%s, callback=%s, error=%s", user_id, callback_data, e, exc_info=True)
             await self.error_handler.handle_callback_error(call, "Erro ao processar postagem")
 
     async def handle_post_creation(self, message: Message):
@@ -173,12 +361,12 @@ class PostingHandler:
             user_id = message.from_user.id
 
             # Verificar se há sessão ativa de postagem para o usuário
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
                 # Sem sessão ativa; não interferir com outras funcionalidades (ex.: onboarding)
                 return
 
-            step = session.get('step')
+            step = session.step
 
             # Se recebeu mídia, delegar para o handler de mídia
             if getattr(message, 'photo', None) or getattr(message, 'video', None) or getattr(message, 'document', None):
@@ -195,14 +383,10 @@ class PostingHandler:
                     return
                 elif step == 'media':
                     # Está aguardando mídia mas recebeu texto; orientar usuário
-                    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)],
-                        [InlineKeyboardButton(text="⏭️ Pular Mídia", callback_data="skip_media")]
-                    ])
                     await message.answer(
                         "📎 Neste passo, envie a mídia solicitada (foto/vídeo).\n"
                         "Se preferir, você pode pular a mídia.",
-                        reply_markup=keyboard
+                        reply_markup=_CANCEL_OR_SKIP_MEDIA_KB
                     )
                     return
 
@@ -210,23 +394,158 @@ class PostingHandler:
             return
 
         except Exception as e:
-            logger.error(f"Erro em handle_post_creation: {e}", exc_info=True)
+            logger.error("Erro em handle_post_creation: %s", e, exc_info=True)
             try:
                 await message.answer("❌ Ocorreu um erro ao processar seu conteúdo de postagem.")
             except Exception:
                 pass
 
+    async def _edit_if_changed(self, message: Message, text: str, **kwargs):
+        """Edita a mensagem apenas se texto/teclado mudaram desde a última edição feita aqui.
+
+        Evita a chamada à API (e o erro "message is not modified") em toques repetidos.
+        """
+        key = (message.chat.id, message.message_id)
+        content_hash = hash((text, repr(kwargs.get('reply_markup'))))
+        if self._last_edits.get(key) == content_hash:
+            return
+        try:
+            await message.edit_text(text, **kwargs)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                raise
+        self._last_edits.set(key, content_hash)
+
+    async def _get_user_cached(self, user_id: int):
+        """Dados do usuário com cache de poucos segundos (evita releituras no mesmo fluxo)."""
+        user_data = self._user_cache.get(user_id)
+        if user_data is None:
+            user_data = await self.user_service.get_user_data(user_id)
+            if user_data:
+                self._user_cache.set(user_id, user_data)
+        return user_data
+
+    def _get_session(self, user_id: int) -> Optional[PostingSession]:
+        """Retorna a sessão ativa (renovando seu uso) ou None se ausente/expirada."""
+        session = self.posting_sessions.get(user_id)
+        if session is None:
+            return None
+        now = time.monotonic()
+        if now - session.touched_at > SESSION_TTL:
+            self._drop_session(user_id)
+            return None
+        session.touched_at = now
+        self.posting_sessions.move_to_end(user_id)
+        return session
+
+    def _store_session(self, user_id: int, session: PostingSession):
+        """Registra a sessão, descartando antes as expiradas ou excedentes (mais antigas)."""
+        sessions = self.posting_sessions
+        previous = sessions.pop(user_id, None)
+        if previous is not session:
+            _discard_uploads(previous)
+        deadline = time.monotonic() - SESSION_TTL
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if len(sessions) < MAX_SESSIONS and oldest.touched_at >= deadline:
+                break
+            _discard_uploads(sessions.popitem(last=False)[1])
+        sessions[user_id] = session
+
+    def _drop_session(self, user_id: int):
+        """Remove a sessão do usuário, cancelando uploads que ainda estejam pendentes."""
+        _discard_uploads(self.posting_sessions.pop(user_id, None))
+
+    def _queue_draft(self, user_id: int, draft_id, payload: dict) -> str:
+        """Agenda a gravação do rascunho e retorna o draft_id sem aguardar o Firestore.
+
+        O ID é gerado localmente quando ainda não existe; o worker grava apenas
+        a versão mais recente de cada usuário após DRAFT_FLUSH_DELAY.
+        """
+        draft_id = draft_id or str(uuid.uuid4())
+        self._pending_drafts[user_id] = (draft_id, payload, True)
+        self._draft_cache.set((user_id, draft_id), {'id': draft_id, 'user_id': user_id, 'data': payload})
+        self._wake_draft_worker()
+        return draft_id
+
+    def _queue_draft_patch(self, user_id: int, draft_id: str, fields: dict):
+        """Agenda a atualização parcial de campos do rascunho (ex.: só monetização).
+
+        Se já houver gravação pendente do mesmo rascunho, os campos entram nela.
+        """
+        cached = self._draft_cache.get((user_id, draft_id))
+        if cached:
+            cached['data'].update(fields)
+        entry = self._pending_drafts.get(user_id)
+        if entry and entry[0] == draft_id:
+            entry[1].update(fields)
+            return
+        self._pending_drafts[user_id] = (draft_id, dict(fields), False)
+        self._wake_draft_worker()
+
+    def _wake_draft_worker(self):
+        if self._draft_worker is None or self._draft_worker.done():
+            self._draft_worker = asyncio.create_task(self._draft_loop())
+        self._draft_event.set()
+
+    async def _write_draft(self, user_id: int, draft_id: str, payload: dict, full: bool):
+        if full:
+            await self.draft_repo.create_or_update(user_id, draft_id, payload)
+        else:
+            await self.draft_repo.patch(user_id, draft_id, payload)
+
+    async def _draft_loop(self):
+        """Worker que grava em lote os rascunhos pendentes."""
+        while True:
+            await self._draft_event.wait()
+            await asyncio.sleep(DRAFT_FLUSH_DELAY)
+            self._draft_event.clear()
+            async with self._draft_lock:
+                batch, self._pending_drafts = self._pending_drafts, {}
+                for user_id, (draft_id, payload, full) in batch.items():
+                    try:
+                        await self._write_draft(user_id, draft_id, payload, full)
+                    except Exception as e:
+                        logger.error("Erro ao gravar rascunho %s de %s: %s", draft_id, user_id, e)
+
+    async def _get_draft_cached(self, user_id: int, draft_id: str):
+        """Rascunho pelo cache local (preenchido em _queue_draft) ou, na falta, pelo Firestore."""
+        key = (user_id, draft_id)
+        draft = self._draft_cache.get(key)
+        if draft is None:
+            await self._flush_draft(user_id)
+            draft = await self.draft_repo.get(user_id, draft_id)
+            if draft:
+                self._draft_cache.set(key, draft)
+        return draft
+
+    async def _flush_draft(self, user_id: int):
+        """Grava imediatamente o rascunho pendente do usuário, se houver."""
+        async with self._draft_lock:
+            entry = self._pending_drafts.pop(user_id, None)
+            if entry:
+                await self._write_draft(user_id, *entry)
+
+    async def _discard_pending_draft(self, user_id: int):
+        """Descarta a gravação pendente do rascunho do usuário.
+
+        O lock espera uma gravação do worker já em andamento, para que uma
+        exclusão feita em seguida não seja desfeita por ela.
+        """
+        async with self._draft_lock:
+            self._pending_drafts.pop(user_id, None)
+
     async def _publish_post_final_corrected(self, call, user_id: int):
         """Implementa a lógica de publicação final conforme as instruções da auditoria."""
         try:
-            user_data = await self.user_service.get_user_data(user_id)
+            user_data = await self._get_user_cached(user_id)
             temp_post = user_data.get('temporary_post')
             
             if not temp_post:
                 await call.message.answer("❌ Não foi possível encontrar o conteúdo para publicar. Tente criar novamente.")
                 return False
 
-            # Criar post no Firestore primeiro para obter ID real
+            # Dados do post no Firestore
             post_data = {
                 'title': temp_post.get('title', 'Post sem título'),
                 'description': temp_post.get('text', ''),
@@ -239,11 +558,11 @@ class PostingHandler:
             # Criar post no Firestore e obter ID real
             real_post_id = await self.post_service.create_post(user_id, post_data)
             if not real_post_id:
-                logger.error(f"Falha ao criar post no Firestore para user_id={user_id}")
+                logger.error("Falha ao criar post no Firestore para user_id=%s", user_id)
                 return False
 
-            anonymous_label = build_anonymous_label(user_data)
-            interaction_keyboard = create_post_interaction_keyboard(real_post_id, comment_count=0)
+            anonymous_label = _anonymous_label_html(user_data)
+            interaction_keyboard = create_post_interaction_keyboard(real_post_id, comment_count=0, author_id=user_id)
             
             final_caption = f"{temp_post.get('text', '')}\n\n{anonymous_label}"
             
@@ -253,59 +572,23 @@ class PostingHandler:
                 text=final_caption,
                 file_id=temp_post.get('file_id'),
                 keyboard=interaction_keyboard,
-                target_group='both'  # Publicar em ambos os grupos
+                target_group='both',  # Publicar em ambos os grupos
+                post_id=real_post_id
             )
             
             if publish_result:
-                # Limpar dados temporários apenas se a publicação foi bem-sucedida
-                await self.user_service.update_user_data(user_id, {'temporary_post': None})
-                await self.user_service.set_user_state(user_id, UserStates.IDLE)
+                # Limpar dados temporários e estado numa única escrita (só após sucesso)
+                await self.user_service.update_user_data(user_id, {'temporary_post': None, 'state': UserStates.IDLE})
+                self._user_cache.pop(user_id, None)
                 return True
             else:
-                logger.error(f"Falha na publicação do post para user_id={user_id}")
+                logger.error("Falha na publicação do post para user_id=%s", user_id)
                 return False
 
         except Exception as e:
             logging.error(f"Erro ao publicar o post: {e}", exc_info=True)
             return False
 
-    async def _publish_post_final(self, query, user_id: int):
-        """Implementa a lógica de publicação final conforme as instruções."""
-        try:
-            # 1. Recuperar o conteúdo do post temporário
-            user_data = await self.user_service.get_user_data(user_id)
-            temp_post = user_data.get('temporary_post')
-            
-            if not temp_post:
-                await query.message.answer("❌ Não foi possível encontrar o conteúdo do post. Por favor, tente criar novamente.")
-                return
-
-            # 2. Gerar a etiqueta de anonimização e o teclado de interação final
-            anonymous_label = build_anonymous_label(user_data)
-            # Simular um ID de post único por enquanto. O ideal seria vir da base de dados.
-            post_id = f"post_{int(time.time())}" 
-            interaction_keyboard = create_post_interaction_keyboard(post_id, comment_count=0)
-            
-            # 3. Montar a legenda/texto final
-            final_caption = f"{temp_post.get('text', '')}\n\n{anonymous_label}"
-            
-            # 4. Publicar no grupo
-            await self.post_service.publish_post(
-                content_type=temp_post['type'],
-                text=final_caption,
-                file_id=temp_post.get('file_id'),
-                keyboard=interaction_keyboard
-            )
-            
-            # 5. Limpar dados temporários e notificar o utilizador
-            await self.user_service.update_user_data(user_id, {'temporary_post': None})
-            await self.user_service.set_user_state(user_id, UserStates.IDLE)
-            await query.message.edit_text("✅ Seu post foi publicado com sucesso no grupo!")
-
-        except Exception as e:
-            logging.error(f"Erro ao publicar o post: {e}", exc_info=True)
-            await query.message.answer("❌ Ocorreu um erro ao publicar seu post.")
-    
     async def _start_post_creation(self, query, user_id: int, callback_data: str):
         """Inicia o processo de criação de post."""
         try:
@@ -313,49 +596,38 @@ class PostingHandler:
             post_type = callback_data.replace('post_type_', '')
             
             # Verificar se o usuário pode criar posts
-            user = await self.user_service.get_user_data(user_id)
+            user = await self._get_user_cached(user_id)
             if not user:
-                await query.message.edit_text("❌ Usuário não encontrado.")
+                await self._edit_if_changed(query.message, "❌ Usuário não encontrado.")
                 return
             
             # Inicializar sessão de postagem
-            self.posting_sessions[user_id] = {
-                'type': post_type,
-                'title': '',
-                'description': '',
-                'media_files': [],
-                'monetization': {
-                    'enabled': False,
-                    'price': 0,
-                    'currency': 'BRL'
-                },
-                'created_at': datetime.now(),
-                'step': 'title'
-            }
+            self._store_session(user_id, PostingSession(
+                type=post_type,
+                media_handler=self._media_handlers.get(post_type),
+                can_monetize=bool(user.get('is_creator') and user.get('monetization_enabled')),
+            ))
             
             # Solicitar título do post
-            text = f"📝 **Criar Post - {post_type.title()}**\n\n"
+            text = f"📝 <b>Criar Post - {post_type.title().translate(_HTML_ESCAPE_TBL)}</b>\n\n"
             text += "Vamos criar seu post! Primeiro, me diga:\n\n"
-            text += "**Qual será o título do seu post?**\n"
-            text += "_(Máximo 100 caracteres)_"
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
-            ])
+            text += "<b>Qual será o título do seu post?</b>\n"
+            text += "<i>(Máximo 100 caracteres)</i>"
             
-            await query.message.edit_text(
+            await self._edit_if_changed(
+                query.message,
                 text,
-                reply_markup=keyboard,
-                parse_mode='Markdown'
+                reply_markup=_CANCEL_ONLY_KB,
+                parse_mode='HTML'
             )
             
             # Definir estado para aguardar título
             # Estado interno controlado via sessão
-            self.posting_sessions[user_id]['step'] = 'title'
+            self.posting_sessions[user_id].step = 'title'
             
         except Exception as e:
-            logger.error(f"Erro ao iniciar criação de post: {e}")
-            await query.message.edit_text("❌ Erro ao iniciar criação de post.")
+            logger.error("Erro ao iniciar criação de post: %s", e)
+            await self._edit_if_changed(query.message, "❌ Erro ao iniciar criação de post.")
     
     async def handle_title_input(self, message: Message):
         """Processa o título do post."""
@@ -375,30 +647,27 @@ class PostingHandler:
                 )
                 return WAITING_TITLE
             
-            # Salvar título
-            self.posting_sessions[user_id]['title'] = title
-            self.posting_sessions[user_id]['step'] = 'description'
+            # Salvar título (e sua versão escapada, reutilizada no preview e na publicação)
+            session = self.posting_sessions[user_id]
+            session.title = title
+            session.title_html = title.translate(_HTML_ESCAPE_TBL)
+            session.step = 'description'
             
             # Solicitar descrição
-            text = f"✅ **Título salvo:** {title}\n\n"
-            text += "Agora, escreva uma **descrição** para seu post:\n"
-            text += "_(Máximo 500 caracteres)_"
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="⏭️ Pular Descrição", callback_data="skip_description")],
-                [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
-            ])
+            text = f"✅ <b>Título salvo:</b> {session.title_html}\n\n"
+            text += "Agora, escreva uma <b>descrição</b> para seu post:\n"
+            text += "<i>(Máximo 500 caracteres)</i>"
             
             await message.answer(
                 text,
-                reply_markup=keyboard,
-                parse_mode='Markdown'
+                reply_markup=_SKIP_DESC_KB,
+                parse_mode='HTML'
             )
 
             return WAITING_DESCRIPTION
             
         except Exception as e:
-            logger.error(f"Erro ao processar título: {e}")
+            logger.error("Erro ao processar título: %s", e)
             await message.answer("❌ Erro ao processar título.")
             return
     
@@ -420,11 +689,12 @@ class PostingHandler:
                 )
                 return WAITING_DESCRIPTION
             
-            # Salvar descrição
-            self.posting_sessions[user_id]['description'] = description
+            # Salvar descrição (e sua versão escapada)
+            self.posting_sessions[user_id].description = description
+            self.posting_sessions[user_id].description_html = description.translate(_HTML_ESCAPE_TBL)
             
             # Verificar se precisa de mídia
-            post_type = self.posting_sessions[user_id]['type']
+            post_type = self.posting_sessions[user_id].type
             if post_type in ['image', 'video']:
                 await self._request_media(message, user_id, post_type)
                 return WAITING_MEDIA
@@ -434,7 +704,7 @@ class PostingHandler:
                 return PREVIEW_POST
             
         except Exception as e:
-            logger.error(f"Erro ao processar descrição: {e}")
+            logger.error("Erro ao processar descrição: %s", e)
             await message.answer("❌ Erro ao processar descrição.")
             return
     
@@ -442,176 +712,147 @@ class PostingHandler:
         """Solicita o envio de mídia."""
         try:
             session = self.posting_sessions[user_id]
-            session['step'] = 'media'
+            session.step = 'media'
             
             if media_type == 'image':
-                text = "📷 **Envie a imagem** para seu post:\n\n"
+                text = "📷 <b>Envie a imagem</b> para seu post:\n\n"
                 text += "• Formatos aceitos: JPG, PNG, GIF\n"
                 text += "• Tamanho máximo: 10MB\n"
                 text += "• Você pode enviar até 5 imagens"
             else:  # video
-                text = "📹 **Envie o vídeo** para seu post:\n\n"
+                text = "📹 <b>Envie o vídeo</b> para seu post:\n\n"
                 text += "• Formatos aceitos: MP4, MOV, AVI\n"
                 text += "• Tamanho máximo: 50MB\n"
                 text += "• Duração máxima: 5 minutos"
             
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="⏭️ Pular Mídia", callback_data="skip_media")],
-                [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
-            ])
-            
             await message.answer(
                 text,
-                reply_markup=keyboard,
-                parse_mode='Markdown'
+                reply_markup=_SKIP_MEDIA_KB,
+                parse_mode='HTML'
             )
             
         except Exception as e:
-            logger.error(f"Erro ao solicitar mídia: {e}")
+            logger.error("Erro ao solicitar mídia: %s", e)
     
     async def handle_media_input(self, message: Message):
-        """Processa o envio de mídia."""
+        """Processa o envio de mídia com o handler fixado na criação da sessão."""
         user_id = message.from_user.id
         
         try:
-            if user_id not in self.posting_sessions:
+            session = self._get_session(user_id)
+            if not session:
                 await message.answer("❌ Sessão de postagem não encontrada.")
                 return
             
-            session = self.posting_sessions[user_id]
-            
-            # Processar mídia baseado no tipo
-            if message.photo:
-                # Processar imagem
-                photo = message.photo[-1]  # Maior resolução
-                file_info = await self.bot.get_file(photo.file_id)
-                
-                media_data = {
-                    'type': 'image',
-                    'file_id': photo.file_id,
-                    'file_size': photo.file_size,
-                    'file_path': file_info.file_path
-                }
-
-                # Tentar processar e subir para Cloudinary
-                try:
-                    upload_result = await self.media_service.process_and_upload_media(photo.file_id, user_id, media_type='photo')
-                    if upload_result.get('success'):
-                        media_data['cloudinary_url'] = upload_result.get('url')
-                        media_data['cloudinary_public_id'] = upload_result.get('public_id')
-                        media_data['is_blurred'] = upload_result.get('is_blurred')
-                    else:
-                        media_data['cloudinary_url'] = None
-                except Exception as e:
-                    logger.warning(f"Falha ao processar imagem para {user_id}: {e}")
-                    media_data['cloudinary_url'] = None
-                
-                session['media_files'].append(media_data)
-                
-                await message.answer(
-                    f"✅ Imagem adicionada! ({len(session['media_files'])}/5)\n"
-                    "Envie mais imagens ou continue para o próximo passo.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(text="➡️ Continuar", callback_data="continue_to_preview")],
-                        [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
-                    ])
-                )
-                
-            elif message.video:
-                # Processar vídeo
-                video = message.video
-                file_info = await self.bot.get_file(video.file_id)
-                
-                # Validar duração (5 minutos = 300 segundos)
-                if video.duration > 300:
-                    await message.answer(
-                        "❌ Vídeo muito longo! Máximo 5 minutos.\n"
-                        "Envie outro vídeo:"
-                    )
-                    return WAITING_MEDIA
-                
-                media_data = {
-                    'type': 'video',
-                    'file_id': video.file_id,
-                    'file_size': video.file_size,
-                    'duration': video.duration,
-                    'file_path': file_info.file_path
-                }
-
-                # Tentar processar e subir para Cloudinary
-                try:
-                    upload_result = await self.media_service.process_and_upload_media(video.file_id, user_id, media_type='video')
-                    if upload_result.get('success'):
-                        media_data['cloudinary_url'] = upload_result.get('url')
-                        media_data['cloudinary_public_id'] = upload_result.get('public_id')
-                        media_data['is_blurred'] = upload_result.get('is_blurred')
-                    else:
-                        media_data['cloudinary_url'] = None
-                except Exception as e:
-                    logger.warning(f"Falha ao processar vídeo para {user_id}: {e}")
-                    media_data['cloudinary_url'] = None
-                
-                session['media_files'].append(media_data)
-                
-                await message.answer(
-                    "✅ Vídeo adicionado!\n"
-                    "Pronto para continuar?",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                        [InlineKeyboardButton(text="➡️ Continuar", callback_data="continue_to_preview")],
-                        [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
-                    ])
-                )
+            if session.media_handler is None:
+                await self._reject_media(message)
             else:
-                await message.answer(
-                    "❌ Tipo de arquivo não suportado.\n"
-                    "Envie uma imagem ou vídeo válido."
-                )
-                return WAITING_MEDIA
-            
+                await session.media_handler(message, session)
             return WAITING_MEDIA
             
         except Exception as e:
-            logger.error(f"Erro ao processar mídia: {e}")
+            logger.error("Erro ao processar mídia: %s", e)
             await message.answer("❌ Erro ao processar mídia.")
             return
     
+    async def _handle_photo(self, message: Message, session: PostingSession):
+        """Registra uma imagem (o Telegram ordena os tamanhos, o último é o maior)."""
+        photos = message.photo
+        if not photos:
+            await self._reject_media(message)
+            return
+        photo = photos[-1]
+        await self._upload_and_record(
+            message,
+            session,
+            {'type': 'image', 'file_id': photo.file_id, 'file_size': photo.file_size},
+            'photo',
+            f"✅ Imagem adicionada! ({len(session.media_files) + 1}/5)\n"
+            "Envie mais imagens ou continue para o próximo passo."
+        )
+    
+    async def _handle_video(self, message: Message, session: PostingSession):
+        """Registra um vídeo de até 5 minutos."""
+        video = message.video
+        if not video:
+            await self._reject_media(message)
+            return
+        duration = video.duration
+        if duration > 300:
+            await message.answer(
+                "❌ Vídeo muito longo! Máximo 5 minutos.\n"
+                "Envie outro vídeo:"
+            )
+            return
+        await self._upload_and_record(
+            message,
+            session,
+            {'type': 'video', 'file_id': video.file_id, 'file_size': video.file_size, 'duration': duration},
+            'video',
+            "✅ Vídeo adicionado!\n"
+            "Pronto para continuar?"
+        )
+    
+    async def _upload_and_record(self, message: Message, session: PostingSession, media_data: dict,
+                                 media_type: str, ack_text: str):
+        """Anexa a mídia à sessão, inicia o upload em segundo plano e confirma ao usuário.
+
+        Os uploads de várias mídias correm em paralelo e só são aguardados
+        (por _await_uploads) quando o preview é montado.
+        """
+        user_id = message.from_user.id
+        session.media_files.append(media_data)
+        session.pending_uploads.append((media_data, asyncio.create_task(
+            self.media_service.process_and_upload_media(media_data['file_id'], user_id, media_type=media_type)
+        )))
+        await message.answer(ack_text, reply_markup=_CONTINUE_OR_CANCEL_KB)
+    
+    async def _await_uploads(self, session: PostingSession, user_id: int):
+        """Aguarda os uploads pendentes da sessão e grava os resultados nas mídias."""
+        pending = session.pending_uploads
+        if not pending:
+            return
+        session.pending_uploads = []
+        results = await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+        for (media_data, _), upload_result in zip(pending, results):
+            self._apply_media_results(media_data, upload_result, user_id)
+    
+    @staticmethod
+    async def _reject_media(message: Message):
+        """Informa que o arquivo enviado não é aceito para o tipo de post."""
+        await message.answer(
+            "❌ Tipo de arquivo não suportado.\n"
+            "Envie uma imagem ou vídeo válido."
+        )
+    
+    @staticmethod
+    def _apply_media_results(media_data: dict, upload_result, user_id: int):
+        """Preenche media_data com o resultado (ou falha) do upload."""
+        if isinstance(upload_result, BaseException):
+            logger.warning("Falha ao processar %s para %s: %s", media_data['type'], user_id, upload_result)
+            media_data['cloudinary_url'] = None
+        elif upload_result.get('success'):
+            media_data['cloudinary_url'] = upload_result.get('url')
+            media_data['cloudinary_public_id'] = upload_result.get('public_id')
+            media_data['is_blurred'] = upload_result.get('is_blurred')
+        else:
+            media_data['cloudinary_url'] = None
+    
     async def _show_post_preview_message(self, message: Message, user_id: int):
         """Mostra o preview do post via mensagem."""
         try:
             session = self.posting_sessions[user_id]
+            await self._await_uploads(session, user_id)
             
-            # Construir preview
-            preview_text = "👀 <b>Preview do seu post:</b>\n\n"
-            preview_text += f"<b>📝 Título:</b> {html.escape(session['title'] or '')}\n\n"
-            
-            if session['description']:
-                preview_text += f"<b>📄 Descrição:</b>\n{html.escape(session['description'])}\n\n"
-            
-            if session['media_files']:
-                preview_text += f"<b>📎 Mídia:</b> {len(session['media_files'])} arquivo(s)\n\n"
-
-            # Mostrar configuração de monetização se ativada
-            if session.get('monetization', {}).get('enabled'):
-                preview_text += f"<b>💰 Monetização:</b> R$ {session['monetization']['price']:.2f}\n\n"
-            
-            preview_text += "<b>Opções:</b>"
+            preview_text = _render_preview(session, "<b>Opções:</b>")
             
-            # Verificar se o usuário pode monetizar
-            user = await self.user_service.get_user(user_id)
-            can_monetize = user and user.get('is_creator') and user.get('monetization_enabled')
+            # Capacidade de monetizar foi lida ao iniciar a sessão
+            can_monetize = session.can_monetize
 
             # Persistir/atualizar rascunho antes de mostrar preview
-            draft_payload = {
-                'type': session['type'],
-                'title': session['title'],
-                'description': session['description'],
-                'media_files': session['media_files'],
-                'monetization': session.get('monetization', {'enabled': False, 'price': 0, 'currency': 'BRL'}),
-                'created_at': session.get('created_at'),
-            }
-            existing_draft_id = session.get('draft_id')
-            draft_id = await self.draft_repo.create_or_update(user_id, existing_draft_id, draft_payload)
-            session['draft_id'] = draft_id
+            draft_payload = _session_to_draft_payload(session)
+            draft_id = self._queue_draft(user_id, session.draft_id, draft_payload)
+            session.draft_id = draft_id
 
             # Construir teclado com draft_id
             keyboard = create_post_preview_keyboard(draft_id)
@@ -629,165 +870,146 @@ class PostingHandler:
             )
             
         except Exception as e:
-            logger.error(f"Erro ao mostrar preview: {e}")
+            logger.error("Erro ao mostrar preview: %s", e)
     
     async def _show_post_preview(self, query, user_id: int):
         """Mostra o preview do post via callback."""
         try:
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
-                await query.message.edit_text("❌ Sessão de postagem não encontrada.")
+                await self._edit_if_changed(query.message, "❌ Sessão de postagem não encontrada.")
                 return
+            await self._await_uploads(session, user_id)
             
-            # Construir preview
-            preview_text = "👀 <b>Preview do seu post:</b>\n\n"
-            preview_text += f"<b>📝 Título:</b> {html.escape(session['title'] or '')}\n\n"
-            
-            if session['description']:
-                preview_text += f"<b>📄 Descrição:</b>\n{html.escape(session['description'])}\n\n"
-            
-            if session['media_files']:
-                preview_text += f"<b>📎 Mídia:</b> {len(session['media_files'])} arquivo(s)\n\n"
-            
-            # Mostrar configuração de monetização se ativada
-            if session['monetization']['enabled']:
-                preview_text += f"<b>💰 Monetização:</b> R$ {session['monetization']['price']:.2f}\n\n"
-            
-            preview_text += "<b>Confirma a publicação?</b>"
+            preview_text = _render_preview(session, "<b>Confirma a publicação?</b>")
 
             # Persistir/atualizar rascunho e obter draft_id
-            draft_payload = {
-                'type': session['type'],
-                'title': session['title'],
-                'description': session['description'],
-                'media_files': session['media_files'],
-                'monetization': session.get('monetization', {'enabled': False, 'price': 0, 'currency': 'BRL'}),
-                'created_at': session.get('created_at'),
-            }
-            existing_draft_id = session.get('draft_id')
-            draft_id = await self.draft_repo.create_or_update(user_id, existing_draft_id, draft_payload)
-            session['draft_id'] = draft_id
+            draft_payload = _session_to_draft_payload(session)
+            draft_id = self._queue_draft(user_id, session.draft_id, draft_payload)
+            session.draft_id = draft_id
 
             keyboard = create_post_preview_keyboard(draft_id)
             
-            await query.message.edit_text(
+            await self._edit_if_changed(
+                query.message,
                 preview_text,
                 reply_markup=keyboard,
                 parse_mode='HTML'
             )
             
         except Exception as e:
-            logger.error(f"Erro ao mostrar preview: {e}")
+            logger.error("Erro ao mostrar preview: %s", e)
+    
+    async def _preview_from_callback(self, query, user_id: int, callback_data: str):
+        """Adapta post_preview[:draft_id] à assinatura de _show_post_preview."""
+        await self._show_post_preview(query, user_id)
     
     async def _cancel_post(self, query, user_id: int):
         """Cancela a criação do post."""
         try:
-            # Limpar sessão se existir
-            if user_id in self.posting_sessions:
-                del self.posting_sessions[user_id]
+            # Limpar sessão e descartar gravação de rascunho ainda pendente
+            self._drop_session(user_id)
+            await self._discard_pending_draft(user_id)
             
             # Limpar dados temporários do usuário e resetar estado
-            try:
-                await self.user_service.update_user_data(user_id, {'temporary_post': None})
-                await self.user_service.set_user_state(user_id, UserStates.IDLE)
-            except Exception as inner_e:
-                logger.warning(f"Falha ao limpar temporary_post/estado no cancelamento para {user_id}: {inner_e}")
-            
-            await query.message.edit_text(
-                "❌ **Criação de post cancelada.**\n\n"
-                "Você pode criar um novo post a qualquer momento!",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="🏠 Menu Principal", callback_data="main_menu")]
-                ]),
-                parse_mode='Markdown'
-            )
+            await self._reset_cancelled_user(user_id)
+            
+            await self._edit_if_changed(query.message, _CANCEL_TEXT, reply_markup=_MAIN_MENU_KB, parse_mode='HTML')
             
         except Exception as e:
-            logger.error(f"Erro ao cancelar post: {e}")
+            logger.error("Erro ao cancelar post: %s", e)
+    
+    async def _reset_cancelled_user(self, user_id: int):
+        """Limpa temporary_post e volta o estado para IDLE numa única escrita."""
+        try:
+            await self.user_service.update_user_data(user_id, {'temporary_post': None, 'state': UserStates.IDLE})
+            self._user_cache.pop(user_id, None)
+        except Exception as e:
+            logger.warning("Falha ao limpar temporary_post/estado no cancelamento para %s: %s", user_id, e)
     
     async def _cancel_post_with_id(self, query, user_id: int, callback_data: str):
         """Cancela a criação do post com ID específico."""
         try:
             # Extrair draft_id do callback
-            draft_id = callback_data.split(":")[-1] if ":" in callback_data else None
+            draft_id = _extract_draft_id(callback_data)
             
-            # Limpar sessão se existir
-            if user_id in self.posting_sessions:
-                del self.posting_sessions[user_id]
+            # Limpar sessão e descartar gravação de rascunho ainda pendente
+            self._drop_session(user_id)
+            await self._discard_pending_draft(user_id)
             
-            # Limpar dados temporários do usuário e resetar estado
-            try:
-                await self.user_service.update_user_data(user_id, {'temporary_post': None})
-                await self.user_service.set_user_state(user_id, UserStates.IDLE)
-            except Exception as inner_e:
-                logger.warning(f"Falha ao limpar temporary_post/estado no cancelamento para {user_id}: {inner_e}")
-
-            # Excluir rascunho se houver
+            # Resetar usuário e excluir rascunho (se houver) em paralelo
             if draft_id:
-                try:
-                    await self.draft_repo.delete(user_id, draft_id)
-                except Exception as del_e:
-                    logger.warning(f"Falha ao excluir draft {draft_id} para {user_id}: {del_e}")
-            
-            await query.message.edit_text(
-                "❌ **Criação de post cancelada.**\n\n"
-                "Você pode criar um novo post a qualquer momento!",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="🏠 Menu Principal", callback_data="main_menu")]
-                ]),
-                parse_mode='Markdown'
-            )
+                self._draft_cache.pop((user_id, draft_id))
+                _, deleted = await asyncio.gather(
+                    self._reset_cancelled_user(user_id),
+                    self.draft_repo.delete(user_id, draft_id),
+                    return_exceptions=True
+                )
+                if isinstance(deleted, Exception):
+                    logger.warning("Falha ao excluir draft %s para %s: %s", draft_id, user_id, deleted)
+            else:
+                await self._reset_cancelled_user(user_id)
             
-            logger.info(f"Post cancelado: user_id={user_id}, draft_id={draft_id}")
+            await self._edit_if_changed(query.message, _CANCEL_TEXT, reply_markup=_MAIN_MENU_KB, parse_mode='HTML')
+            
+            logger.info("Post cancelado: user_id=%s, draft_id=%s", user_id, draft_id)
             
         except Exception as e:
-            logger.error(f"Erro ao cancelar post com ID: {e}")
+            logger.error("Erro ao cancelar post com ID: %s", e)
     
     async def _publish_post(self, query, user_id: int):
         """Publica o post sem ID específico."""
         try:
             result = await self._publish_post_final_corrected(query, user_id)
             if result:
-                await query.message.edit_text("✅ O seu post foi publicado com sucesso!")
-                logger.info(f"Post publicado com sucesso: user_id={user_id}")
+                await self._edit_if_changed(query.message, "✅ O seu post foi publicado com sucesso!")
+                logger.info("Post publicado com sucesso: user_id=%s", user_id)
             else:
-                await query.message.edit_text("❌ Não foi possível publicar o post. Verifique se o bot tem permissões nos grupos.")
-                logger.error(f"Falha na publicação do post: user_id={user_id}")
+                await self._edit_if_changed(query.message, "❌ Não foi possível publicar o post. Verifique se o bot tem permissões nos grupos.")
+                logger.error("Falha na publicação do post: user_id=%s", user_id)
         except Exception as e:
-            logger.error(f"Erro ao publicar post: {e}")
-            await query.message.edit_text("❌ Ocorreu um erro interno. Tente novamente mais tarde.")
+            logger.error("Erro ao publicar post: %s", e)
+            await self._edit_if_changed(query.message, "❌ Ocorreu um erro interno. Tente novamente mais tarde.")
     
     async def _publish_post_with_id(self, query, user_id: int, callback_data: str):
         """Publica o post com ID específico."""
         try:
             # Extrair post_id do callback
-            draft_id = callback_data.split(":")[-1] if ":" in callback_data else None
+            draft_id = _extract_draft_id(callback_data)
 
-            # Carregar rascunho
-            draft = await self.draft_repo.get(user_id, draft_id) if draft_id else None
+            # Carregar rascunho (cache local; o rascunho será excluído, então a
+            # gravação pendente deixa de ser necessária) e dados do autor em paralelo
+            draft = user_data = None
+            if draft_id:
+                draft, user_data = await asyncio.gather(
+                    self._get_draft_cached(user_id, draft_id),
+                    self._get_user_cached(user_id)
+                )
+            await self._discard_pending_draft(user_id)
             if not draft:
-                await query.message.edit_text("❌ Rascunho não encontrado ou expirado. Crie o post novamente.")
+                await self._edit_if_changed(query.message, "❌ Rascunho não encontrado ou expirado. Crie o post novamente.")
                 return
 
             data = draft.get('data', {})
 
             # Montar conteúdo final
-            user_data = await self.user_service.get_user_data(user_id)
-            anonymous_label = build_anonymous_label(user_data)
-            publish_text = ""
+            anonymous_label = _anonymous_label_html(user_data)
+            parts = []
+            # Versões escapadas vêm prontas do rascunho (rascunhos antigos: escapar aqui)
             if data.get('title'):
-                publish_text += f"<b>{html.escape(data['title'])}</b>\n\n"
+                title_html = data.get('title_html') or data['title'].translate(_HTML_ESCAPE_TBL)
+                parts.append(f"<b>{title_html}</b>\n\n")
             if data.get('description'):
-                publish_text += f"{html.escape(data['description'])}\n\n"
-            publish_text += anonymous_label
+                description_html = data.get('description_html') or data['description'].translate(_HTML_ESCAPE_TBL)
+                parts.append(f"{description_html}\n\n")
+            parts.append(anonymous_label)
+            publish_text = "".join(parts)
 
-            # Escolher mídia se houver
-            file_id = None
-            content_type = data.get('type') or 'text'
+            # Formato da publicação (tipo, mídia principal, álbum) decidido de uma vez
+            post_type = data.get('type') or 'text'
             media_files = data.get('media_files') or []
-            if media_files:
-                primary_media = media_files[0]
-                file_id = primary_media.get('file_id')
+            file_ids = list(map(_FILE_ID, media_files))
+            content_type, file_id, album = _publish_shape(post_type, file_ids, media_files)
 
             # Obter dados de monetização
             monetization = data.get('monetization', {'enabled': False, 'price': 0.0})
@@ -796,119 +1018,139 @@ class PostingHandler:
             post_data = {
                 'title': data.get('title', 'Post sem título'),
                 'description': data.get('description', ''),
-                'type': content_type,
-                'media_urls': [media.get('file_id') for media in media_files] if media_files else [],
+                'type': post_type,
+                'media_urls': file_ids,
                 'is_monetized': monetization.get('enabled', False),
                 'price': monetization.get('price', 0.0)
             }
             
-            # Criar post no Firestore e obter ID real
-            real_post_id = await self.post_service.create_post(user_id, post_data)
-            if not real_post_id:
-                await query.message.edit_text("❌ Erro ao criar post. Tente novamente.")
-                return
+            # ID pré-alocado: o documento é gravado enquanto o post vai para o Telegram
+            real_post_id = str(uuid.uuid4())
+            create_task = asyncio.create_task(self.post_service.create_post(user_id, post_data, post_id=real_post_id))
 
-            # Teclado de interação do post publicado com ID real
-            interaction_keyboard = create_post_interaction_keyboard(real_post_id, comment_count=0)
+            # Teclado de interação do post publicado com o ID pré-alocado
+            interaction_keyboard = create_post_interaction_keyboard(real_post_id, comment_count=0, author_id=user_id)
 
             # Determinar grupo alvo baseado na monetização
             # Posts monetizados vão apenas para o grupo premium
             # Posts não monetizados vão para ambos os grupos (freemium E premium)
             if monetization.get('enabled', False):
                 target_group = 'premium'  # Apenas premium para posts monetizados
-                logger.info(f"Post monetizado (R$ {monetization.get('price', 0):.2f}) - publicando apenas no grupo premium")
+                logger.info("Post monetizado (R$ %.2f) - publicando apenas no grupo premium", monetization.get('price', 0))
             else:
                 target_group = 'both'  # Ambos os grupos para posts gratuitos
-                logger.info(f"Post gratuito - publicando em ambos os grupos")
+                logger.info("Post gratuito - publicando em ambos os grupos")
 
-            # Determinar se é media group (múltiplas mídias)
-            if len(media_files) > 1:
-                content_type = 'media_group'
-                
             # Publicar
-            publish_result = await self.post_service.publish_post(
-                content_type=content_type,
-                text=publish_text,
-                file_id=file_id,
-                media_files=media_files if len(media_files) > 1 else None,
-                keyboard=interaction_keyboard,
-                target_group=target_group
-            )
+            try:
+                publish_result = await self.post_service.publish_post(
+                    content_type=content_type,
+                    text=publish_text,
+                    file_id=file_id,
+                    media_files=album,
+                    keyboard=interaction_keyboard,
+                    target_group=target_group,
+                    post_id=real_post_id
+                )
+            except Exception:
+                # A gravação já pode ter começado: aguardar e desativar o documento órfão
+                await self._discard_created_post(create_task, real_post_id, user_id)
+                raise
+            post_saved = True
+            if publish_result:
+                post_saved = await self._ensure_post_written(create_task, user_id, post_data, real_post_id)
+            else:
+                await self._discard_created_post(create_task, real_post_id, user_id)
 
-            # Limpar estado e remover rascunho
-            await self.user_service.set_user_state(user_id, UserStates.IDLE)
-            await self.draft_repo.delete(user_id, draft_id)
-            if user_id in self.posting_sessions:
-                del self.posting_sessions[user_id]
+            # Limpar estado e remover rascunho (escritas independentes)
+            cleanup = await asyncio.gather(
+                self.user_service.set_user_state(user_id, UserStates.IDLE),
+                self.draft_repo.delete(user_id, draft_id),
+                return_exceptions=True
+            )
+            for result in cleanup:
+                if isinstance(result, Exception):
+                    logger.warning("Falha na limpeza pós-publicação para %s: %s", user_id, result)
+            self._draft_cache.pop((user_id, draft_id))
+            self._drop_session(user_id)
 
             # Verificar resultado da publicação
-            if publish_result:
-                await query.message.edit_text("✅ O seu post foi publicado com sucesso!")
-                logger.info(f"Post publicado: user_id={user_id}, draft_id={draft_id}")
+            if publish_result and not post_saved:
+                await self._edit_if_changed(
+                    query.message,
+                    "⚠️ O seu post foi publicado, mas não foi possível salvá-lo. "
+                    "Matches e comentários nele podem não funcionar; apague-o e publique novamente."
+                )
+            elif publish_result:
+                await self._edit_if_changed(query.message, "✅ O seu post foi publicado com sucesso!")
+                logger.info("Post publicado: user_id=%s, draft_id=%s", user_id, draft_id)
             else:
-                await query.message.edit_text("❌ Não foi possível publicar o post. Verifique se o bot tem permissões nos grupos.")
-                logger.error(f"Falha na publicação confirmada: user_id={user_id}, draft_id={draft_id}")
+                await self._edit_if_changed(query.message, "❌ Não foi possível publicar o post. Verifique se o bot tem permissões nos grupos.")
+                logger.error("Falha na publicação confirmada: user_id=%s, draft_id=%s", user_id, draft_id)
             
         except Exception as e:
-            logger.error(f"Erro ao publicar post com ID: {e}")
-            await query.message.edit_text("❌ Ocorreu um erro interno. Tente novamente mais tarde.")
+            logger.error("Erro ao publicar post com ID: %s", e)
+            await self._edit_if_changed(query.message, "❌ Ocorreu um erro interno. Tente novamente mais tarde.")
     
+    async def _ensure_post_written(self, create_task: asyncio.Task, user_id: int,
+                                   post_data: dict, post_id: str) -> bool:
+        """Garante o documento de um post já publicado, repetindo a gravação uma vez se falhar."""
+        if await create_task:
+            return True
+        logger.warning("Gravação do post %s falhou após a publicação; repetindo (user_id=%s)", post_id, user_id)
+        if await self.post_service.create_post(user_id, post_data, post_id=post_id):
+            return True
+        logger.error("Post %s publicado, mas não gravado no Firestore (user_id=%s)", post_id, user_id)
+        return False
+
+    async def _discard_created_post(self, create_task: asyncio.Task, post_id: str, user_id: int):
+        """Aguarda a gravação iniciada em paralelo e desativa o post que não chegou aos grupos."""
+        if await create_task and not await self.post_service.delete_post(post_id, user_id):
+            logger.error("Post %s não publicado ficou ativo no Firestore (user_id=%s)", post_id, user_id)
+
     async def _handle_monetization(self, query, user_id: int, callback_data: str):
         """Processa configurações de monetização."""
         try:
             # Verificar se o usuário pode monetizar
-            user = await self.user_service.get_user_data(user_id)
+            user = await self._get_user_cached(user_id)
             if not user or user.get('category', '').lower() != 'criador':
                 await query.answer("❌ Apenas Criadores de Conteúdo podem monetizar posts.", show_alert=True)
                 return
             
             # Verificar se há sessão de postagem ativa
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
-                await query.message.edit_text("❌ Sessão de postagem não encontrada.")
+                await self._edit_if_changed(query.message, "❌ Sessão de postagem não encontrada.")
                 return
             # Extrair draft_id se presente
-            draft_id = callback_data.split(":")[-1] if ":" in callback_data else session.get('draft_id')
+            draft_id = _extract_draft_id(callback_data) or session.draft_id
             if draft_id:
-                session['draft_id'] = draft_id
+                session.draft_id = draft_id
 
-            # Mostrar opções de monetização
-            text = "💰 <b>Configurar Monetização</b>\n\n"
-            text += "Este conteúdo será exclusivo para assinantes Premium.\n\n"
-            text += "Escolha o valor que deseja cobrar pelo acesso avulso:"
-            
-            # Incluir draft_id nos callbacks se disponível
+            # Mostrar opções de monetização (draft_id nos callbacks se disponível)
             draft_suffix = f":{draft_id}" if draft_id else ""
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="R$ 2,99", callback_data=f"monetize_price_2.99{draft_suffix}")],
-                [InlineKeyboardButton(text="R$ 4,99", callback_data=f"monetize_price_4.99{draft_suffix}")],
-                [InlineKeyboardButton(text="R$ 9,99", callback_data=f"monetize_price_9.99{draft_suffix}")],
-                [InlineKeyboardButton(text="R$ 19,99", callback_data=f"monetize_price_19.99{draft_suffix}")],
-                [InlineKeyboardButton(text="💰 Valor Personalizado", callback_data=f"monetize_custom{draft_suffix}")],
-                [InlineKeyboardButton(text="🔙 Voltar", callback_data=f"post_preview{draft_suffix}")],
-                [InlineKeyboardButton(text="❌ Cancelar", callback_data=f"post_cancel{draft_suffix}")]
+                [InlineKeyboardButton(text=label, callback_data=f"{callback_base}{draft_suffix}")]
+                for label, callback_base in _MONETIZE_BUTTONS
             ])
             
-            await query.message.edit_text(
-                text,
-                reply_markup=keyboard,
-                parse_mode='HTML'
-            )
+            await self._edit_if_changed(query.message, _MONETIZE_TEXT, reply_markup=keyboard, parse_mode='HTML')
             
         except Exception as e:
-            logger.error(f"Erro ao configurar monetização: {e}")
-            await query.message.edit_text("❌ Erro ao configurar monetização.")
+            logger.error("Erro ao configurar monetização: %s", e)
+            await self._edit_if_changed(query.message, "❌ Erro ao configurar monetização.")
     
     async def _handle_monetization_price(self, query, user_id: int, callback_data: str):
         """Processa a seleção de preço de monetização."""
         try:
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
-                await query.message.edit_text("❌ Sessão de postagem não encontrada.")
+                await self._edit_if_changed(query.message, "❌ Sessão de postagem não encontrada.")
                 return
             
             # Separar ação e draft_id, se houver
-            action_part, draft_id = (callback_data.split(":", 1) + [None])[:2]
+            action_part, _, draft_id = callback_data.partition(":")
+            draft_id = draft_id or None
             
             if action_part.startswith("monetize_price_"):
                 # Extrair preço do callback
@@ -916,34 +1158,28 @@ class PostingHandler:
                 price = float(price_str)
                 
                 # Configurar monetização na sessão
-                session['monetization'] = {
+                session.monetization = {
                     'enabled': True,
                     'price': price,
                     'currency': 'BRL'
                 }
-                # Persistir atualização em rascunho
-                draft_payload = {
-                    'type': session['type'],
-                    'title': session['title'],
-                    'description': session['description'],
-                    'media_files': session['media_files'],
-                    'monetization': session['monetization'],
-                    'created_at': session.get('created_at'),
-                }
-                saved_draft_id = await self.draft_repo.create_or_update(user_id, draft_id or session.get('draft_id'), draft_payload)
-                session['draft_id'] = saved_draft_id
+                # Persistir atualização em rascunho: só o campo de monetização, se já existe
+                if session.draft_id:
+                    self._queue_draft_patch(user_id, session.draft_id, {'monetization': session.monetization})
+                else:
+                    draft_payload = _session_to_draft_payload(session)
+                    session.draft_id = self._queue_draft(user_id, draft_id, draft_payload)
                 
                 # Mostrar confirmação e voltar ao preview
-                text = f"✅ <b>Monetização configurada!</b>\n\n"
-                text += f"💰 <b>Preço:</b> R$ {price:.2f}\n\n"
-                text += "Seu conteúdo será exclusivo para assinantes Premium."
+                text = _MONETIZED_TEXT.format(price=price)
                 
                 keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="📋 Ver Preview", callback_data=f"post_preview:{session['draft_id']}")],
-                    [InlineKeyboardButton(text="❌ Cancelar", callback_data=f"post_cancel:{session['draft_id']}")]
+                    [InlineKeyboardButton(text="📋 Ver Preview", callback_data=f"post_preview:{session.draft_id}")],
+                    [InlineKeyboardButton(text="❌ Cancelar", callback_data=f"post_cancel:{session.draft_id}")]
                 ])
                 
-                await query.message.edit_text(
+                await self._edit_if_changed(
+                    query.message,
                     text,
                     reply_markup=keyboard,
                     parse_mode='HTML'
@@ -951,16 +1187,15 @@ class PostingHandler:
                 
             elif action_part == "monetize_custom":
                 # Solicitar valor personalizado
-                text = "💰 <b>Valor Personalizado</b>\n\n"
-                text += "Digite o valor que deseja cobrar (ex: 15.99):\n\n"
-                text += "⚠️ <i>Valores entre R$ 0,99 e R$ 99,99</i>"
+                text = _CUSTOM_PRICE_TEXT
                 
                 keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="🔙 Voltar", callback_data=f"post_monetize:{draft_id or session.get('draft_id')}")],
-                    [InlineKeyboardButton(text="❌ Cancelar", callback_data=f"post_cancel:{draft_id or session.get('draft_id')}")]
+                    [InlineKeyboardButton(text="🔙 Voltar", callback_data=f"post_monetize:{draft_id or session.draft_id}")],
+                    [InlineKeyboardButton(text="❌ Cancelar", callback_data=f"post_cancel:{draft_id or session.draft_id}")]
                 ])
                 
-                await query.message.edit_text(
+                await self._edit_if_changed(
+                    query.message,
                     text,
                     reply_markup=keyboard,
                     parse_mode='HTML'
@@ -969,18 +1204,18 @@ class PostingHandler:
                 # Definir estado para aguardar valor personalizado
                 await self.user_service.set_user_state(user_id, UserStates.AWAITING_MONETIZATION_VALUE)
                 # Guardar draft_id para uso na entrada personalizada
-                session['pending_monetization_draft_id'] = draft_id or session.get('draft_id')
+                session.pending_monetization_draft_id = draft_id or session.draft_id
                 
         except Exception as e:
-            logger.error(f"Erro ao processar preço de monetização: {e}")
-            await query.message.edit_text("❌ Erro ao processar preço.")
+            logger.error("Erro ao processar preço de monetização: %s", e)
+            await self._edit_if_changed(query.message, "❌ Erro ao processar preço.")
     
     async def handle_custom_monetization_value(self, message: Message):
         """Processa valor personalizado de monetização."""
         user_id = message.from_user.id
         
         try:
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
                 await message.answer("❌ Sessão de postagem não encontrada.")
                 return
@@ -1002,35 +1237,27 @@ class PostingHandler:
                 return
             
             # Configurar monetização
-            session['monetization'] = {
+            session.monetization = {
                 'enabled': True,
                 'price': price,
                 'currency': 'BRL'
             }
-            # Persistir atualização do rascunho
-            draft_id = session.get('draft_id') or session.get('pending_monetization_draft_id')
-            draft_payload = {
-                'type': session['type'],
-                'title': session['title'],
-                'description': session['description'],
-                'media_files': session['media_files'],
-                'monetization': session['monetization'],
-                'created_at': session.get('created_at'),
-            }
-            saved_draft_id = await self.draft_repo.create_or_update(user_id, draft_id, draft_payload)
-            session['draft_id'] = saved_draft_id
+            # Persistir atualização do rascunho: só o campo de monetização, se já existe
+            if session.draft_id:
+                self._queue_draft_patch(user_id, session.draft_id, {'monetization': session.monetization})
+            else:
+                draft_payload = _session_to_draft_payload(session)
+                session.draft_id = self._queue_draft(user_id, session.pending_monetization_draft_id, draft_payload)
             
             # Resetar estado
             await self.user_service.set_user_state(user_id, UserStates.IDLE)
             
             # Mostrar confirmação
-            text = f"✅ <b>Monetização configurada!</b>\n\n"
-            text += f"💰 <b>Preço:</b> R$ {price:.2f}\n\n"
-            text += "Seu conteúdo será exclusivo para assinantes Premium."
+            text = _MONETIZED_TEXT.format(price=price)
             
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="📋 Ver Preview", callback_data=f"post_preview:{session['draft_id']}")],
-                [InlineKeyboardButton(text="❌ Cancelar", callback_data=f"post_cancel:{session['draft_id']}")]
+                [InlineKeyboardButton(text="📋 Ver Preview", callback_data=f"post_preview:{session.draft_id}")],
+                [InlineKeyboardButton(text="❌ Cancelar", callback_data=f"post_cancel:{session.draft_id}")]
             ])
             
             await message.answer(
@@ -1040,19 +1267,19 @@ class PostingHandler:
             )
             
         except Exception as e:
-            logger.error(f"Erro ao processar valor personalizado: {e}")
+            logger.error("Erro ao processar valor personalizado: %s", e)
             await message.answer("❌ Erro ao processar valor.")
 
     async def _continue_to_preview(self, call: CallbackQuery, user_id: int):
         """Continua para o preview após adicionar mídia."""
         try:
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
                 await call.message.answer("❌ Sessão expirada. Inicie novamente.")
                 return
             
             # Verificar se há conteúdo suficiente para preview
-            if not session.get('title') and not session.get('description') and not session.get('media_files'):
+            if not session.title and not session.description and not session.media_files:
                 await call.message.answer("❌ Adicione pelo menos um título, descrição ou mídia antes de continuar.")
                 return
             
@@ -1060,25 +1287,26 @@ class PostingHandler:
             await self._show_post_preview(call, user_id)
             
         except Exception as e:
-            logger.error(f"Erro ao continuar para preview: {e}")
+            logger.error("Erro ao continuar para preview: %s", e)
             await call.message.answer("❌ Erro ao continuar. Tente novamente.")
 
     async def _skip_description(self, call: CallbackQuery, user_id: int):
         """Pula a descrição e continua para o próximo passo."""
         try:
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
-                await call.message.edit_text("❌ Sessão de postagem não encontrada.")
+                await self._edit_if_changed(call.message, "❌ Sessão de postagem não encontrada.")
                 return
             
             # Definir descrição como vazia
-            session['description'] = ''
+            session.description = ''
+            session.description_html = ''
             
             # Verificar se precisa de mídia
-            post_type = session['type']
+            post_type = session.type
             if post_type in ['image', 'video']:
                 # Solicitar mídia via edit
-                text = f"📷 **Envie a {'imagem' if post_type == 'image' else 'vídeo'}** para seu post:\n\n"
+                text = f"📷 <b>Envie a {'imagem' if post_type == 'image' else 'vídeo'}</b> para seu post:\n\n"
                 if post_type == 'image':
                     text += "• Formatos aceitos: JPG, PNG, GIF\n"
                     text += "• Tamanho máximo: 10MB\n"
@@ -1088,41 +1316,42 @@ class PostingHandler:
                     text += "• Tamanho máximo: 50MB\n"
                     text += "• Duração máxima: 5 minutos"
                 
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="⏭️ Pular Mídia", callback_data="skip_media")],
-                    [InlineKeyboardButton(text="❌ Cancelar", callback_data=PostingCallbacks.CANCEL)]
-                ])
-                
-                session['step'] = 'media'
-                await call.message.edit_text(text, reply_markup=keyboard, parse_mode='Markdown')
+                session.step = 'media'
+                await self._edit_if_changed(call.message, text, reply_markup=_SKIP_MEDIA_KB, parse_mode='HTML')
             else:
                 # Post apenas texto - ir para preview
                 await self._show_post_preview(call, user_id)
             
         except Exception as e:
-            logger.error(f"Erro ao pular descrição: {e}")
-            await call.message.edit_text("❌ Erro ao pular descrição.")
+            logger.error("Erro ao pular descrição: %s", e)
+            await self._edit_if_changed(call.message, "❌ Erro ao pular descrição.")
 
     async def _skip_media(self, call: CallbackQuery, user_id: int):
         """Pula a mídia e vai direto para o preview."""
         try:
-            session = self.posting_sessions.get(user_id)
+            session = self._get_session(user_id)
             if not session:
-                await call.message.edit_text("❌ Sessão de postagem não encontrada.")
+                await self._edit_if_changed(call.message, "❌ Sessão de postagem não encontrada.")
                 return
             
             # Não adicionar mídia - ir direto para preview
             await self._show_post_preview(call, user_id)
             
         except Exception as e:
-            logger.error(f"Erro ao pular mídia: {e}")
-            await call.message.edit_text("❌ Erro ao pular mídia.")
+            logger.error("Erro ao pular mídia: %s", e)
+            await self._edit_if_changed(call.message, "❌ Erro ao pular mídia.")
 
     def get_conversation_handler(self):
-        """Retorna o ConversationHandler para postagem."""
-        from telegram.ext import MessageHandler, CallbackQueryHandler, filters
+        """Retorna o ConversationHandler para postagem (montado uma vez por instância).
+
+        python-telegram-bot não é dependência do bot (aiogram), por isso o
+        import continua local a este método legado.
+        """
+        if self._conversation_handler is not None:
+            return self._conversation_handler
+        from telegram.ext import CallbackQueryHandler, ConversationHandler, MessageHandler, filters
         
-        return ConversationHandler(
+        self._conversation_handler = ConversationHandler(
             entry_points=[CallbackQueryHandler(self.handle_callback_query, pattern='^post_type_')],
             states={
                 WAITING_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_title_input)],
@@ -1139,4 +1368,5 @@ class PostingHandler:
                 MessageHandler(filters.COMMAND, self._cancel_post)
             ],
             per_user=True
-        )
\ No newline at end of file
+        )
+        return self._conversation_handler
\ No newline at end of file
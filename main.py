@@ -1,9 +1,13 @@
 import asyncio
+import datetime
+import json
 import logging
 import os
+import re
 import signal
 import sys
 from aiogram import Bot, Dispatcher, types
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.exceptions import TelegramBadRequest, TelegramConflictError, TelegramUnauthorizedError
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from dotenv import load_dotenv
@@ -14,17 +18,28 @@ from handlers.onboarding_handler import OnboardingHandler
 from handlers.posting_handler import PostingHandler
 from handlers.post_interaction_handler import PostInteractionHandler
 from handlers.menu_handler import MenuHandler
-from services.firebase_service import FirebaseService
-from services.security_service import SecurityService
+from handlers.media_navigation_handler import MediaNavigationHandler
+from services.firebase_service import firebase_service
+from services.security_service import security_service
 from services.monetization_service import MonetizationService
 from services.optimized_user_service import OptimizedUserService
 from services.post_service import PostService
 from services.media_service import MediaService
 from services.match_service import MatchService
 from utils.error_handler import ErrorHandler
+from utils.rate_limiter import TelegramRateLimitMiddleware
 from utils.ui_builder import create_control_panel_keyboard
 from constants.callbacks import OnboardingCallbacks
 
+# Serialização JSON rápida para os logs estruturados (opcional)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Teclado do painel do grupo: depende apenas de BOT_USERNAME
+_CONTROL_PANEL_KB = create_control_panel_keyboard(BOT_USERNAME)
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -118,21 +133,23 @@ if SIMULATION_MODE:
     bot = DummyBot(BOT_TOKEN or "SIM_TOKEN")
     dp = Dispatcher()
 else:
-    bot = Bot(token=BOT_TOKEN)
+    # Sessão HTTP única do bot: conexões ao Telegram mantidas vivas entre rajadas de envio
+    bot_session = AiohttpSession(limit=100, timeout=30)
+    bot = Bot(token=BOT_TOKEN, session=bot_session)
+    # Respeitar limites do Telegram (1 msg/s por chat, ~30/s global) antes de receber 429
+    bot.session.middleware(TelegramRateLimitMiddleware())
     dp = Dispatcher()
 
 # Flag para controle de shutdown
 shutdown_flag = False
 
-# Inicializar serviços
-firebase_service = FirebaseService()
-security_service = SecurityService()
-
+# firebase_service/security_service são as instâncias únicas dos próprios módulos
+# (as mesmas usadas por help_handler e atomic_persistence)
 # Aguardar inicialização do Firebase antes de criar outros serviços
 async def init_services():
     """Inicializa todos os serviços e handlers."""
     global monetization_service, user_service, post_service, media_service, match_service, error_handler
-    global onboarding_handler, posting_handler, post_interaction_handler, menu_handler, dm_handler
+    global onboarding_handler, posting_handler, post_interaction_handler, menu_handler, dm_handler, media_nav_handler
     
     # Inicializar Firebase
     await firebase_service._async_init()
@@ -151,6 +168,7 @@ async def init_services():
     post_interaction_handler = PostInteractionHandler(bot, user_service, post_service, error_handler, BOT_USERNAME, match_service)
     menu_handler = MenuHandler(user_service, post_service, match_service, None, error_handler)
     dm_handler = DMKeyboardHandler(bot, onboarding_handler, user_service, security_service, error_handler, posting_handler)
+    media_nav_handler = MediaNavigationHandler(bot, post_service, error_handler)
     
     # Configurar referências cruzadas
     if hasattr(onboarding_handler, 'set_dm_keyboard_handler'):
@@ -160,16 +178,6 @@ async def init_services():
     
     return firebase_service
 
-# Função para inicializar serviços dependentes
-def create_dependent_services(firebase_service):
-    monetization_service = MonetizationService(firebase_service)
-    user_service = OptimizedUserService(firebase_service, security_service, monetization_service)
-    post_service = PostService(bot=bot, firebase_service=firebase_service)
-    media_service = MediaService(user_service, monetization_service, bot)
-    match_service = MatchService(firebase_service)
-    error_handler = ErrorHandler()
-    return monetization_service, user_service, post_service, media_service, match_service, error_handler
-
 # Variáveis globais para serviços e handlers
 monetization_service = None
 user_service = None
@@ -182,6 +190,7 @@ posting_handler = None
 post_interaction_handler = None
 menu_handler = None
 dm_handler = None
+media_nav_handler = None
 
 def switch_to_simulation():
     """Alterna para modo simulação em tempo de execução mantendo dispatcher atual."""
@@ -226,16 +235,13 @@ async def handle_setupgroup_command(message: Message):
             await message.reply("❌ Apenas administradores podem usar este comando!")
             return
         
-        # Criar teclado inline com deep links
-        keyboard = create_control_panel_keyboard(BOT_USERNAME)
-        
-        # Enviar mensagem com o painel
+        # Enviar mensagem com o painel (teclado com deep links montado no import)
         await bot.send_message(
             message.chat.id,
             "🎯 <b>Painel de Controle da Comunidade</b>\n\n"
             "Use os botões abaixo para interagir de forma anônima:",
             parse_mode='HTML',
-            reply_markup=keyboard
+            reply_markup=_CONTROL_PANEL_KB
         )
         
         # Tentar deletar o comando original
@@ -249,12 +255,8 @@ async def handle_setupgroup_command(message: Message):
         await error_handler.handle_error(bot, message.chat.id, "Erro ao configurar grupo.")
 
 async def handle_media_message(message: Message):
-    """Processa conteúdo para criação de posts."""
+    """Processa conteúdo para criação de posts (apenas chats privados, filtrado no registro)."""
     try:
-        # Ignorar mensagens de grupos
-        if message.chat.type != 'private':
-            return
-        
         # Processar criação de post
         await posting_handler.handle_post_creation(message)
         
@@ -263,12 +265,8 @@ async def handle_media_message(message: Message):
         await error_handler.handle_error(bot, message.chat.id, "Erro ao processar conteúdo.")
 
 async def handle_text_message(message: Message):
-    """Processa mensagens de texto para onboarding e outras funcionalidades."""
+    """Processa mensagens de texto para onboarding e outras funcionalidades (apenas chats privados)."""
     try:
-        # Ignorar mensagens de grupos
-        if message.chat.type != 'private':
-            return
-        
         user_id = message.from_user.id
         
         # Verificar se o usuário está aguardando valor de monetização personalizado
@@ -286,12 +284,102 @@ async def handle_text_message(message: Message):
         await posting_handler.handle_post_creation(message)
         
         # Em seguida, processar mensagens do onboarding
-        await onboarding_handler.handle_onboarding_message(message)
+        if user_data:
+            await onboarding_handler.handle_onboarding_message(message, user_data)
         
     except Exception as e:
         logger.error(f"Erro ao processar mensagem de texto: {e}")
         await error_handler.handle_error(bot, message.chat.id, "Erro ao processar mensagem.")
 
+async def _route_onboarding(call: types.CallbackQuery):
+    await onboarding_handler.handle_onboarding_callback(call)
+
+async def _route_post_interaction(call: types.CallbackQuery):
+    await post_interaction_handler.handle_post_interaction(call)
+
+async def _route_media_navigation(call: types.CallbackQuery):
+    data = call.data
+    if data == "close_media_nav":
+        await call.message.delete()
+        await call.answer("📷 Navegação fechada.")
+    elif data == "noop":
+        # Botão informativo, apenas responder
+        await call.answer()
+    else:
+        await media_nav_handler.handle_media_navigation(call)
+
+async def _route_menu(call: types.CallbackQuery):
+    logging.info(f"Encaminhando callback do menu para MenuHandler: {call.data}")
+    await menu_handler.handle_callback(call)
+
+async def _route_posting(call: types.CallbackQuery):
+    await posting_handler.handle_callback_query(call)
+
+async def _route_monetization(call: types.CallbackQuery):
+    logging.info(f"Encaminhando callback de monetização: {call.data}")
+    await posting_handler.handle_callback_query(call)
+
+async def _route_cancel_comment(call: types.CallbackQuery):
+    await post_interaction_handler.handle_cancel_comment(call)
+
+# Callbacks literais -> rota (consultados antes dos prefixos)
+EXACT_ROUTES = {
+    **dict.fromkeys((
+        "start_onboarding",
+        "confirm_age",
+        "reject_age",
+        "accept_rules",
+        "reject_rules",
+        "accept_terms",
+        "reject_terms",
+        "accept_lgpd",
+        "reject_lgpd",
+        "creator_yes",
+        "creator_no",
+        "accept_monetization",
+        "reject_monetization",
+        "group_lite",
+        "group_premium",
+        "finish_relationship_selection",
+    ), _route_onboarding),
+    **dict.fromkeys(("close_media_nav", "noop"), _route_media_navigation),
+    # 'profile_menu' segue para o onboarding pelo prefixo 'profile_', como antes
+    **dict.fromkeys((
+        "main_menu", "settings", "favorites", "help", "create_post",
+        "view_posts", "matches", "statistics", "gallery", "start_post",
+    ), _route_menu),
+    **dict.fromkeys((
+        "posting:create", "post_publish", "post_cancel", "post_preview",
+        "post_add_media", "post_remove_media", "continue_to_preview",
+    ), _route_posting),
+    "cancel_comment": _route_cancel_comment,
+}
+
+# Prefixo do callback -> rota
+PREFIX_ROUTES = {
+    **dict.fromkeys(
+        ("onboarding_", "state_", "category_", "gender_", "profile_", "rel_"),
+        _route_onboarding,
+    ),
+    # Interações com posts: formato novo (ação:post:id) e legado
+    **dict.fromkeys((
+        "match:post:", "info:post:", "gallery:post:", "favorite:post:", "comments:post:",
+        "match_post_", "info_post_", "gallery_post_", "favorite_post_", "comment_post_",
+    ), _route_post_interaction),
+    "nav_media_": _route_media_navigation,
+    "menu_": _route_menu,
+    "menu:": _route_menu,
+    **dict.fromkeys(
+        ("post_type_", "post_monetize", "post_publish:", "post_cancel:", "post_preview:"),
+        _route_posting,
+    ),
+    "monetization_": _route_monetization,
+    "monetize_": _route_monetization,
+}
+
+# Todos os prefixos numa única alternância (o mais longo primeiro)
+_CALLBACK_PREFIX_RE = re.compile('|'.join(map(re.escape, sorted(PREFIX_ROUTES, key=len, reverse=True))))
+
 async def unified_callback_handler(call: types.CallbackQuery):
     """
     Handler unificado e roteador para todos os callbacks da aplicação.
@@ -309,113 +397,14 @@ async def unified_callback_handler(call: types.CallbackQuery):
         data = call.data or ""
         logging.info(f"Callback recebido: {data}")
 
-        # ===== Onboarding =====
-        # Inclui explicitamente 'start_onboarding' para iniciar o fluxo
-        if (
-            data == "start_onboarding"
-            or data.startswith("onboarding_")
-            or data in [
-                "confirm_age",
-                "reject_age",
-                "accept_rules",
-                "reject_rules",
-                "accept_terms",
-                "reject_terms",
-                "accept_lgpd",
-                "reject_lgpd",
-                "creator_yes",
-                "creator_no",
-                "accept_monetization",
-                "reject_monetization",
-                "group_lite",
-                "group_premium",
-            ]
-            or data.startswith(("state_", "category_", "gender_", "profile_", "rel_"))
-            or data == "finish_relationship_selection"
-        ):
-            await onboarding_handler.handle_onboarding_callback(call)
-            return
-
-        # ===== Interações com Posts (formato novo: ação:post:id) =====
-        if (data.startswith((
-            "match:post:",
-            "info:post:",
-            "gallery:post:",
-            "favorite:post:",
-            "comments:post:",
-        ))):
-            await post_interaction_handler.handle_post_interaction(call)
-            return
-
-        # ===== Interações com Posts (formato legado para compatibilidade) =====
-        if (data.startswith((
-            "match_post_",
-            "info_post_",
-            "gallery_post_",
-            "favorite_post_",
-            "comment_post_",
-        ))):
-            await post_interaction_handler.handle_post_interaction(call)
-            return
-
-        # ===== Navegação de Mídia =====
-        if data.startswith("nav_media_") or data == "close_media_nav" or data == "noop":
-            # Importar e usar MediaNavigationHandler
-            from handlers.media_navigation_handler import MediaNavigationHandler
-            media_nav_handler = MediaNavigationHandler(bot, post_service, error_handler)
-            if data == "close_media_nav":
-                await call.message.delete()
-                await call.answer("📷 Navegação fechada.")
-            elif data == "noop":
-                # Botão informativo, apenas responder
-                await call.answer()
-            else:
-                await media_nav_handler.handle_media_navigation(call)
-            return
-
-        # ===== Menu Principal =====
-        # Encaminhar callbacks que começam com 'menu_' ou 'menu:' para o MenuHandler
-        if (data.startswith("menu_") or data.startswith("menu:") or 
-            data in ("main_menu", "profile_menu", "settings", "favorites", "help", 
-                    "create_post", "view_posts", "matches", "statistics", "gallery", "start_post")):
-            logging.info(f"Encaminhando callback do menu para MenuHandler: {data}")
-            await menu_handler.handle_callback(call)
-            return
-
-        # ===== Fluxo de Postagem (callbacks novos formato ação:alvo) =====
-        if data in ("posting:create", "menu:main"):
-            if data == "posting:create":
-                await posting_handler.handle_callback_query(call)
-            elif data == "menu:main":
-                await menu_handler.handle_callback(call)
-            return
-
-        # ===== Fluxo de Postagem =====
-        if (
-            data.startswith("post_type_")
-            or data.startswith("post_monetize")
-            or data.startswith("post_publish:")
-            or data in (
-                "post_publish",
-                "post_cancel",
-                "post_preview",
-                "post_add_media",
-                "post_remove_media",
-                "continue_to_preview",
-            )
-        ):
-            await posting_handler.handle_callback_query(call)
-            return
+        # Literal exato primeiro; depois o prefixo, numa única passada da regex
+        route = EXACT_ROUTES.get(data)
+        if route is None:
+            prefix = _CALLBACK_PREFIX_RE.match(data)
+            route = PREFIX_ROUTES[prefix.group()] if prefix else None
 
-        # ===== Monetização =====
-        if data.startswith("monetization_") or data.startswith("monetize_"):
-            logging.info(f"Encaminhando callback de monetização: {data}")
-            await posting_handler.handle_callback_query(call)
-            return
-
-        # ===== Roteamento para callbacks de comentários =====
-        if data == "cancel_comment":
-            await post_interaction_handler.handle_cancel_comment(call)
+        if route is not None:
+            await route(call)
             return
 
         # ===== Fallback =====
@@ -435,8 +424,8 @@ from aiogram import F
 
 dp.message.register(start_command, Command(commands=['start']))
 dp.message.register(handle_setupgroup_command, Command(commands=['setupgroup']))
-dp.message.register(handle_media_message, F.content_type.in_({'photo', 'video', 'document'}))
-dp.message.register(handle_text_message, F.text)
+dp.message.register(handle_media_message, F.chat.type == 'private', F.content_type.in_({'photo', 'video', 'document'}))
+dp.message.register(handle_text_message, F.chat.type == 'private', F.text)
 dp.callback_query.register(unified_callback_handler)
 
 async def cleanup_bot_instance():
@@ -462,6 +451,17 @@ async def cleanup_bot_instance():
     except Exception as e:
         logger.warning(f"Erro durante cleanup: {e}")
 
+async def drop_pending_updates():
+    """Descarta updates acumulados antes do polling; sem autorização, alterna para simulação."""
+    try:
+        await bot.delete_webhook(drop_pending_updates=True)
+    except TelegramUnauthorizedError as e:
+        logger.warning(f"Token sem autorização ao descartar updates pendentes: {e}")
+        switch_to_simulation()
+    except Exception as e:
+        # Rede/timeout não devem abortar a inicialização: o polling segue normalmente
+        logger.warning(f"Não foi possível descartar updates pendentes: {e}")
+
 def signal_handler(signum, frame):
     """Handler para sinais de sistema."""
     global shutdown_flag
@@ -477,8 +477,11 @@ async def main():
         # Configurar logging estruturado
         setup_structured_logging()
         
-        # Inicializar serviços base
-        await init_services()
+        # Inicializar serviços base; fora da simulação, descartar updates pendentes em paralelo
+        startup = [init_services()]
+        if not SIMULATION_MODE:
+            startup.append(drop_pending_updates())
+        await asyncio.gather(*startup)
         
         # Usar os serviços globais já inicializados
         global user_service, error_handler, onboarding_handler, menu_handler, posting_handler, post_interaction_handler, dm_handler
@@ -491,12 +494,7 @@ async def main():
         logger.info(f"  - PostInteractionHandler: {type(post_interaction_handler).__name__}")
         logger.info(f"  - DMKeyboardHandler: {type(dm_handler).__name__}")
         
-        # Configurar handlers de mensagens
-        dp.message.register(start_command, Command("start"))
-        dp.message.register(handle_setupgroup_command, Command("setupgroup"))
-        dp.message.register(handle_media_message, F.content_type.in_({'photo', 'video', 'document'}))
-        dp.message.register(handle_text_message, F.text)
-        dp.callback_query.register(unified_callback_handler)
+        # Handlers de mensagens/callbacks já registrados no import do módulo
         
         # Configurar handlers de sinal para shutdown gracioso
         signal.signal(signal.SIGINT, signal_handler)
@@ -513,9 +511,9 @@ async def main():
             except KeyboardInterrupt:
                 logger.info("🛑 Interrupção detectada")
         else:
-            # Iniciar polling
+            # Iniciar polling (updates pendentes já descartados no startup; aiogram 3 ignora skip_updates)
             logger.info("🔄 Iniciando polling...")
-            await dp.start_polling(bot, skip_updates=True)
+            await dp.start_polling(bot)
             
     except Exception as e:
         logger.error(f"❌ Erro crítico na inicialização: {e}", exc_info=True)
@@ -524,32 +522,34 @@ async def main():
         # Cleanup
         await cleanup_bot_instance()
 
+class StructuredFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON."""
+
+    def format(self, record):
+        log_entry = {
+            # record.created já traz o instante do registro; evita nova leitura do relógio
+            'timestamp': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).replace(tzinfo=None).isoformat(),
+            'level': record.levelname,
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+            'bot_id': 'liberall_bot'
+        }
+        
+        if hasattr(record, 'user_id'):
+            log_entry['user_id'] = record.user_id
+        if hasattr(record, 'action'):
+            log_entry['action'] = record.action
+        if hasattr(record, 'callback_data'):
+            log_entry['callback_data'] = record.callback_data
+            
+        if orjson is not None:
+            return orjson.dumps(log_entry).decode()
+        return json.dumps(log_entry, ensure_ascii=False)
+
 def setup_structured_logging():
     """Configura logging estruturado para depuração e telemetria."""
-    import json
-    import datetime
-    
-    class StructuredFormatter(logging.Formatter):
-        def format(self, record):
-            log_entry = {
-                'timestamp': datetime.datetime.utcnow().isoformat(),
-                'level': record.levelname,
-                'module': record.module,
-                'function': record.funcName,
-                'line': record.lineno,
-                'message': record.getMessage(),
-                'bot_id': 'liberall_bot'
-            }
-            
-            if hasattr(record, 'user_id'):
-                log_entry['user_id'] = record.user_id
-            if hasattr(record, 'action'):
-                log_entry['action'] = record.action
-            if hasattr(record, 'callback_data'):
-                log_entry['callback_data'] = record.callback_data
-                
-            return json.dumps(log_entry, ensure_ascii=False)
-    
     # Configurar handler para logs estruturados
     structured_handler = logging.StreamHandler()
     structured_handler.setFormatter(StructuredFormatter())
@@ -1,7 +1,7 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Optional, List, Dict
 
-@dataclass
+@dataclass(slots=True)
 class Profile:
     """Dados de perfil do usuário."""
     codename: Optional[str] = None
@@ -15,21 +15,26 @@ class Profile:
     interests: List[str] = field(default_factory=list)
     onboarded: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class Agreements:
     """Consentimentos do usuário."""
     rules_accepted: bool = False
     privacy_accepted: bool = False
     lgpd_accepted: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class Monetization:
     """Configurações de monetização do usuário."""
     enabled: bool = False
     pix_key: Optional[str] = None  # Armazenar criptografado
     balance: float = 0.0
 
-@dataclass
+# Nomes dos campos dos sub-objetos, calculados uma vez (classes com __slots__ não têm __dict__)
+_PROFILE_FIELDS = tuple(f.name for f in fields(Profile))
+_AGREEMENTS_FIELDS = tuple(f.name for f in fields(Agreements))
+_MONETIZATION_FIELDS = tuple(f.name for f in fields(Monetization))
+
+@dataclass(slots=True)
 class User:
     """Modelo principal de usuário."""
     telegram_id: int
@@ -69,14 +74,15 @@ class User:
 
     def to_dict(self) -> dict:
         """Converte a instância de User para um dicionário para salvar no Firebase."""
+        profile, agreements, monetization = self.profile, self.agreements, self.monetization
         return {
             "telegram_id": self.telegram_id,
             "username": self.username,
             "state": self.state,
             "context_data": self.context_data,
-            "profile": self.profile.__dict__,
-            "agreements": self.agreements.__dict__,
-            "monetization": self.monetization.__dict__,
+            "profile": {name: getattr(profile, name) for name in _PROFILE_FIELDS},
+            "agreements": {name: getattr(agreements, name) for name in _AGREEMENTS_FIELDS},
+            "monetization": {name: getattr(monetization, name) for name in _MONETIZATION_FIELDS},
             "is_premium": self.is_premium,
             "is_admin": self.is_admin
         }
\ No newline at end of file
@@ -10,7 +10,6 @@ import asyncio
 import logging
 import time
 from typing import Dict, List, Optional, Tuple
-from collections import defaultdict, deque
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -32,7 +31,8 @@ class AntispamService:
     """
     Serviço centralizado de antispam e rate limiting.
     
-    Usa algoritmo de sliding window para controle de taxa.
+    Usa token bucket em memória: cada escopo guarda apenas (tokens, último refill),
+    com reposição de ``max_hits`` tokens a cada ``window`` segundos.
     """
     
     # Configurações padrão de rate limiting
@@ -56,8 +56,8 @@ class AntispamService:
         if custom_limits:
             self.limits.update(custom_limits)
         
-        # Estrutura: {scope_key: deque([timestamp1, timestamp2, ...])}
-        self._windows: Dict[str, deque] = defaultdict(deque)
+        # Estrutura: {(action, user_id, scope_key): [tokens, last_refill_ts]}
+        self._buckets: Dict[Tuple, List[float]] = {}
         
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -93,21 +93,21 @@ class AntispamService:
                 logger.error(f"Erro no loop de limpeza de antispam: {e}")
     
     def _cleanup_old_windows(self):
-        """Remove janelas antigas que não têm mais timestamps recentes."""
+        """Remove buckets ociosos (já estariam cheios novamente)."""
         now = time.time()
         max_window = max(limit['window'] for limit in self.limits.values())
         
-        keys_to_remove = []
-        for key, window in self._windows.items():
+        keys_to_remove = [
+            key for key, bucket in self._buckets.items()
             # Se a última ação foi há mais de 2x a maior janela, remover
-            if window and (now - window[-1]) > (max_window * 2):
-                keys_to_remove.append(key)
+            if (now - bucket[1]) > (max_window * 2)
+        ]
         
         for key in keys_to_remove:
-            del self._windows[key]
+            del self._buckets[key]
         
         if keys_to_remove:
-            logger.debug(f"Limpeza antispam: {len(keys_to_remove)} janelas antigas removidas")
+            logger.debug(f"Limpeza antispam: {len(keys_to_remove)} buckets antigos removidos")
     
     def _get_limit_config(self, action: str) -> Dict:
         """
@@ -121,7 +121,7 @@ class AntispamService:
         """
         return self.limits.get(action, self.limits['default'])
     
-    def _build_scope_key(self, user_id: int, action: str, scope_key: Optional[str] = None) -> str:
+    def _build_scope_key(self, user_id: int, action: str, scope_key: Optional[str] = None) -> Tuple:
         """
         Constrói chave de escopo para rate limiting.
         
@@ -131,22 +131,28 @@ class AntispamService:
             scope_key: Chave adicional de escopo (ex: post_id)
             
         Returns:
-            Chave de escopo formatada
+            Tupla (action, user_id, scope_key)
         """
-        if scope_key:
-            return f"{action}:{user_id}:{scope_key}"
-        return f"{action}:{user_id}"
+        return (action, user_id, scope_key or None)
     
-    def _remove_old_timestamps(self, window: deque, cutoff_time: float):
+    def _refill(self, key: Tuple, now: float, window_sec: float, max_count: int) -> Tuple[float, float]:
         """
-        Remove timestamps antigos da janela.
+        Calcula os tokens disponíveis de um bucket no instante ``now``.
         
         Args:
-            window: Deque de timestamps
-            cutoff_time: Tempo de corte (timestamps antes disso são removidos)
+            key: Chave do bucket
+            now: Timestamp atual
+            window_sec: Janela de tempo em segundos
+            max_count: Capacidade do bucket
+            
+        Returns:
+            Tupla (tokens disponíveis, taxa de reposição em tokens/s)
         """
-        while window and window[0] < cutoff_time:
-            window.popleft()
+        rate = max_count / window_sec
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(max_count), rate
+        return min(float(max_count), bucket[0] + (now - bucket[1]) * rate), rate
     
     def check_and_consume(
         self,
@@ -180,39 +186,30 @@ class AntispamService:
         # Construir chave de escopo
         key = self._build_scope_key(user_id, action, scope_key)
         
-        # Obter janela de timestamps
-        window = self._windows[key]
-        
-        # Timestamp atual
+        # Repor tokens proporcionalmente ao tempo decorrido
         now = time.time()
-        cutoff = now - window_sec
-        
-        # Remover timestamps antigos
-        self._remove_old_timestamps(window, cutoff)
-        
-        # Verificar se excedeu o limite
-        current_count = len(window)
+        tokens, rate = self._refill(key, now, window_sec, max_count)
         
-        if current_count >= max_count:
+        if tokens < 1:
             # Rate limit excedido
-            # Calcular quando o usuário pode tentar novamente
-            oldest_in_window = window[0]
-            retry_after = (oldest_in_window + window_sec) - now
+            # Calcular quando o próximo token estará disponível
+            retry_after = (1 - tokens) / rate
+            self._buckets[key] = [tokens, now]
             
             logger.warning(
                 f"Rate limit excedido: user={user_id}, action={action}, "
-                f"scope={scope_key}, count={current_count}/{max_count}, "
+                f"scope={scope_key}, tokens={tokens:.2f}/{max_count}, "
                 f"retry_after={retry_after:.1f}s"
             )
             
             return (False, retry_after)
         
-        # Permitido: adicionar timestamp
-        window.append(now)
+        # Permitido: consumir um token
+        self._buckets[key] = [tokens - 1, now]
         
         logger.debug(
             f"Rate limit OK: user={user_id}, action={action}, "
-            f"scope={scope_key}, count={current_count + 1}/{max_count}"
+            f"scope={scope_key}, tokens={tokens - 1:.2f}/{max_count}"
         )
         
         return (True, None)
@@ -246,23 +243,11 @@ class AntispamService:
         # Construir chave de escopo
         key = self._build_scope_key(user_id, action, scope_key)
         
-        # Obter janela de timestamps
-        window = self._windows[key]
+        # Calcular tokens sem alterar o bucket
+        tokens, rate = self._refill(key, time.time(), window_sec, max_count)
         
-        # Timestamp atual
-        now = time.time()
-        cutoff = now - window_sec
-        
-        # Remover timestamps antigos (temporariamente)
-        temp_window = deque(ts for ts in window if ts >= cutoff)
-        
-        # Verificar se excedeu o limite
-        current_count = len(temp_window)
-        
-        if current_count >= max_count:
-            oldest_in_window = temp_window[0]
-            retry_after = (oldest_in_window + window_sec) - now
-            return (False, retry_after)
+        if tokens < 1:
+            return (False, (1 - tokens) / rate)
         
         return (True, None)
     
@@ -276,15 +261,14 @@ class AntispamService:
             scope_key: Chave de escopo (opcional)
         """
         key = self._build_scope_key(user_id, action, scope_key)
-        if key in self._windows:
-            del self._windows[key]
+        if self._buckets.pop(key, None) is not None:
             logger.debug(f"Rate limit resetado: {key}")
     
     def clear_all(self):
         """Limpa todos os rate limits."""
-        count = len(self._windows)
-        self._windows.clear()
-        logger.info(f"Todos os rate limits limpos: {count} janelas removidas")
+        count = len(self._buckets)
+        self._buckets.clear()
+        logger.info(f"Todos os rate limits limpos: {count} buckets removidos")
     
     def get_stats(self) -> Dict:
         """
@@ -294,7 +278,7 @@ class AntispamService:
             Dicionário com estatísticas
         """
         return {
-            'total_windows': len(self._windows),
+            'total_windows': len(self._buckets),
             'limits_config': self.limits
         }
 
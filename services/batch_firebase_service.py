@@ -39,15 +39,10 @@ class BatchFirebaseService:
                 operations = list(self._pending_operations.items())
                 self._pending_operations.clear()
                 
-                # Executa todas as operações em paralelo
-                tasks = []
-                for uid, data in operations:
-                    task = self.firebase_service.update_user(uid, data)
-                    tasks.append(task)
-                
-                if tasks:
-                    await asyncio.gather(*tasks, return_exceptions=True)
-                    self.logger.info(f"Batch update executado para {len(tasks)} usuários")
+                # Executa todas as operações num único WriteBatch
+                if operations:
+                    await self.firebase_service.update_users(dict(operations))
+                    self.logger.info(f"Batch update executado para {len(operations)} usuários")
     
     async def auto_flush_after_delay(self, delay_seconds: float = 0.5) -> None:
         """Executa flush automático após um delay para otimizar operações consecutivas."""
@@ -8,6 +8,7 @@ Uso previsto:
 - Limpar rascunhos expirados automaticamente via verificação na leitura.
 """
 
+import asyncio
 import logging
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -97,14 +98,32 @@ class DraftRepo:
                 "status": "active",
             }
 
+            # set() do SDK é bloqueante: em thread, não segura o loop (ex.: edição do preview no Telegram)
             ref = self.db.collection(self.collection).document(draft_id)
-            ref.set(payload)
+            await asyncio.to_thread(ref.set, payload)
             logger.info(f"Draft salvo/atualizado: {draft_id} para user {user_id}")
             return draft_id
         except Exception as e:
             logger.error(f"Erro ao salvar draft: {e}", exc_info=True)
             raise
 
+    async def patch(self, user_id: int, draft_id: str, fields: Dict[str, Any]) -> None:
+        """Atualiza apenas os campos informados de ``data`` (sem reescrever o documento).
+
+        Renova o TTL como ``create_or_update``. Falha se o rascunho não existir.
+        """
+        try:
+            now = datetime.now(timezone.utc)
+            updates = {f"data.{key}": value for key, value in fields.items()}
+            updates["updated_at"] = now
+            updates["expires_at"] = now + timedelta(hours=self.ttl_hours)
+            ref = self.db.collection(self.collection).document(draft_id)
+            await asyncio.to_thread(ref.update, updates)
+            logger.info(f"Draft atualizado parcialmente: {draft_id} para user {user_id}")
+        except Exception as e:
+            logger.error(f"Erro ao atualizar draft {draft_id}: {e}", exc_info=True)
+            raise
+
     async def get(self, user_id: int, draft_id: str) -> Optional[Dict[str, Any]]:
         """Obtém rascunho por ID, valida dono e TTL; se expirado, apaga."""
         try:
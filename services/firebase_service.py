@@ -1,7 +1,7 @@
 import os
 import logging
 import asyncio
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 
 try:
     import firebase_admin
@@ -40,7 +40,16 @@ class FirebaseService:
             return False
     
     async def _async_init(self):
-        """Inicialização assíncrona do Firebase."""
+        """Inicialização assíncrona do Firebase.
+
+        Credenciais, initialize_app e firestore.client() bloqueiam; rodam numa
+        thread para o loop seguir livre (ex.: chamadas ao Telegram no startup).
+        """
+        # Chamada explícita (main.init_services) dispensa a inicialização preguiçosa de _ensure_initialized
+        self._init_attempted = True
+        await asyncio.to_thread(self._init_sync)
+    
+    def _init_sync(self):
         try:
             # Verifica se deve usar modo simulação
             simulate_firebase = os.getenv('FIREBASE_SIMULATION', 'False').strip().lower() in ('true', '1', 'yes', 'on')
@@ -126,6 +135,30 @@ class FirebaseService:
             logging.error(f"🔥 Erro ao buscar usuário {telegram_id}: {e}")
             return None
 
+    async def get_users_bulk(self, telegram_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Busca vários usuários com consultas `in` por ID de documento (lotes de 10)."""
+        await self._ensure_initialized()
+        if not self.db or not self.initialized:
+            logging.warning(f"🔥 Firebase não disponível - get_users_bulk")
+            return {}
+        
+        ids = list(dict.fromkeys(int(telegram_id) for telegram_id in telegram_ids))
+        if not ids:
+            return {}
+        
+        try:
+            users_ref = self.db.collection('users')
+            document_id = firestore.FieldPath.document_id()
+            users = {}
+            for start in range(0, len(ids), 10):
+                chunk = [users_ref.document(str(telegram_id)) for telegram_id in ids[start:start + 10]]
+                for doc in users_ref.where(document_id, 'in', chunk).stream():
+                    users[int(doc.id)] = doc.to_dict()
+            return users
+        except Exception as e:
+            logging.error(f"🔥 Erro ao buscar usuários em lote: {e}")
+            return {}
+
     async def create_user(self, user_data: dict) -> bool:
         await self._ensure_initialized()
         if not self.db or not self.initialized:
@@ -154,6 +187,30 @@ class FirebaseService:
             logging.error(f"🔥 Erro ao atualizar usuário {telegram_id}: {e}")
             return False
     
+    async def update_users(self, updates: Dict[int, dict]) -> bool:
+        """Atualiza vários usuários com WriteBatch (até 500 escritas por commit)."""
+        await self._ensure_initialized()
+        if not self.db or not self.initialized:
+            logging.warning(f"🔥 Firebase não disponível - update_users({len(updates)})")
+            return False
+        
+        users_ref = self.db.collection('users')
+        items = list(updates.items())
+        ok = True
+        for start in range(0, len(items), 500):
+            chunk = items[start:start + 500]
+            try:
+                batch = self.db.batch()
+                for telegram_id, data in chunk:
+                    batch.update(users_ref.document(str(telegram_id)), data)
+                batch.commit()
+            except Exception as e:
+                # O lote é atômico: um documento inválido derruba todos; refaz um a um
+                logging.warning(f"🔥 Erro ao atualizar usuários em lote, gravando individualmente: {e}")
+                for telegram_id, data in chunk:
+                    ok = await self.update_user(telegram_id, data) and ok
+        return ok
+    
     async def get_user_by_codename(self, codename: str) -> Optional[Dict[str, Any]]:
         """Busca um usuário pelo codinome."""
         await self._ensure_initialized()
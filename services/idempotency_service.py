@@ -141,12 +141,15 @@ class IdempotencyService:
         if ttl is None:
             ttl = self.default_ttl
         
-        # Verificar se já foi executado
+        # Verificar e reservar a chave no mesmo passo (sem await entre os dois),
+        # equivalente a um SET NX: chamadas concorrentes não executam fn em duplicidade
         if self._is_duplicate(key):
             cached_result = self._cache[key]['result']
             logger.info(f"Idempotência: operação já executada - key={key}")
             return (False, cached_result)
         
+        self._store(key, None, ttl)
+        
         # Executar função
         try:
             if asyncio.iscoroutinefunction(fn):
@@ -161,6 +164,8 @@ class IdempotencyService:
             return (True, result)
             
         except Exception as e:
+            # Liberar a reserva para permitir nova tentativa
+            self._cache.pop(key, None)
             logger.error(f"Erro ao executar operação idempotente - key={key}: {e}", exc_info=True)
             raise
     
@@ -3,13 +3,14 @@ Serviço de usuário otimizado com batch operations e cache local.
 """
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable
 from aiogram.types import User as TelegramUser
 from services.firebase_service import FirebaseService
 from services.security_service import SecurityService
 from services.monetization_service import MonetizationService
 from services.batch_firebase_service import BatchFirebaseService
 from models.firebase_models import User
+from utils.ttl_cache import TTLCache
 
 
 class OptimizedUserService:
@@ -28,6 +29,10 @@ class OptimizedUserService:
         # Alias público para compatibilidade com referências existentes
         self.cache = self._user_cache
         self._cache_lock = asyncio.Lock()
+        # Cache do estado do usuário (telegram_id -> estado), só com estados já gravados
+        self._state_cache = TTLCache(maxsize=10_000, ttl=300)
+        # Documento bruto do usuário por poucos segundos (get_user_data), invalidado nas escritas
+        self._data_cache = TTLCache(maxsize=10_000, ttl=2)
         
         # Auto-flush task
         self._auto_flush_task = None
@@ -64,18 +69,33 @@ class OptimizedUserService:
             return None
 
     async def get_user_data(self, telegram_id: int) -> Dict[str, Any] | None:
-        """Wrapper: retorna os dados brutos do usuário como dict (sem cache)."""
+        """Wrapper: retorna os dados brutos do usuário como dict (cache de ~2s)."""
+        user_data = self._data_cache.get(telegram_id)
+        if user_data is not None:
+            return user_data
         try:
-            return await self.firebase_service.get_user(telegram_id)
+            user_data = await self.firebase_service.get_user(telegram_id)
         except Exception as e:
             self.logger.error(f"Error getting user data {telegram_id}: {e}")
             return None
+        if user_data:
+            self._data_cache.set(telegram_id, user_data)
+        return user_data
+
+    async def get_users_bulk(self, telegram_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Busca vários usuários de uma vez e retorna {telegram_id: dados} (sem cache)."""
+        try:
+            return await self.firebase_service.get_users_bulk(telegram_ids)
+        except Exception as e:
+            self.logger.error(f"Error getting users in bulk: {e}")
+            return {}
 
     async def create_user(self, telegram_id: int, username: str) -> User:
         """Cria um novo usuário e retorna o objeto User."""
         try:
             new_user = User(telegram_id=telegram_id, username=username)
             await self.firebase_service.create_user(new_user.to_dict())
+            self._data_cache.pop(telegram_id)
             
             # Adiciona ao cache
             async with self._cache_lock:
@@ -89,16 +109,23 @@ class OptimizedUserService:
 
     async def update_user(self, telegram_id: int, data: dict, immediate: bool = False):
         """Atualiza os dados de um usuário usando batch operations."""
+        self._data_cache.pop(telegram_id)
+        updated = False
         if immediate:
             # Atualização imediata
-            await self.firebase_service.update_user(telegram_id, data)
+            updated = await self.firebase_service.update_user(telegram_id, data)
         else:
             # Adiciona à fila de batch operations
             await self.batch_service.queue_user_update(telegram_id, data)
             # Inicia auto-flush se não estiver rodando
             await self._schedule_auto_flush()
             
-        # Atualiza cache local
+        # Atualiza cache local (escrita em fila ainda não confirmada: descarta o estado antigo)
+        if "state" in data:
+            if updated:
+                self._state_cache.set(telegram_id, data["state"])
+            else:
+                self._state_cache.pop(telegram_id)
         await self._update_local_cache(telegram_id, data)
         # Removido log automático de data_update que estava causando loop infinito
         # await self.security_service.log_user_action(telegram_id, 'data_update')
@@ -124,10 +151,19 @@ class OptimizedUserService:
             
         await self.update_user(telegram_id, merged_data, immediate=True)
 
+    def get_cached_user_state(self, telegram_id: int) -> Optional[str]:
+        """Retorna o estado em cache do usuário ou None se ausente/expirado."""
+        return self._state_cache.get(telegram_id)
+
     async def update_user_context(self, telegram_id: int, context_data: dict):
         """Atualiza o contexto de um usuário."""
         await self.update_user(telegram_id, {"context_data": context_data})
 
+    async def set_user_state_and_context(self, telegram_id: int, state: str, context_data: dict,
+                                         immediate: bool = False):
+        """Define estado e contexto de um usuário numa única escrita."""
+        await self.update_user(telegram_id, {"state": state, "context_data": context_data}, immediate)
+
     async def clear_user_context(self, telegram_id: int):
         """Limpa o contexto de um usuário."""
         await self.update_user_context(telegram_id, {})
@@ -231,8 +267,10 @@ class OptimizedUserService:
         async with self._cache_lock:
             if telegram_id:
                 self._user_cache.pop(telegram_id, None)
+                self._data_cache.pop(telegram_id)
             else:
                 self._user_cache.clear()
+                self._data_cache.clear()
                 
     async def get_cache_size(self) -> int:
         """Retorna o tamanho do cache local."""
@@ -4,15 +4,21 @@ Implementa toda a lógica de criação, edição, visualização e interação c
 Inclui utilitário de publicação para enviar posts aos grupos configurados.
 """
 
+import asyncio
 import logging
+import re
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from firebase_admin import firestore
 import uuid
 import config
 
 logger = logging.getLogger(__name__)
 
+# post_id de um callback de interação (match:post:<id>[:<autor base36>]), sem o sufixo do autor
+_CALLBACK_POST_ID_RE = re.compile(r':post:([A-Za-z0-9_-]+)(?::[0-9a-z]+)?$')
+
 class PostService:
     """Serviço para gerenciar posts."""
     
@@ -50,14 +56,20 @@ class PostService:
         # Se não configurados, os métodos de publicação usarão fallback seguro
         self.freemium_group_id = getattr(config, 'FREEMIUM_GROUP_ID', None)
         self.premium_group_id = getattr(config, 'PREMIUM_GROUP_ID', None)
+        
+        # Cache em memória post_id -> (author_id, expira_em); o autor de um post não muda
+        self._post_author_cache: Dict[str, tuple] = {}
+        self._post_author_cache_ttl = 3600
+        self._post_author_cache_max = 10000
     
-    async def create_post(self, creator_id: int, post_data: Dict) -> Optional[str]:
+    async def create_post(self, creator_id: int, post_data: Dict, post_id: Optional[str] = None) -> Optional[str]:
         """
         Cria um novo post.
         
         Args:
             creator_id: ID do criador do post
             post_data: Dados do post
+            post_id: ID pré-alocado pelo chamador (opcional; gerado se ausente)
             
         Returns:
             str: ID do post criado ou None se houve erro
@@ -70,8 +82,8 @@ class PostService:
                     logger.error(f"Campo obrigatório ausente: {field}")
                     return None
             
-            # Gerar ID único para o post
-            post_id = str(uuid.uuid4())
+            # Gerar ID único para o post, se o chamador não pré-alocou um
+            post_id = post_id or str(uuid.uuid4())
             
             # Preparar dados do post
             now = datetime.now()
@@ -97,9 +109,10 @@ class PostService:
             
             # Salvar no Firestore
             post_ref = self.db.collection(self.posts_collection).document(post_id)
-            post_ref.set(complete_post_data)
+            await asyncio.to_thread(post_ref.set, complete_post_data)
             
             logger.info(f"Post criado: {post_id} por usuário {creator_id}")
+            self._cache_post_author(post_id, creator_id)
             
             # Registrar atividade do usuário
             await self._log_user_activity(creator_id, 'post_created', {
@@ -157,6 +170,50 @@ class PostService:
             logger.error(f"Erro ao obter post {post_id}: {e}")
             return None
     
+    def _cache_post_author(self, post_id: str, author_id: int):
+        """Armazena o autor do post no cache em memória, descartando a entrada mais antiga se cheio."""
+        cache = self._post_author_cache
+        if len(cache) >= self._post_author_cache_max:
+            cache.pop(next(iter(cache)), None)
+        cache[post_id] = (author_id, time.time() + self._post_author_cache_ttl)
+    
+    async def get_post_author(self, post_id: str) -> Optional[int]:
+        """
+        Obtém apenas o ID do autor de um post, usando cache em memória.
+        
+        Args:
+            post_id: ID do post
+            
+        Returns:
+            int: ID do autor ou None se o post não existir/estiver inativo
+        """
+        entry = self._post_author_cache.get(post_id)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        
+        try:
+            # Ler só os campos necessários em vez do documento completo
+            post_doc = self.db.collection(self.posts_collection).document(post_id)\
+                .get(field_paths=['author_id', 'creator_id', 'status'])
+            
+            if not post_doc.exists:
+                logger.warning(f"Post não encontrado: {post_id}")
+                return None
+            
+            post_data = post_doc.to_dict() or {}
+            if post_data.get('status') != 'active':
+                logger.warning(f"Post inativo: {post_id}")
+                return None
+            
+            author_id = post_data.get('author_id') or post_data.get('creator_id')
+            if author_id:
+                self._cache_post_author(post_id, author_id)
+            return author_id
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter autor do post {post_id}: {e}")
+            return None
+    
     async def update_post(self, post_id: str, user_id: int, updates: Dict) -> bool:
         """
         Atualiza um post.
@@ -510,6 +567,77 @@ class PostService:
             logger.error(f"Erro ao remover favorito: {e}")
             return False
     
+    async def toggle_favorite(self, user_id: int, post_id: str) -> Optional[bool]:
+        """
+        Alterna o favorito de um post numa única transação.
+        
+        Args:
+            user_id: ID do usuário
+            post_id: ID do post
+            
+        Returns:
+            bool: True se o post ficou favoritado, False se foi removido,
+            None se houve erro
+        """
+        try:
+            post_ref = self.db.collection(self.posts_collection).document(post_id)
+            favorites_query = self.db.collection(self.favorites_collection)\
+                .where('user_id', '==', user_id)\
+                .where('post_id', '==', post_id)\
+                .where('status', '==', 'active')\
+                .limit(1)
+            
+            transaction = self.db.transaction()
+            
+            @firestore.transactional
+            def toggle_favorite_transaction(transaction):
+                existing = list(transaction.get(favorites_query))
+                now = datetime.now()
+                
+                if existing:
+                    # Marcar favorito como removido e decrementar contador
+                    transaction.update(existing[0].reference, {
+                        'status': 'removed',
+                        'removed_at': now
+                    })
+                    transaction.update(post_ref, {
+                        'favorite_count': firestore.Increment(-1),
+                        'updated_at': now
+                    })
+                    return False, existing[0].id
+                
+                # Criar favorito e incrementar contador
+                favorite_id = str(uuid.uuid4())
+                favorite_ref = self.db.collection(self.favorites_collection).document(favorite_id)
+                transaction.set(favorite_ref, {
+                    'id': favorite_id,
+                    'user_id': user_id,
+                    'post_id': post_id,
+                    'created_at': now,
+                    'status': 'active'
+                })
+                transaction.update(post_ref, {
+                    'favorite_count': firestore.Increment(1),
+                    'updated_at': now
+                })
+                return True, favorite_id
+            
+            new_state, favorite_id = toggle_favorite_transaction(transaction)
+            
+            logger.info(f"Favorito do post {post_id} alternado para {new_state} pelo usuário {user_id}")
+            
+            # Registrar atividade
+            await self._log_user_activity(user_id, 'favorite_added' if new_state else 'favorite_removed', {
+                'post_id': post_id,
+                'favorite_id': favorite_id
+            })
+            
+            return new_state
+            
+        except Exception as e:
+            logger.error(f"Erro ao alternar favorito: {e}")
+            return None
+    
     async def is_favorited(self, user_id: int, post_id: str) -> bool:
         """
         Verifica se um post está nos favoritos do usuário.
@@ -764,7 +892,8 @@ class PostService:
         file_id: Optional[str] = None,
         media_files: Optional[List[Dict]] = None,
         keyboard: Optional[Any] = None,
-        target_group: str = 'both'
+        target_group: str = 'both',
+        post_id: Optional[str] = None
     ) -> bool:
         """Publica um post nos grupos configurados.
 
@@ -775,6 +904,7 @@ class PostService:
             media_files: Lista de arquivos de mídia para media_group.
             keyboard: Teclado inline para interações.
             target_group: 'freemium', 'premium' ou 'both' (padrão - publica em ambos).
+            post_id: ID do post no Firestore (usado na navegação de mídias).
 
         Returns:
             bool: True se pelo menos um envio foi bem-sucedido, False caso contrário.
@@ -856,23 +986,24 @@ class PostService:
                                     from handlers.media_navigation_handler import MediaNavigationHandler
                                     media_nav_handler = MediaNavigationHandler(self.bot, self, None)
                                     
-                                    # Extrair post_id do teclado de interação existente
-                                    post_id = None
-                                    if keyboard and keyboard.inline_keyboard:
+                                    # Sem post_id explícito, extrair do teclado de interação (ignorando o autor)
+                                    nav_post_id = post_id
+                                    if not nav_post_id and keyboard and keyboard.inline_keyboard:
                                         for row in keyboard.inline_keyboard:
                                             for button in row:
-                                                if button.callback_data and ':post:' in button.callback_data:
-                                                    post_id = button.callback_data.split(':post:')[-1]
+                                                match = _CALLBACK_POST_ID_RE.search(button.callback_data or '')
+                                                if match:
+                                                    nav_post_id = match.group(1)
                                                     break
-                                            if post_id:
+                                            if nav_post_id:
                                                 break
                                     
-                                    if not post_id:
-                                        post_id = f"post_{int(datetime.now().timestamp())}"
+                                    if not nav_post_id:
+                                        nav_post_id = f"post_{int(datetime.now().timestamp())}"
                                     
                                     # Criar teclado combinado: navegação + interações
                                     final_keyboard = media_nav_handler._create_combined_keyboard(
-                                        post_id=post_id,
+                                        post_id=nav_post_id,
                                         current_index=0,
                                         total_media=len(media_files),
                                         interaction_keyboard=keyboard
@@ -1155,6 +1286,46 @@ class PostService:
             logger.error(f"Erro ao obter comentários do post {post_id}: {e}")
             return []
     
+    async def get_recent_comments_with_count(self, post_id: str, n: int = 5) -> Tuple[List[Dict], int]:
+        """
+        Obtém os últimos comentários de um post e o total de comentários.
+        
+        Args:
+            post_id: ID do post
+            n: Quantidade de comentários recentes a retornar
+            
+        Returns:
+            Tuple[List[Dict], int]: Últimos n comentários (ordem cronológica) e total
+        """
+        try:
+            base_query = self.db.collection('comments')\
+                .where('post_id', '==', post_id)\
+                .where('status', '==', 'active')
+            
+            # Agregação count() evita carregar todos os comentários só para contar
+            count_result = base_query.count().get()
+            total = int(count_result[0][0].value) if count_result else 0
+            
+            # Mesma ordenação ASCENDING de get_post_comments (reaproveita o índice existente);
+            # limit_to_last já devolve os n mais recentes em ordem cronológica
+            recent_docs = base_query\
+                .order_by('created_at', direction=firestore.Query.ASCENDING)\
+                .limit_to_last(n)\
+                .get()
+            
+            result = []
+            for comment_doc in recent_docs:
+                comment_data = comment_doc.to_dict()
+                comment_data['id'] = comment_doc.id
+                result.append(comment_data)
+            
+            logger.info(f"Obtidos {len(result)} de {total} comentários do post {post_id}")
+            return result, total
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter comentários recentes do post {post_id}: {e}")
+            return [], 0
+    
     async def add_comment(self, post_id: str, user_id: int, comment_text: str) -> bool:
         """
         Adiciona um comentário a um post.
@@ -7,11 +7,12 @@ Implementa dois modos de renderização conforme PRD:
 
 Estrutura de dados telegram.* por espelho (freemium/premium).
 """
+import asyncio
 import os
 import logging
 import uuid
 from datetime import datetime
-from typing import List, Dict, Optional, Any, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from firebase_admin import firestore
 from aiogram import Bot
 from aiogram.types import InputMediaPhoto, InputMediaVideo, FSInputFile
@@ -26,6 +27,10 @@ logger = logging.getLogger(__name__)
 # Configurações
 POST_RENDER_MODE = os.getenv('POST_RENDER_MODE', 'carousel')
 BLUR_PREVIEW_FOR_MONETIZED = os.getenv('BLUR_PREVIEW_FOR_MONETIZED', 'true').lower() == 'true'
+FIRESTORE_MAX_CONCURRENCY = int(os.getenv('FIRESTORE_MAX_CONCURRENCY', '32'))
+
+# Espelhos (grupos) onde um post pode estar publicado, na ordem de atualização
+TELEGRAM_CHANNELS = ('freemium', 'premium')
 
 
 class PostServiceV2:
@@ -48,6 +53,12 @@ class PostServiceV2:
         self.user_service = user_service
         self.ui_builder = UIBuilderV2(bot_username)
         
+        # Callbacks chamados com o author_id após criar um post (ex: invalidar caches de galeria)
+        self._post_created_listeners: List[Callable[[int], None]] = []
+        
+        # Limite de operações Firestore simultâneas (cliente compartilhado do firebase_service)
+        self._sem = asyncio.Semaphore(FIRESTORE_MAX_CONCURRENCY)
+        
         # Serviços auxiliares
         self.idempotency = get_idempotency_service()
         self.antispam = get_antispam_service()
@@ -134,12 +145,24 @@ class PostServiceV2:
             
             logger.info(f"post.created {post_id=} {author_id=} {monetized=}")
             
+            for listener in self._post_created_listeners:
+                listener(author_id)
+            
             return post_id
             
         except Exception as e:
             logger.error(f"Erro ao criar post: {e}", exc_info=True)
             raise
     
+    def add_post_created_listener(self, listener: Callable[[int], None]):
+        """
+        Registra callback chamado com o author_id sempre que um post é criado.
+        
+        Args:
+            listener: Função síncrona e leve (ex: invalidação de cache)
+        """
+        self._post_created_listeners.append(listener)
+    
     async def publish_post(
         self,
         post_id: str,
@@ -164,7 +187,7 @@ class PostServiceV2:
                 raise ValueError(f"Post não encontrado: {post_id}")
             
             # Obter autor
-            author = await self.user_service.get_user(int(post['author_id']))
+            author = await self.user_service.get_user(post['author_id'])
             if not author:
                 raise ValueError(f"Autor não encontrado: {post['author_id']}")
             
@@ -250,13 +273,15 @@ class PostServiceV2:
             # Obter mídias
             media_list = post.get('media', [])
             
+            author_id = post['author_id']
+            
             if mode == 'carousel':
                 return await self._publish_carousel(
-                    post_id, caption, media_list, group_id, group_type, apply_blur
+                    post_id, caption, media_list, group_id, group_type, apply_blur, author_id
                 )
             else:  # album+panel
                 return await self._publish_album_panel(
-                    post_id, caption, media_list, group_id, group_type, apply_blur
+                    post_id, caption, media_list, group_id, group_type, apply_blur, author_id
                 )
                 
         except Exception as e:
@@ -270,7 +295,8 @@ class PostServiceV2:
         media_list: List[Dict],
         group_id: int,
         group_type: str,
-        apply_blur: bool
+        apply_blur: bool,
+        author_id: Optional[int] = None
     ) -> Dict:
         """
         Publica no modo carousel (1 mensagem + navegação inline).
@@ -284,7 +310,8 @@ class PostServiceV2:
             counts={'comments': 0, 'favorites': 0, 'matches': 0},
             viewer_user_id=0,  # Será substituído por deep link
             current_index=0,
-            total_media=len(media_list)
+            total_media=len(media_list),
+            author_id=author_id
         )
         
         # Enviar mensagem
@@ -341,7 +368,8 @@ class PostServiceV2:
         media_list: List[Dict],
         group_id: int,
         group_type: str,
-        apply_blur: bool
+        apply_blur: bool,
+        author_id: Optional[int] = None
     ) -> Dict:
         """
         Publica no modo album+panel (álbum + painel separado).
@@ -382,7 +410,8 @@ class PostServiceV2:
             counts={'comments': 0, 'favorites': 0, 'matches': 0},
             viewer_user_id=0,
             current_index=0,
-            total_media=len(media_list)
+            total_media=len(media_list),
+            author_id=author_id
         )
         
         panel_msg = await self.bot.send_message(
@@ -479,17 +508,42 @@ class PostServiceV2:
         except Exception as e:
             logger.error(f"Erro ao atualizar telegram refs: {e}", exc_info=True)
     
+    async def _run(self, fn, *args):
+        """
+        Executa uma chamada síncrona do Firestore numa thread, limitada pelo semáforo.
+        
+        Args:
+            fn: Método do SDK (ex: doc_ref.get)
+            *args: Argumentos para fn
+        """
+        async with self._sem:
+            return await asyncio.to_thread(fn, *args)
+    
     async def get_post(self, post_id: str) -> Optional[Dict]:
-        """Obtém um post do Firestore."""
+        """
+        Obtém um post do Firestore.
+        
+        O author_id é persistido como string (consultas de galeria dependem disso)
+        e convertido para int aqui, uma única vez, para os handlers.
+        """
         try:
             post_ref = self.db.collection(self.posts_collection).document(post_id)
-            post_doc = post_ref.get()
+            post_doc = await self._run(post_ref.get)
             
             if not post_doc.exists:
                 return None
             
             post_data = post_doc.to_dict()
             post_data['id'] = post_id
+            post_data['author_id'] = int(post_data['author_id'])
+            
+            # Visão em lista dos espelhos: telegram.channels = [{channel, chat_id, ...}, ...]
+            telegram_data = post_data.setdefault('telegram', {})
+            telegram_data['channels'] = [
+                {'channel': channel, **telegram_data[channel]}
+                for channel in TELEGRAM_CHANNELS
+                if telegram_data.get(channel)
+            ]
             
             return post_data
             
@@ -507,7 +561,7 @@ class PostServiceV2:
         """
         try:
             post_ref = self.db.collection(self.posts_collection).document(post_id)
-            post_ref.update({
+            await self._run(post_ref.update, {
                 f'stats.{field}': firestore.Increment(1)
             })
             
@@ -564,7 +618,7 @@ class PostServiceV2:
             
             # Salvar comentário
             comment_ref = self.db.collection(self.comments_collection).document(post_id).collection('items').document(comment_id)
-            comment_ref.set({
+            await self._run(comment_ref.set, {
                 'author_id': str(author_id),
                 'text': text,
                 'created_at': datetime.now()
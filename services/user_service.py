@@ -3,8 +3,9 @@ from services.firebase_service import FirebaseService
 from services.security_service import SecurityService
 from services.monetization_service import MonetizationService
 from models.firebase_models import User
+from utils.ttl_cache import TTLCache
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Iterable
 
 class UserService:
     def __init__(self, firebase_service: FirebaseService, security_service: SecurityService, monetization_service: MonetizationService):
@@ -12,6 +13,8 @@ class UserService:
         self.security_service = security_service
         self.monetization_service = monetization_service
         self.logger = logging.getLogger(__name__)
+        # Cache em memória do estado do usuário (telegram_id -> estado)
+        self._state_cache = TTLCache(maxsize=10_000, ttl=300)
         self.logger.info("User service initialized")
 
     async def get_or_create_user(self, telegram_user: TelegramUser) -> User:
@@ -38,6 +41,14 @@ class UserService:
             self.logger.error(f"Error getting user data {telegram_id}: {e}")
             return None
 
+    async def get_users_bulk(self, telegram_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Busca vários usuários de uma vez e retorna {telegram_id: dados}."""
+        try:
+            return await self.firebase_service.get_users_bulk(telegram_ids)
+        except Exception as e:
+            self.logger.error(f"Error getting users in bulk: {e}")
+            return {}
+
     async def create_user(self, telegram_id: int, username: str) -> User:
         """Cria um novo usuário e retorna o objeto User."""
         try:
@@ -51,7 +62,13 @@ class UserService:
 
     async def update_user(self, telegram_id: int, data: dict):
         """Atualiza os dados de um usuário."""
-        await self.firebase_service.update_user(telegram_id, data)
+        updated = await self.firebase_service.update_user(telegram_id, data)
+        if "state" in data:
+            # Só guardar o estado que de fato foi gravado
+            if updated:
+                self._state_cache.set(telegram_id, data["state"])
+            else:
+                self._state_cache.pop(telegram_id)
         # Removido log automático de data_update que estava causando loop infinito
         # await self.security_service.log_user_action(telegram_id, 'data_update')
 
@@ -67,10 +84,18 @@ class UserService:
         """Wrapper: atualiza estado do usuário (alias para set_user_state)."""
         await self.set_user_state(telegram_id, state)
 
+    def get_cached_user_state(self, telegram_id: int) -> Optional[str]:
+        """Retorna o estado em cache do usuário ou None se ausente/expirado."""
+        return self._state_cache.get(telegram_id)
+
     async def update_user_context(self, telegram_id: int, context_data: dict):
         """Atualiza o contexto de um usuário."""
         await self.update_user(telegram_id, {"context_data": context_data})
 
+    async def set_user_state_and_context(self, telegram_id: int, state: str, context_data: dict):
+        """Define estado e contexto de um usuário numa única escrita."""
+        await self.update_user(telegram_id, {"state": state, "context_data": context_data})
+
     async def clear_user_context(self, telegram_id: int):
         """Limpa o contexto de um usuário."""
         await self.update_user_context(telegram_id, {})
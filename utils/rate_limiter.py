@@ -0,0 +1,107 @@
+"""Limitação de envio para a API do Telegram (token bucket assíncrono).
+
+O Telegram aceita ~30 mensagens/s por bot e ~1 mensagem/s por chat; acima
+disso responde 429 com ``retry_after`` de vários segundos. Aqui as chamadas
+esperam o próprio horário em vez de falhar e serem repetidas.
+"""
+
+import asyncio
+import time
+from typing import Dict, Hashable, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.methods import EditMessageCaption, EditMessageMedia, EditMessageReplyMarkup, EditMessageText
+
+# Limites padrão (com margem de segurança em relação aos do Telegram)
+PER_CHAT_RATE = 1
+GLOBAL_RATE = 25
+
+# Chamadas que contam nos limites de envio (get_chat_member, delete_message etc. ficam de fora)
+_THROTTLED_PREFIXES = ('send', 'edit', 'copy', 'forward')
+
+# Edições que podem ser descartadas quando outra mais nova do mesmo tipo, na mesma mensagem, está na fila
+_EDIT_METHODS = (EditMessageText, EditMessageCaption, EditMessageReplyMarkup, EditMessageMedia)
+
+
+class RateLimiter:
+    """
+    Token bucket por chave: ``rate`` envios a cada ``per`` segundos.
+
+    ``acquire`` reserva um token e, se o balde estiver vazio, aguarda apenas
+    o tempo até a vez da chamada (reservas ficam em fila, sem lock).
+    """
+
+    def __init__(self, rate: float, per: float = 1.0, maxsize: int = 10_000):
+        """
+        Args:
+            rate: Número de envios permitidos por janela
+            per: Duração da janela em segundos
+            maxsize: Máximo de chaves mantidas antes de descartar baldes cheios
+        """
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self.maxsize = maxsize
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+
+    async def acquire(self, key: Hashable = '*'):
+        """Consome um token de ``key``, aguardando se necessário."""
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.fill_rate) - 1
+        if key not in self._buckets and len(self._buckets) >= self.maxsize:
+            self._prune(now)
+        self._buckets[key] = (tokens, now)
+        if tokens < 0:
+            await asyncio.sleep(-tokens / self.fill_rate)
+
+    def release(self, key: Hashable = '*'):
+        """Devolve um token reservado que acabou não sendo usado."""
+        entry = self._buckets.get(key)
+        if entry is not None:
+            self._buckets[key] = (min(self.capacity, entry[0] + 1), entry[1])
+
+    def _prune(self, now: float):
+        """Remove baldes que já estariam cheios (não guardam informação útil)."""
+        full_after = self.capacity / self.fill_rate
+        self._buckets = {
+            key: entry for key, entry in self._buckets.items()
+            if now - entry[1] < full_after
+        }
+
+
+class TelegramRateLimitMiddleware(BaseRequestMiddleware):
+    """Middleware da sessão do Bot que aplica os limites aos envios com ``chat_id``.
+
+    Cobre ``send_message``, ``message.answer``, ``edit_text``, envios de mídia,
+    cópias e encaminhamentos, sem precisar envolver cada ponto de envio dos handlers. Edições da
+    mesmo tipo na mesma mensagem que esperavam a vez são coalescidas: só a mais recente é
+    enviada e as anteriores retornam ``True`` sem chamar a API.
+    """
+
+    def __init__(self, per_chat_rate: float = PER_CHAT_RATE, global_rate: float = GLOBAL_RATE):
+        self.per_chat = RateLimiter(per_chat_rate)
+        self.global_ = RateLimiter(global_rate)
+        # (chat_id, message_id, tipo da edição) -> geração da edição mais recente em espera
+        self._edits: Dict[Tuple[int, int, type], int] = {}
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is None or not method.__api_method__.startswith(_THROTTLED_PREFIXES):
+            return await make_request(bot, method)
+
+        edit_key = None
+        if isinstance(method, _EDIT_METHODS) and method.message_id is not None:
+            edit_key = (chat_id, method.message_id, type(method))
+            generation = self._edits.get(edit_key, 0) + 1
+            self._edits[edit_key] = generation
+
+        await self.per_chat.acquire(chat_id)
+        if edit_key is not None:
+            if self._edits.get(edit_key) != generation:
+                # Uma edição mais nova do mesmo tipo será enviada no lugar desta
+                self.per_chat.release(chat_id)
+                return True
+            del self._edits[edit_key]
+
+        await self.global_.acquire()
+        return await make_request(bot, method)
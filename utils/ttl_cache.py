@@ -0,0 +1,60 @@
+"""Cache em memória com TTL e tamanho máximo, para leituras quentes do Firestore."""
+
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache chave -> valor com expiração por entrada.
+
+    Ao atingir ``maxsize`` descarta a entrada mais antiga (ordem de inserção).
+    Entradas expiradas são removidas de forma preguiçosa na leitura.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        """
+        Args:
+            maxsize: Número máximo de entradas
+            ttl: Tempo de vida padrão em segundos
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor em cache ou ``default`` se ausente/expirado."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        value, expires_at = entry
+        if expires_at <= time.time():
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Armazena ``value`` com o TTL padrão ou o informado."""
+        data = self._data
+        if key in data:
+            del data[key]
+        elif len(data) >= self.maxsize:
+            data.pop(next(iter(data)), None)
+        data[key] = (value, time.time() + (self.ttl if ttl is None else ttl))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a entrada e retorna o valor (ou ``default``)."""
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        """Remove todas as entradas."""
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
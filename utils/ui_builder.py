@@ -4,6 +4,19 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from constants.callbacks import PostingCallbacks  # Certifique-se que os callbacks estão definidos
 from config import BOT_USERNAME
 
+_BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+def encode_base36(value: int) -> str:
+    """Codifica um inteiro não negativo em base36 (decodificar com int(valor, 36))."""
+    value = int(value)
+    if value == 0:
+        return '0'
+    digits = []
+    while value:
+        value, remainder = divmod(value, 36)
+        digits.append(_BASE36_DIGITS[remainder])
+    return ''.join(reversed(digits))
+
 class UIBuilder:
     """Classe para construir interfaces de usuário do bot."""
     
@@ -24,21 +37,26 @@ class UIBuilder:
         return f"👤 {codename} · {category} · {state}"
     
     @staticmethod
-    def create_post_interaction_keyboard(post_id: str, user_id: int = None, is_matched: bool = False, is_favorited: bool = False, comment_count: int = 0) -> InlineKeyboardMarkup:
-        """Cria o teclado inline completo para uma postagem no grupo."""
+    def create_post_interaction_keyboard(post_id: str, user_id: int = None, is_matched: bool = False, is_favorited: bool = False, comment_count: int = 0, author_id: int = None) -> InlineKeyboardMarkup:
+        """Cria o teclado inline completo para uma postagem no grupo.
+        
+        Quando author_id é informado, ele segue no callback (em base36, para
+        caber nos 64 bytes) e os handlers dispensam a leitura do post.
+        """
         # Definir textos dos botões baseado no estado
         match_text = "💖 Matched" if is_matched else "❤️ Match"
         favorite_text = "⭐ Favoritado" if is_favorited else "⭐ Favoritar"
+        target = f"{post_id}:{encode_base36(author_id)}" if author_id else post_id
         
         keyboard_rows = [
             [
-                InlineKeyboardButton(text=match_text, callback_data=f"match:post:{post_id}"),
-                InlineKeyboardButton(text="🖼️ Ver Galeria", callback_data=f"gallery:post:{post_id}"),
-                InlineKeyboardButton(text=favorite_text, callback_data=f"favorite:post:{post_id}")
+                InlineKeyboardButton(text=match_text, callback_data=f"match:post:{target}"),
+                InlineKeyboardButton(text="🖼️ Ver Galeria", callback_data=f"gallery:post:{target}"),
+                InlineKeyboardButton(text=favorite_text, callback_data=f"favorite:post:{target}")
             ],
             [
-                InlineKeyboardButton(text="ℹ️ Info", callback_data=f"info:post:{post_id}"),
-                InlineKeyboardButton(text=f"💭 Comentários ({comment_count})", callback_data=f"comments:post:{post_id}")
+                InlineKeyboardButton(text="ℹ️ Info", callback_data=f"info:post:{target}"),
+                InlineKeyboardButton(text=f"💭 Comentários ({comment_count})", callback_data=f"comments:post:{target}")
             ],
             [
                 InlineKeyboardButton(text="➕ Postar na Comunidade", callback_data="posting:create"),
@@ -112,9 +130,9 @@ def build_anonymous_label(user_data) -> str:
     """Wrapper: mantém compatibilidade chamando a versão na classe."""
     return UIBuilder.build_anonymous_label(user_data)
 
-def create_post_interaction_keyboard(post_id: str, user_id: int = None, is_matched: bool = False, is_favorited: bool = False, comment_count: int = 0) -> InlineKeyboardMarkup:
+def create_post_interaction_keyboard(post_id: str, user_id: int = None, is_matched: bool = False, is_favorited: bool = False, comment_count: int = 0, author_id: int = None) -> InlineKeyboardMarkup:
     """Wrapper: mantém compatibilidade chamando a versão na classe."""
-    return UIBuilder.create_post_interaction_keyboard(post_id, user_id, is_matched, is_favorited, comment_count)
+    return UIBuilder.create_post_interaction_keyboard(post_id, user_id, is_matched, is_favorited, comment_count, author_id)
 
 def create_control_panel_keyboard(bot_username: str) -> InlineKeyboardMarkup:
     """Wrapper: mantém compatibilidade chamando a versão na classe."""